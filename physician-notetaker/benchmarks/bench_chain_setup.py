@@ -0,0 +1,61 @@
+"""
+Per-request setup cost: fresh chains per request vs the process-wide registry.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_chain_setup [iterations]
+
+No LLM calls are made; this only times client construction and LCEL
+pipeline building, which is what every request used to pay for.
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder-key")
+
+from src.chains import registry
+from src.llm import create_llm
+
+
+def per_request_setup():
+    """What chat_api did before: new clients and freshly built pipelines"""
+    for chain_class in registry.import_all().values():
+        chain = chain_class(llm=create_llm())
+        chain.build_chain()
+
+
+def registry_setup():
+    """What chat_api does now: look up the prebuilt chains"""
+    for name in registry.CHAIN_CLASSES:
+        registry.get_chain(name).get_runnable()
+
+
+def time_it(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    # First registry call pays the one-off build, like the first request on a worker
+    start = time.perf_counter()
+    registry.build_all()
+    first_build_ms = (time.perf_counter() - start) * 1000
+
+    per_request_ms = time_it(per_request_setup, iterations)
+    registry_ms = time_it(registry_setup, iterations)
+
+    print(f"Iterations:                 {iterations}")
+    print(f"Registry first build:       {first_build_ms:8.3f} ms (once per worker)")
+    print(f"Fresh chains per request:   {per_request_ms:8.3f} ms/request")
+    print(f"Registry lookup per request: {registry_ms:7.3f} ms/request")
+    print(f"Setup time removed:         {per_request_ms - registry_ms:8.3f} ms/request")
+    print("Note: fresh clients also lose their pooled connections, so every request "
+          "pays a new TCP/TLS handshake on top of the numbers above.")
+
+
+if __name__ == "__main__":
+    main()
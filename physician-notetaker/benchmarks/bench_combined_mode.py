@@ -0,0 +1,128 @@
+"""
+Combined single-call analysis against the per-chain path.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_combined_mode [runs]          # offline fake LLM
+    python -m benchmarks.bench_combined_mode [runs] --live   # real provider, needs GROQ_API_KEY
+
+Runs the sample consultation through run_chains() (one chain per section,
+NER in the configured NER_MODE) and through run_combined() `runs` times
+each, with the result cache off. Reports latency, LLM calls, prompt and
+completion tokens per request, and how far the combined sections agree
+with the per-chain ones: entity Jaccard for NER, same label for sentiment,
+text similarity for the SOAP fields. The fake LLM returns the same canned
+content on both paths, so agreement is only meaningful with --live.
+"""
+import difflib
+import os
+import re
+import statistics
+import sys
+import time
+
+LIVE = "--live" in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != "--live"]
+RUNS = int(args[0]) if args else 10
+
+if not LIVE:
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    os.environ.setdefault("FAKE_LLM_LATENCY", "0.3")
+    os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "500")
+
+from main import SAMPLE_CONVERSATION
+from src import metrics
+from src.config import Config
+from src.pipeline import run_chains, run_combined
+
+Config.CACHE_ENABLED = False
+_METRIC_LINE = re.compile(r'^\w+\{stage="[^"]+",(?:kind|status)="([^"]+)"\} (\S+)$')
+
+
+def counter_totals(counter) -> dict:
+    """Sum a stage-labelled counter over stages, by its second label"""
+    totals = {}
+    for line in counter.render():
+        match = _METRIC_LINE.match(line)
+        if match:
+            totals[match.group(1)] = totals.get(match.group(1), 0) + float(match.group(2))
+    return totals
+
+
+def measure(run, conversation: str):
+    """(seconds, llm calls, prompt tokens, completion tokens, results) for one request"""
+    calls, tokens = counter_totals(metrics.LLM_CALLS), counter_totals(metrics.LLM_TOKENS)
+    start = time.perf_counter()
+    results = run(conversation)
+    seconds = time.perf_counter() - start
+    calls_after, tokens_after = counter_totals(metrics.LLM_CALLS), counter_totals(metrics.LLM_TOKENS)
+    return (
+        seconds,
+        sum(calls_after.values()) - sum(calls.values()),
+        tokens_after.get("prompt", 0) - tokens.get("prompt", 0),
+        tokens_after.get("completion", 0) - tokens.get("completion", 0),
+        results
+    )
+
+
+def _terms(entities: dict) -> set:
+    return {
+        (category, str(term).strip().lower())
+        for category, terms in entities.items() if isinstance(terms, list)
+        for term in terms
+    }
+
+
+def agreement(reference: dict, combined: dict) -> dict:
+    """Per-section agreement of the combined results with the per-chain ones"""
+    scores = {}
+    if not reference["ner"].get("error") and not combined["ner"].get("error"):
+        a, b = _terms(reference["ner"]["data"]), _terms(combined["ner"]["data"])
+        scores["ner"] = len(a & b) / len(a | b) if a | b else 1.0
+    if not reference["sentiment"].get("error") and not combined["sentiment"].get("error"):
+        same = reference["sentiment"]["data"].get("Sentiment") == combined["sentiment"]["data"].get("Sentiment")
+        scores["sentiment"] = 1.0 if same else 0.0
+    if not reference["soap"].get("error") and not combined["soap"].get("error"):
+        ratios = []
+        for section, fields in reference["soap"]["data"].items():
+            other = combined["soap"]["data"].get(section) or {}
+            if isinstance(fields, dict) and isinstance(other, dict):
+                for field, text in fields.items():
+                    if text or other.get(field):
+                        ratios.append(difflib.SequenceMatcher(None, str(text).lower(), str(other.get(field, "")).lower()).ratio())
+        scores["soap"] = statistics.mean(ratios) if ratios else 1.0
+    return scores
+
+
+def main():
+    print(f"{RUNS} runs per path, {'live provider' if LIVE else 'fake LLM'}, NER_MODE={Config.NER_MODE}")
+    rows = {"per-chain": [], "combined": []}
+    scores = {"ner": [], "sentiment": [], "soap": []}
+    for i in range(RUNS):
+        conversation = f"{SAMPLE_CONVERSATION.strip()}\n\nPhysician: Reference {i}."
+        reference = measure(run_chains, conversation)
+        combined = measure(run_combined, conversation)
+        rows["per-chain"].append(reference)
+        rows["combined"].append(combined)
+        for section, score in agreement(reference[-1], combined[-1]).items():
+            scores[section].append(score)
+
+    print(f"{'path':<10} {'p50 (s)':>8} {'mean (s)':>9} {'calls':>6} {'prompt tok':>11} {'completion tok':>15}")
+    for path, measurements in rows.items():
+        seconds = [m[0] for m in measurements]
+        print(f"{path:<10} {statistics.median(seconds):>8.3f} {statistics.mean(seconds):>9.3f} "
+              f"{statistics.mean(m[1] for m in measurements):>6.1f} "
+              f"{statistics.mean(m[2] for m in measurements):>11.0f} "
+              f"{statistics.mean(m[3] for m in measurements):>15.0f}")
+
+    fallbacks = {
+        section: metrics.COMBINED_FALLBACKS.value(section=section) for section in ("ner", "sentiment", "soap")
+    }
+    print("Agreement with per-chain: " + ", ".join(
+        f"{section} {statistics.mean(values):.2f}" for section, values in scores.items() if values
+    ))
+    print("Section fallbacks: " + ", ".join(f"{section} {count:g}" for section, count in fallbacks.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Thorough-mode NER throughput with and without the local entity check.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_entity_normalizer [requests] [concurrency]          # offline fake LLM
+    python -m benchmarks.bench_entity_normalizer [requests] [concurrency] --live   # real provider, needs GROQ_API_KEY
+
+Sends `requests` distinct copies of the sample consultation through
+MedicalNERChain in thorough mode, `concurrency` at a time, first with
+NER_LOCAL_VERIFY off (validate, extract, LLM verify) and then on (the verify
+call is skipped when every extracted entity is found in the transcript).
+Reports requests/s, LLM calls per request and how many verifications were
+done locally, plus the cost of one normalize_entities() call. The result
+cache is off so every request reaches the LLM.
+
+First it checks TranscriptIndex.match() against a corpus of near-miss terms
+that must not count as found ("cancer" / "cancel", "hypertension" /
+"hypotension"), and exits non-zero on a mismatch.
+"""
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+LIVE = "--live" in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != "--live"]
+REQUESTS = int(args[0]) if args else 32
+CONCURRENCY = int(args[1]) if len(args) > 1 else 8
+
+if not LIVE:
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+    os.environ.setdefault("FAKE_LLM_LATENCY", "0.3")
+    os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "2000")
+
+from main import SAMPLE_CONVERSATION
+from src import metrics
+from src.config import Config
+from src.chains.ner_chain import MedicalNERChain
+from src.utils.entity_normalizer import EXACT, FUZZY, TranscriptIndex, normalize_entities
+
+Config.CACHE_ENABLED = False
+
+MATCH_TRANSCRIPT = (
+    "Patient: My father had cancer, and I had to cancel my physiotherapy. "
+    "I've had backaches and I'm not sleeping. "
+    "Physician: Your readings show hypotension, with some gastroesophageal reflux. "
+    "We'll start ten sessions."
+)
+# (entity, expected match): EXACT may skip the LLM verify, FUZZY keeps it, None is not found
+MATCH_CASES = [
+    ("cancer", EXACT),
+    ("backache", EXACT),
+    ("sleeping", EXACT),
+    ("10 sessions", EXACT),
+    ("hypotension", EXACT),
+    ("gastroesophageall reflux", FUZZY),
+    ("hypertension", None),
+    ("hyperkalemia", None),
+    ("cancers of the colon", None),
+    ("anxiety", None),
+]
+
+
+def check_matches() -> bool:
+    index = TranscriptIndex(MATCH_TRANSCRIPT)
+    failures = [(entity, expected, index.match(entity)) for entity, expected in MATCH_CASES
+                if index.match(entity) != expected]
+    print(f"Match corpus: {len(MATCH_CASES) - len(failures)}/{len(MATCH_CASES)} as expected")
+    for entity, expected, got in failures:
+        print(f"  {entity!r}: expected {expected}, got {got}")
+    return not failures
+
+
+def llm_calls() -> float:
+    return sum(
+        float(line.rsplit(" ", 1)[1]) for line in metrics.LLM_CALLS.render()
+        if not line.startswith("#")
+    )
+
+
+def run(local_verify: bool) -> dict:
+    Config.NER_LOCAL_VERIFY = local_verify
+    chain = MedicalNERChain(mode="thorough")
+    conversations = [
+        f"{SAMPLE_CONVERSATION.strip()}\n\nPhysician: Reference {local_verify}-{i}." for i in range(REQUESTS)
+    ]
+    calls = llm_calls()
+    local = metrics.NER_VERIFICATIONS.value(method="local")
+
+    def timed(conversation):
+        start = time.perf_counter()
+        result = chain.process(conversation)
+        return time.perf_counter() - start, not result.get("error")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        results = list(pool.map(timed, conversations))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "ok": sum(ok for _, ok in results),
+        "rps": REQUESTS / elapsed,
+        "p50": statistics.median(seconds for seconds, _ in results),
+        "calls": (llm_calls() - calls) / REQUESTS,
+        "local": metrics.NER_VERIFICATIONS.value(method="local") - local,
+    }
+
+
+def normalize_cost(iterations: int = 2000) -> float:
+    """Microseconds per normalize_entities() call on the sample consultation"""
+    conversation = SAMPLE_CONVERSATION.strip()
+    entities = {
+        "Symptoms": ["neck pain", "back pain", "Trouble sleeping", "whiplash"],
+        "Treatment": ["10 physiotherapy sessions", "painkillers"],
+        "Diagnosis": ["whiplash injury"],
+        "Prognosis": ["full recovery within six months"],
+    }
+    normalize_entities(entities, conversation)  # Build the transcript index once
+    start = time.perf_counter()
+    for _ in range(iterations):
+        normalize_entities(entities, conversation)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    if not check_matches():
+        print("❌ Entity matching accepted or rejected the wrong terms")
+        sys.exit(1)
+
+    print(f"{REQUESTS} requests, concurrency {CONCURRENCY}, {'live provider' if LIVE else 'fake LLM'}")
+    rows = {"llm verify": run(False), "local verify": run(True)}
+
+    print(f"{'mode':<13} {'ok':>4} {'req/s':>7} {'p50 (s)':>8} {'calls/req':>10} {'local':>6}")
+    for mode, r in rows.items():
+        print(f"{mode:<13} {r['ok']:>4} {r['rps']:>7.2f} {r['p50']:>8.3f} {r['calls']:>10.2f} {r['local']:>6.0f}")
+
+    before, after = rows["llm verify"], rows["local verify"]
+    if before["rps"]:
+        print(f"\nLocal verification: {100 * (after['rps'] / before['rps'] - 1):+.0f}% throughput, "
+              f"{before['calls'] - after['calls']:.2f} fewer LLM calls per request")
+    print(f"normalize_entities(): {normalize_cost():.1f} µs per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-update latency of a live session versus re-posting the whole transcript.
+
+Run from the physician-notetaker directory with GROQ_API_KEY set:
+    python -m benchmarks.bench_live_session [updates]
+
+Replays the sample consultation (repeated as needed) two turns at a time.
+"repost" runs all chains over the transcript so far, as the front end did
+before sessions; "session" sends only the new turns through
+src.session.apply_turns(). Pass --fake to use the local fake Groq server,
+whose latency grows with prompt size. The result cache is bypassed.
+"""
+import os
+import sys
+import time
+
+FAKE = "--fake" in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+UPDATES = int(args[0]) if args else 24
+TURNS_PER_UPDATE = 2
+
+if FAKE:
+    from benchmarks.fake_groq_server import start_server
+
+    server, _ = start_server(latency=0.3, latency_per_1k=0.4)
+    os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from main import SAMPLE_CONVERSATION
+from src.config import Config
+from src.pipeline import run_chains
+from src.session import apply_turns, new_session_state, split_turns
+
+Config.CACHE_ENABLED = False
+
+
+def main():
+    sample = split_turns(SAMPLE_CONVERSATION)
+    turns = (sample * (UPDATES * TURNS_PER_UPDATE // len(sample) + 1))[:UPDATES * TURNS_PER_UPDATE]
+
+    state = new_session_state()
+    print(f"{'update':>6} {'turns':>6} {'repost (s)':>11} {'session (s)':>12}")
+    for update in range(UPDATES):
+        new_turns = "\n".join(turns[update * TURNS_PER_UPDATE:(update + 1) * TURNS_PER_UPDATE])
+
+        start = time.perf_counter()
+        run_chains("\n".join(turns[:(update + 1) * TURNS_PER_UPDATE]), timeout=600)
+        repost = time.perf_counter() - start
+
+        start = time.perf_counter()
+        state, _, soap_regenerated = apply_turns(state, new_turns)
+        session = time.perf_counter() - start
+
+        note = "  (SOAP regenerated)" if soap_regenerated else ""
+        print(f"{update + 1:>6} {state['turn_count']:>6} {repost:>11.2f} {session:>12.2f}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Latency versus transcript length, single pass against chunked map-reduce.
+
+Run from the physician-notetaker directory with GROQ_API_KEY set:
+    python -m benchmarks.bench_long_transcripts [max_repeats]
+
+Builds transcripts of 1, 2, 4 ... max_repeats copies of the sample
+consultation and times run_chains() on each, once with chunking disabled
+and once with the configured LONG_TRANSCRIPT_TOKENS threshold. Pass --fake
+to run against the local fake Groq server instead, with latency that grows
+with prompt size. The result cache is bypassed.
+"""
+import os
+import sys
+import time
+
+FAKE = "--fake" in sys.argv
+args = [arg for arg in sys.argv[1:] if arg != "--fake"]
+MAX_REPEATS = int(args[0]) if args else 32
+
+if FAKE:
+    from benchmarks.fake_groq_server import start_server
+
+    server, _ = start_server(latency=0.3, latency_per_1k=0.4)
+    os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from main import SAMPLE_CONVERSATION
+from src.config import Config
+from src.pipeline import run_chains
+from src.utils.chunking import split_transcript
+from src.utils.rate_limiter import estimate_tokens
+
+Config.CACHE_ENABLED = False
+
+
+def timed_run(conversation: str, threshold: int):
+    Config.LONG_TRANSCRIPT_TOKENS = threshold
+    start = time.perf_counter()
+    results = run_chains(conversation, timeout=600)
+    errors = sum(1 for result in results.values() if result.get("error"))
+    return time.perf_counter() - start, errors
+
+
+def main():
+    threshold = Config.LONG_TRANSCRIPT_TOKENS
+    print(f"Chunk threshold {threshold} tokens, chunks of {Config.CHUNK_TOKENS}")
+    print(f"{'repeats':>7} {'tokens':>8} {'chunks':>6} {'single (s)':>11} {'chunked (s)':>12}")
+
+    repeats = 1
+    while repeats <= MAX_REPEATS:
+        conversation = "\n\n".join([SAMPLE_CONVERSATION.strip()] * repeats)
+        tokens = estimate_tokens(conversation)
+        chunks = len(split_transcript(conversation)) if tokens > threshold else 1
+
+        single, single_errors = timed_run(conversation, 0)
+        chunked, chunked_errors = timed_run(conversation, threshold)
+        note = f"  errors: single {single_errors}, chunked {chunked_errors}" if single_errors or chunked_errors else ""
+        print(f"{repeats:>7} {tokens:>8} {chunks:>6} {single:>11.2f} {chunked:>12.2f}{note}")
+        repeats *= 2
+
+    Config.LONG_TRANSCRIPT_TOKENS = threshold
+
+
+if __name__ == "__main__":
+    main()
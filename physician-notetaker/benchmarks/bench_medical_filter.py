@@ -0,0 +1,175 @@
+"""
+Precision, recall and latency of the local medical/non-medical pre-filter.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_medical_filter [samples_per_class]
+
+Builds a seeded synthetic labelled corpus of clinical dialogues, everyday
+dialogues and free text that mentions health in passing, plus hand-written
+medical inputs in plain language that use no lexicon term or clinical
+speaker tag, then checks that every label the filter commits to is right.
+Undecided inputs go to the LLM, so they count against coverage (recall),
+not precision. Exits non-zero when precision drops below MIN_PRECISION,
+recall below MIN_RECALL, p99 latency above MAX_P99_US, or any plain-language
+medical input is labelled NON_MEDICAL. chat/tests.py runs the same checks.
+"""
+import random
+import sys
+import time
+from main import SAMPLE_CONVERSATION
+from src.utils.medical_filter import classify_conversation, MEDICAL, NON_MEDICAL
+
+MIN_PRECISION = 0.99
+MIN_RECALL = {MEDICAL: 0.8, NON_MEDICAL: 0.75}  # Share of each class decided locally
+MAX_P99_US = 1000
+
+SYMPTOMS = ["neck pain", "a headache", "back pain", "dizziness", "nausea", "a fever", "a cough",
+            "chest pain", "stiffness in my knee", "trouble sleeping", "a rash", "fatigue"]
+TREATMENTS = ["physiotherapy", "ibuprofen", "antibiotics", "an inhaler", "painkillers",
+              "a course of steroids", "an MRI", "blood tests", "a follow-up appointment"]
+DIAGNOSES = ["a sprain", "whiplash", "an infection", "asthma", "migraine", "arthritis",
+             "high blood pressure", "bronchitis"]
+DURATIONS = ["two days", "a week", "three weeks", "a month", "since the accident"]
+
+TOPICS = [
+    ("Customer", "Agent", ["my order has not arrived yet", "the invoice shows the wrong amount",
+                            "I want to change my delivery address", "the package was damaged"]),
+    ("Guest", "Receptionist", ["I would like to book a double room", "is breakfast included",
+                                "can I check out later on Sunday", "the wifi in my room is slow"]),
+    ("User", "Support", ["my laptop will not connect to the printer", "I forgot my password",
+                         "the app crashes when I upload photos", "my screen keeps flickering"]),
+    ("Coach", "Player", ["we need to work on passing drills", "the match starts at seven",
+                         "bring your boots on Saturday", "great effort in the second half"]),
+]
+# Medical, but in the patient's own words: no lexicon terms, no speaker tags
+LAY_MEDICAL = [
+    "I twisted my knee yesterday and now it's swollen",
+    "He keeps throwing up and his tummy hurts",
+    "I think I broke my wrist",
+    "chemo schedule for next week is out, I feel sick just thinking about it",
+    "My daughter fell off her bike and her elbow looks wrong",
+    "I've been so tired lately and I get out of breath on the stairs",
+    "Mum fainted in the kitchen this morning, she's awake now but confused",
+    "There's a lump under my arm that wasn't there last month",
+    "My ankle went over on the kerb and I can't put weight on it",
+    "I burned my hand on the oven and it's blistering",
+    "Can I take my blood pressure pills with grapefruit juice?",
+    "The baby has had a runny nose and won't eat",
+    "I hurt my back lifting the package at work and now I can't bend over",
+    "I missed my flight because my ear was killing me and I couldn't hear",
+    "Every time I eat my belly bloats up and I'm up all night",
+    "My gums bleed when I brush my teeth",
+    "I've got a cut on my foot from the beach and it's going red",
+    "She's pregnant and has been getting bad heartburn",
+    "A: How are you feeling today?\nB: Not great, my chest feels tight and I keep coughing up stuff.",
+    "Caller: My dad can't lift his left arm and his face looks droopy.\nOperator: Stay with him, help is on the way.",
+]
+
+REPLIES = ["Let me check that for you.", "Thanks for letting me know.", "Sure, give me a moment.",
+           "I can sort that out today.", "That should be fixed now."]
+CASUAL_HEALTH = ["Traffic this morning was a real pain.", "My brother has the flu so he stayed home.",
+                 "I need to pick up some medicine for the dog.", "The gym was packed after work."]
+
+
+def medical_dialogue(rng):
+    symptom, treatment, diagnosis = rng.choice(SYMPTOMS), rng.choice(TREATMENTS), rng.choice(DIAGNOSES)
+    doctor = rng.choice(["Physician", "Doctor", "Dr. Patel"])
+    lines = [
+        f"{doctor}: Good morning, what brings you in today?",
+        f"Patient: I've had {symptom} for {rng.choice(DURATIONS)}.",
+        f"{doctor}: Any other symptoms?",
+        f"Patient: Some {rng.choice(SYMPTOMS)} as well.",
+        f"{doctor}: After the examination, this looks like {diagnosis}.",
+        f"{doctor}: I'd recommend {treatment} and we'll review your recovery.",
+        "Patient: Thank you, doctor.",
+    ]
+    return "\n\n".join(lines)
+
+
+def everyday_dialogue(rng):
+    left, right, subjects = rng.choice(TOPICS)
+    lines = []
+    for _ in range(rng.randint(3, 6)):
+        lines.append(f"{left}: Hi, {rng.choice(subjects)}.")
+        lines.append(f"{right}: {rng.choice(REPLIES)}")
+    if rng.random() < 0.3:
+        lines.append(f"{left}: {rng.choice(CASUAL_HEALTH)}")
+    return "\n".join(lines)
+
+
+def build_corpus(samples: int, seed: int = 7):
+    rng = random.Random(seed)
+    corpus = [(SAMPLE_CONVERSATION, MEDICAL)]
+    corpus += [(medical_dialogue(rng), MEDICAL) for _ in range(samples)]
+    corpus += [(everyday_dialogue(rng), NON_MEDICAL) for _ in range(samples)]
+    corpus += [(text, MEDICAL) for text in LAY_MEDICAL]
+    rng.shuffle(corpus)
+    return corpus
+
+
+def evaluate(corpus) -> dict:
+    """Per-label precision, recall and undecided count, plus p50/p99 latency in microseconds"""
+    counts = {(truth, label): 0 for truth in (MEDICAL, NON_MEDICAL) for label in (MEDICAL, NON_MEDICAL, None)}
+    latencies = []
+    for text, truth in corpus:
+        start = time.perf_counter()
+        label = classify_conversation(text).label
+        latencies.append(time.perf_counter() - start)
+        counts[(truth, label)] += 1
+
+    scores = {}
+    for label in (MEDICAL, NON_MEDICAL):
+        other = NON_MEDICAL if label == MEDICAL else MEDICAL
+        true_pos = counts[(label, label)]
+        false_pos = counts[(other, label)]
+        total = sum(counts[(label, decided)] for decided in (MEDICAL, NON_MEDICAL, None))
+        scores[label] = {
+            "precision": true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0,
+            "recall": true_pos / total if total else 0.0,
+            "undecided": counts[(label, None)],
+        }
+    latencies.sort()
+    scores["p50_us"] = latencies[len(latencies) // 2] * 1e6
+    scores["p99_us"] = latencies[int(len(latencies) * 0.99)] * 1e6
+    return scores
+
+
+def rejected_lay_inputs() -> list:
+    return [text for text in LAY_MEDICAL if classify_conversation(text).label == NON_MEDICAL]
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    corpus = build_corpus(samples)
+    scores = evaluate(corpus)
+
+    print(f"Corpus: {len(corpus)} conversations")
+    failures = []
+    for label in (MEDICAL, NON_MEDICAL):
+        score = scores[label]
+        print(f"{label:<12} precision {score['precision']:.4f}  recall {score['recall']:.4f}  "
+              f"(sent to LLM: {score['undecided']})")
+        if score["precision"] < MIN_PRECISION:
+            failures.append(f"{label} precision below {MIN_PRECISION}")
+        if score["recall"] < MIN_RECALL[label]:
+            failures.append(f"{label} recall below {MIN_RECALL[label]}")
+
+    rejected = rejected_lay_inputs()
+    print(f"Plain-language medical inputs rejected: {len(rejected)}/{len(LAY_MEDICAL)}")
+    for text in rejected:
+        print(f"  {text!r}")
+    if rejected:
+        failures.append("plain-language medical input labelled NON_MEDICAL")
+
+    print(f"Latency      p50 {scores['p50_us']:.0f} us  p99 {scores['p99_us']:.0f} us")
+    if scores["p99_us"] > MAX_P99_US:
+        failures.append(f"p99 latency above {MAX_P99_US} us")
+
+    for failure in failures:
+        print(f"❌ {failure.capitalize()}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare the "fast" (single JSON-mode call) and "thorough" (three calls) NER modes.
+
+Run from the physician-notetaker directory with GROQ_API_KEY set:
+    python -m benchmarks.bench_ner_modes [runs]
+
+Uses the sample transcript from main.py and reports LLM calls, prompt and
+completion tokens, and wall-clock latency per mode. The result cache is
+bypassed so every run reaches the provider.
+"""
+import statistics
+import sys
+import time
+from main import SAMPLE_CONVERSATION
+from src.chains.ner_chain import MedicalNERChain, NER_MODES
+from src.utils.usage import TokenUsageCallback
+
+
+def run_mode(mode: str, runs: int) -> dict:
+    chain = MedicalNERChain(mode=mode)
+    runnable = chain.get_runnable()
+    counter = TokenUsageCallback()
+    latencies = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        runnable.invoke({"conversation": SAMPLE_CONVERSATION}, config={"callbacks": [counter]})
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        "calls": counter.calls / runs,
+        "prompt_tokens": counter.prompt_tokens / runs,
+        "completion_tokens": counter.completion_tokens / runs,
+        "latency_median": statistics.median(latencies),
+        "latency_max": max(latencies),
+    }
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    results = {mode: run_mode(mode, runs) for mode in NER_MODES}
+
+    print(f"{'mode':<10} {'calls':>6} {'prompt tok':>11} {'compl tok':>10} {'median s':>9} {'max s':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['calls']:>6.1f} {r['prompt_tokens']:>11.0f} {r['completion_tokens']:>10.0f} "
+              f"{r['latency_median']:>9.2f} {r['latency_max']:>7.2f}")
+
+    fast, thorough = results["fast"], results["thorough"]
+    total_fast = fast["prompt_tokens"] + fast["completion_tokens"]
+    total_thorough = thorough["prompt_tokens"] + thorough["completion_tokens"]
+    if total_thorough and thorough["latency_median"]:
+        print(f"\nfast mode uses {100 * (1 - total_fast / total_thorough):.0f}% fewer tokens and "
+              f"{100 * (1 - fast['latency_median'] / thorough['latency_median']):.0f}% less time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prompt size per LLM stage for the sample consultation.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_prompt_tokens          # offline estimate (4 chars/token)
+    python -m benchmarks.bench_prompt_tokens --live   # provider-reported tokens, needs GROQ_API_KEY
+
+The offline mode formats every prompt template with the sample transcript,
+as received and after normalization, and reports each prompt's size, the
+instruction overhead (the part that is not the transcript) and the tokens
+per request for both NER modes. Sentiment analysis is sent the patient's
+turns only. Every other prompt starts with the same conversation prefix,
+so after the first of those calls in a request that part can be served
+from the provider's prompt cache; the "uncached" column is what is left. --live runs each chain once with the cache off and reads the prompt,
+cached and completion tokens the provider reported per stage.
+"""
+import json
+import sys
+from main import SAMPLE_CONVERSATION
+from src.chains.sentiment_chain import SentimentAnalysisChain
+from src.fake_llm import CANNED_NER
+from src.prompts.common import CONVERSATION_PREFIX
+from src.prompts.ner_prompts import (
+    MEDICAL_VALIDATOR_PROMPT,
+    NER_EXTRACTION_PROMPT,
+    NER_VALIDATOR_PROMPT,
+    NER_SINGLE_PASS_PROMPT
+)
+from src.prompts.sentiment_prompts import SENTIMENT_ANALYSIS_PROMPT
+from src.prompts.soap_prompts import SOAP_NOTE_PROMPT
+from src.utils.rate_limiter import estimate_tokens
+from src.utils.transcript import normalize_transcript
+
+STAGES = {
+    "ner.validate": (MEDICAL_VALIDATOR_PROMPT, {}),
+    "ner.extract": (NER_EXTRACTION_PROMPT, {}),
+    "ner.verify": (NER_VALIDATOR_PROMPT, {"extracted_data": json.dumps(CANNED_NER)}),
+    "ner.single_pass": (NER_SINGLE_PASS_PROMPT, {}),
+    "sentiment": (SENTIMENT_ANALYSIS_PROMPT, {}),
+    "soap": (SOAP_NOTE_PROMPT, {}),
+}
+
+
+MODES = {
+    "thorough": ("ner.validate", "ner.extract", "ner.verify", "sentiment", "soap"),
+    "fast": ("ner.single_pass", "sentiment", "soap"),
+}
+
+
+# Stages sent a transcript other than the whole dialogue
+SELECTED_TURNS = {"sentiment": SentimentAnalysisChain.prepare}
+
+
+def prompt_sizes(conversation: str, selected: bool = False) -> dict:
+    """Estimated prompt tokens per stage for one transcript"""
+    return {
+        stage: estimate_tokens(prompt.format(
+            conversation=SELECTED_TURNS[stage](conversation) if selected and stage in SELECTED_TURNS else conversation,
+            **extra
+        ))
+        for stage, (prompt, extra) in STAGES.items()
+    }
+
+
+def offline():
+    normalized = normalize_transcript(SAMPLE_CONVERSATION)
+    raw_tokens, sent_tokens = estimate_tokens(SAMPLE_CONVERSATION), estimate_tokens(normalized)
+    print(f"Transcript: ~{raw_tokens} tokens as received, ~{sent_tokens} normalized "
+          f"({raw_tokens - sent_tokens} saved, {(raw_tokens - sent_tokens) / raw_tokens:.0%})")
+
+    patient_tokens = estimate_tokens(SentimentAnalysisChain.prepare(SAMPLE_CONVERSATION))
+    print(f"Patient turns only (sentiment): ~{patient_tokens} tokens")
+
+    raw, sent = prompt_sizes(SAMPLE_CONVERSATION), prompt_sizes(normalized, selected=True)
+    print(f"{'stage':<16} {'raw':>6} {'normalized':>11} {'overhead':>9}")
+    for stage in STAGES:
+        transcript_tokens = patient_tokens if stage in SELECTED_TURNS else sent_tokens
+        print(f"{stage:<16} {raw[stage]:>6} {sent[stage]:>11} {sent[stage] - transcript_tokens:>9}")
+
+    # Tokens of the shared conversation prefix, reusable by every call after the first
+    prefix = estimate_tokens(CONVERSATION_PREFIX.format(conversation=normalized))
+    print(f"\nShared conversation prefix: ~{prefix} tokens")
+    print(f"{'mode':<9} {'raw':>6} {'normalized':>11} {'uncached':>9} {'reduction':>10}")
+    for mode, stages in MODES.items():
+        raw_total = sum(raw[stage] for stage in stages)
+        sent_total = sum(sent[stage] for stage in stages)
+        shared = [stage for stage in stages if stage not in SELECTED_TURNS]
+        uncached = sent_total - prefix * (len(shared) - 1)
+        print(f"{mode:<9} {raw_total:>6} {sent_total:>11} {uncached:>9} {1 - uncached / raw_total:>10.0%}")
+
+
+def live():
+    from src import metrics
+    from src.config import Config
+    from src.pipeline import run_chains
+
+    Config.CACHE_ENABLED = False
+    run_chains(SAMPLE_CONVERSATION)
+
+    print(f"{'stage':<16} {'prompt':>8} {'cached':>7} {'completion':>11}")
+    for stage in STAGES:
+        prompt = metrics.LLM_TOKENS.value(stage=stage, kind="prompt")
+        cached = metrics.LLM_TOKENS.value(stage=stage, kind="cached")
+        completion = metrics.LLM_TOKENS.value(stage=stage, kind="completion")
+        if prompt or completion:
+            print(f"{stage:<16} {prompt:>8g} {cached:>7g} {completion:>11g}")
+    raw = metrics.TRANSCRIPT_TOKENS.value(kind="raw")
+    sent = metrics.TRANSCRIPT_TOKENS.value(kind="sent")
+    print(f"Transcript tokens: {raw:g} as received, {sent:g} sent")
+
+
+if __name__ == "__main__":
+    live() if "--live" in sys.argv else offline()
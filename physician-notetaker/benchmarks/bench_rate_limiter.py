@@ -0,0 +1,77 @@
+"""
+Behaviour under provider throttling, against the local fake Groq server.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_rate_limiter [calls] [server_rpm]
+
+Fires `calls` concurrent completions at a fake API that allows `server_rpm`
+requests/min, first with a plain ChatGroq (no client-side limiting or
+retries), then with the shared rate-limited client. Reports successes,
+429s received and wall time for each. The default burst is larger than the
+server's budget, so the plain client must get 429s; the run exits non-zero
+unless it does and the rate-limited client finishes every call.
+"""
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_groq_server import start_server
+
+CALLS = int(sys.argv[1]) if len(sys.argv) > 1 else 150
+SERVER_RPM = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+
+server, state = start_server(rpm=SERVER_RPM, latency=0.05)
+os.environ["GROQ_API_BASE"] = f"http://127.0.0.1:{server.server_port}"
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from langchain_groq import ChatGroq
+from src.config import Config
+
+# Client budget just under the server's, shared through a throwaway store
+Config.LLM_RPM_LIMIT = int(SERVER_RPM * 0.9)
+Config.RATE_LIMIT_STORE = os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite3")
+
+from src.llm import create_llm
+
+
+def run(llm, label):
+    # Start each run with a full server-side budget
+    state.requests = state.throttled = 0
+    state.tokens = float(SERVER_RPM)
+
+    def call(i):
+        try:
+            llm.invoke(f"Patient {i}: my neck hurts. Return JSON.")
+            return True
+        except Exception:
+            return False
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CALLS) as pool:
+        ok = sum(pool.map(call, range(CALLS)))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<14} ok {ok:>3}/{CALLS}  failed {CALLS - ok:>3}  "
+          f"429s {state.throttled:>4}  server requests {state.requests:>4}  {elapsed:6.1f}s")
+    return {"failed": CALLS - ok, "throttled": state.throttled}
+
+
+def main():
+    print(f"{CALLS} concurrent calls, server limit {SERVER_RPM} rpm")
+    plain = run(ChatGroq(model_name=Config.GROQ_MODEL, max_retries=0), "plain ChatGroq")
+    limited = run(create_llm(), "rate-limited")
+    server.shutdown()
+
+    ok = True
+    if CALLS > SERVER_RPM and not plain["throttled"]:
+        print("❌ The plain client was never throttled; the burst did not exceed the server's budget")
+        ok = False
+    if limited["failed"]:
+        print(f"❌ The rate-limited client failed {limited['failed']} call(s)")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Check that identical concurrent analyses share one run per chain.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_single_flight [duplicates] [workers]
+
+Uses the offline fake LLM in fast NER mode, so one analysis makes exactly
+one LLM call per chain. First fires `duplicates` identical requests from
+threads in one process, then from `workers` separate processes sharing a
+persistent cache (as gunicorn workers would), and counts the LLM calls per
+stage. Each phase gets its own transcript, with the difference in a patient
+turn so that every chain (sentiment only sees the patient) misses the
+cache. Exits non-zero unless every stage was called exactly once.
+"""
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+DUPLICATES = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+# Spawned workers re-import this module; they must share the parent's directory
+if "SINGLEFLIGHT_BENCH_DIR" not in os.environ:
+    os.environ["SINGLEFLIGHT_BENCH_DIR"] = tempfile.mkdtemp(prefix="singleflight-")
+_tmp = os.environ["SINGLEFLIGHT_BENCH_DIR"]
+os.environ.update({
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY": "0.5",
+    "NER_MODE": "fast",
+    "CACHE_SQLITE_PATH": os.path.join(_tmp, "cache.sqlite3"),
+    "SINGLEFLIGHT_LOCK_DIR": os.path.join(_tmp, "locks"),
+})
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+
+from main import SAMPLE_CONVERSATION
+from src import metrics
+from src.pipeline import run_chains
+
+_STAGE = re.compile(r'stage="([^"]+)"')
+EXPECTED_STAGES = ("ner.single_pass", "sentiment", "soap")  # One call each in fast NER mode
+
+
+def llm_calls() -> dict:
+    """LLM calls so far in this process, by stage"""
+    calls = {}
+    for line in metrics.LLM_CALLS.render():
+        match = _STAGE.search(line)
+        if match and not line.startswith("#"):
+            calls[match.group(1)] = calls.get(match.group(1), 0) + float(line.rsplit(" ", 1)[1])
+    return calls
+
+
+def delta(before: dict, after: dict) -> dict:
+    return {stage: after[stage] - before.get(stage, 0) for stage in after if after[stage] != before.get(stage, 0)}
+
+
+def fire(conversation: str, count: int) -> list:
+    """Run count identical analyses at once from threads; returns their error counts"""
+    barrier = threading.Barrier(count)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        results = run_chains(conversation)
+        errors.append(sum(1 for result in results.values() if result.get("error")))
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def process_worker(conversation, count, barrier, queue):
+    before = llm_calls()
+    barrier.wait()
+    errors = fire(conversation, count)
+    queue.put((delta(before, llm_calls()), sum(errors)))
+
+
+def unique_transcript() -> str:
+    return f"{SAMPLE_CONVERSATION.strip()}\n\nPatient: My reference number is {uuid.uuid4().hex}."
+
+
+def report(label: str, calls: dict, errors: int, elapsed: float) -> bool:
+    ok = calls == {stage: 1 for stage in EXPECTED_STAGES} and not errors
+    stages = ", ".join(f"{stage}={count:g}" for stage, count in sorted(calls.items()))
+    print(f"{label}: {stages or 'no calls'}; errors {errors}; {elapsed:.2f}s -> {'PASS' if ok else 'FAIL'}")
+    return ok
+
+
+def main():
+    print(f"{DUPLICATES} duplicate requests, {WORKERS} worker processes")
+
+    before = llm_calls()
+    start = time.perf_counter()
+    errors = fire(unique_transcript(), DUPLICATES)
+    ok = report("threads, one process", delta(before, llm_calls()), sum(errors), time.perf_counter() - start)
+
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(WORKERS)
+    queue = context.Queue()
+    conversation = unique_transcript()
+    per_worker = max(1, DUPLICATES // WORKERS)
+    processes = [
+        context.Process(target=process_worker, args=(conversation, per_worker, barrier, queue))
+        for _ in range(WORKERS)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    totals, errors = {}, 0
+    for _ in processes:
+        calls, worker_errors = queue.get()
+        errors += worker_errors
+        for stage, count in calls.items():
+            totals[stage] = totals.get(stage, 0) + count
+    for process in processes:
+        process.join()
+    ok = report(f"{WORKERS} processes x {per_worker} threads", totals, errors, time.perf_counter() - start) and ok
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
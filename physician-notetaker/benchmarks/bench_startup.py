@@ -0,0 +1,88 @@
+"""
+Worker start-up and management-command cost.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_startup [runs]
+
+Each measurement runs in a fresh interpreter, `runs` times, and reports the
+median wall time:
+- django.setup() alone, what every manage.py command pays;
+- loading the URLconf, which a worker does on its first request and
+  `manage.py check`/`migrate` do through the system checks;
+- the first analysis on the fake LLM, where the chain modules are imported;
+- src.startup.preload(), what the gunicorn master does with GUNICORN_PRELOAD;
+- `manage.py check` and `manage.py migrate` end to end (migrate against the
+  configured database; after the first run there is nothing to apply).
+
+It also lists which heavy third-party packages (langchain, langchain_groq,
+groq, httpx) are loaded after the URLconf import. With deferred imports
+they only appear once a chain runs.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY = ("langchain", "langchain_core", "langchain_groq", "groq", "httpx", "langchain_text_splitters")
+
+SETUP = "import django; django.setup()"
+SNIPPETS = {
+    "django.setup()": SETUP,
+    "URLconf": SETUP + "; import chatbot_project.urls",
+    "preload()": SETUP + "; from src.startup import preload; preload()",
+    "first analysis": SETUP + "; import chatbot_project.urls; from chat.views import analyze_medical_conversation; "
+                      "from main import SAMPLE_CONVERSATION; from src.config import Config; "
+                      "Config.CACHE_ENABLED = False; Config.ANALYSIS_STORE_ENABLED = False; "
+                      "analyze_medical_conversation(SAMPLE_CONVERSATION)",
+}
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "chatbot_project.settings",
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "fake-key"),
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY": "0",
+    })
+    return env
+
+
+def timed(command, env, runs: int) -> float:
+    """Median seconds for a fresh process to run `command`"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def loaded_after_urlconf(env) -> list:
+    code = SETUP + "; import sys, json; import chatbot_project.urls; " \
+                   f"print(json.dumps([name for name in {HEAVY!r} if name in sys.modules]))"
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    env = _env()
+    rows = {
+        "python": timed([sys.executable, "-c", "pass"], env, runs),
+        **{name: timed([sys.executable, "-c", code], env, runs) for name, code in SNIPPETS.items()},
+        "manage.py check": timed([sys.executable, "manage.py", "check"], env, runs),
+        "manage.py migrate": timed([sys.executable, "manage.py", "migrate", "--noinput"], env, runs),
+    }
+    heavy = loaded_after_urlconf(env)
+
+    print(f"{'step':<20} {'median s':>9}")
+    for name, seconds in rows.items():
+        print(f"{name:<20} {seconds:>9.3f}")
+    print(f"\nLoaded after the URLconf import: {', '.join(heavy) if heavy else 'none of ' + ', '.join(HEAVY)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Speaker-aware transcript parsing on multi-megabyte input.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_transcript_parser [runs]
+
+Builds transcripts of roughly 0.1, 1, 4 and 16 MB from copies of the sample
+consultation and times parse_turns() (split into Turn records),
+select_turns() for the patient's turns on an already parsed transcript,
+and normalize_transcript() (every turn, pleasantries dropped). The lru
+caches are bypassed so every run parses from scratch. Also reports the
+tokens each chain is sent for the sample: the whole dialogue for NER and
+SOAP, the patient's turns for sentiment.
+
+First it checks normalize_transcript() against a regression corpus of turns
+that must keep their clinical content, and exits non-zero on a mismatch.
+"""
+import statistics
+import sys
+import time
+from main import SAMPLE_CONVERSATION
+from src.chains.sentiment_chain import SentimentAnalysisChain
+from src.utils.rate_limiter import estimate_tokens
+from src.utils.transcript import parse_turns, select_turns, normalize_transcript, render_turns
+
+SIZES_MB = (0.1, 1, 4, 16)
+
+# Turn -> normalized output: only a sentence that is nothing but a pleasantry
+# (with an optional form of address) is dropped
+PLEASANTRY_CASES = [
+    ("Patient: Hi, I have severe chest pain.", "Patient: Hi, I have severe chest pain."),
+    ("Patient: Thank you, it hurts when I breathe.", "Patient: Thank you, it hurts when I breathe."),
+    ("Physician: Good morning, did you take aspirin.", "Physician: Good morning, did you take aspirin."),
+    ("Physician: Hi Dr. Patel, thanks for coming.", "Physician: Hi Dr. Patel, thanks for coming."),
+    ("Physician: Take care of the wound by cleaning it daily.", "Physician: Take care of the wound by cleaning it daily."),
+    ("Patient: Hello there. My knee is swollen.", "Patient: My knee is swollen."),
+    ("Physician: Good morning, Ms. Jones. What brings you in?", "Physician: What brings you in?"),
+    ("Patient: Thank you, doctor.", ""),
+    ("Patient: Thanks so much!", ""),
+    ("Physician: You're welcome, Mr. Smith.", ""),
+    ("Physician: Take care.", ""),
+    ("Patient: Bye now, doctor.", ""),
+]
+
+
+def timed(fn, runs: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def transcript_of(megabytes: float) -> str:
+    block = SAMPLE_CONVERSATION.strip() + "\n\n[Physical Examination Conducted]\n\n"
+    return block * max(1, int(megabytes * 1_000_000 / len(block)))
+
+
+def check_pleasantries() -> bool:
+    failures = [
+        (turn, expected, normalize_transcript.__wrapped__(turn))
+        for turn, expected in PLEASANTRY_CASES
+        if normalize_transcript.__wrapped__(turn) != expected
+    ]
+    print(f"Pleasantry corpus: {len(PLEASANTRY_CASES) - len(failures)}/{len(PLEASANTRY_CASES)} as expected")
+    for turn, expected, got in failures:
+        print(f"  {turn!r}: expected {expected!r}, got {got!r}")
+    return not failures
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    roles = SentimentAnalysisChain.speakers
+    if not check_pleasantries():
+        print("❌ Normalization dropped or kept the wrong sentences")
+        sys.exit(1)
+
+    print(f"{'size':>8} {'turns':>8} {'parse ms':>9} {'MB/s':>6} {'select ms':>10} {'normalize ms':>13}")
+    for megabytes in SIZES_MB:
+        conversation = transcript_of(megabytes)
+        size = len(conversation) / 1_000_000
+        turns = parse_turns.__wrapped__(conversation)
+        parse_ms = timed(lambda: parse_turns.__wrapped__(conversation), runs)
+        select_ms = timed(lambda: render_turns([turn for turn in turns if turn.role in roles]), runs)
+        normalize_ms = timed(lambda: normalize_transcript.__wrapped__(conversation), max(1, runs // 2))
+        print(f"{size:>6.1f}MB {len(turns):>8} {parse_ms:>9.1f} {size / (parse_ms / 1000):>6.0f} "
+              f"{select_ms:>10.1f} {normalize_ms:>13.1f}")
+
+    full = estimate_tokens(normalize_transcript(SAMPLE_CONVERSATION))
+    patient = estimate_tokens(select_turns(SAMPLE_CONVERSATION, roles, True))
+    print(f"\nSample transcript sent to NER/SOAP: ~{full} tokens; to sentiment: ~{patient} tokens "
+          f"({1 - patient / full:.0%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+First-request latency on a fresh worker, with and without warm-up.
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.bench_warmup [runs]
+
+Starts benchmarks.fake_groq_server, so requests go through the real ChatGroq
+client and its connection pool, then, `runs` times each, launches a fresh
+process that sets up Django and sends POST /api/quick/ three times:
+- cold: the first request imports the chains, builds the client and
+  connects;
+- warm-up with WARMUP_ANALYSIS off, local and llm: src.startup.warm_up()
+  runs first (what gunicorn's post_worker_init does), and its duration is
+  reported on its own.
+Reports the median latency of the first and third request. The fake server
+is local plain HTTP, so real DNS and TLS set-up would add to the cold
+numbers. Only "llm" makes a real provider call during warm-up, which also
+builds the client's response models ahead of the first request.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks.fake_groq_server import start_server
+
+CHILD = """
+import json, time, django
+django.setup()
+from django.test import Client
+from main import SAMPLE_CONVERSATION
+from src.config import Config
+Config.CACHE_ENABLED = False
+Config.ANALYSIS_STORE_ENABLED = False
+warm_up_seconds = None
+if {warm}:
+    from src.startup import warm_up
+    start = time.perf_counter()
+    warm_up()
+    warm_up_seconds = time.perf_counter() - start
+client, latencies = Client(), []
+for i in range(3):
+    body = json.dumps({{"conversation": SAMPLE_CONVERSATION + f"\\nPatient: Thanks ({{i}}).", "type": "all"}})
+    start = time.perf_counter()
+    response = client.post("/physician-notetaker/api/quick/", body, content_type="application/json")
+    assert response.status_code == 200, response.content
+    latencies.append(time.perf_counter() - start)
+print(json.dumps({{"warm_up": warm_up_seconds, "latencies": latencies}}))
+"""
+
+
+MODES = {"cold": None, "warm-up": "off", "+ local": "local", "+ llm": "llm"}  # Name -> WARMUP_ANALYSIS
+
+
+def run(env, analysis) -> dict:
+    env = dict(env, WARMUP_ANALYSIS=analysis or "off")
+    code = CHILD.format(warm=analysis is not None)
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    server, state = start_server(latency=0.05)
+    env = dict(os.environ)
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "chatbot_project.settings",
+        "GROQ_API_KEY": env.get("GROQ_API_KEY", "fake-key"),
+        "GROQ_API_BASE": f"http://127.0.0.1:{server.server_port}",
+        "LLM_PROVIDER": "groq",
+        "RATE_LIMIT_STORE": "",
+    })
+
+    print(f"{'worker':<9} {'warm-up s':>10} {'1st request s':>14} {'3rd request s':>14}")
+    for name, analysis in MODES.items():
+        results = [run(env, analysis) for _ in range(runs)]
+        warm_up = f"{statistics.median(r['warm_up'] for r in results):.3f}" if analysis else "-"
+        first = statistics.median(r["latencies"][0] for r in results)
+        third = statistics.median(r["latencies"][2] for r in results)
+        print(f"{name:<9} {warm_up:>10} {first:>14.3f} {third:>14.3f}")
+    print(f"\nFake API: {state.requests} chat requests")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
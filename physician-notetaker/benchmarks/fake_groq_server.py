@@ -0,0 +1,143 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+Speaks enough of the OpenAI-compatible protocol for ChatGroq (plain and
+streaming responses, usage reporting, the models list) and enforces its own requests/min
+limit, answering 429 with a Retry-After header once the budget is spent.
+Point the app at it with GROQ_API_BASE=http://127.0.0.1:<port>.
+
+    python -m benchmarks.fake_groq_server --port 8765 --rpm 60 --latency 0.2
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.fake_llm import canned_response
+
+
+class FakeGroqState:
+    """Server-side request budget and counters"""
+
+    def __init__(self, rpm: int, latency: float, latency_per_1k: float = 0.0):
+        self.rpm = rpm
+        self.latency = latency
+        self.latency_per_1k = latency_per_1k  # Extra seconds per 1k prompt tokens
+        self.tokens = float(rpm) if rpm else 0.0
+        self.updated_at = time.monotonic()
+        self.requests = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def admit(self) -> float:
+        """Return 0 to serve the request, or the Retry-After seconds for a 429"""
+        with self.lock:
+            self.requests += 1
+            if not self.rpm:
+                return 0.0
+            now = time.monotonic()
+            self.tokens = min(self.rpm, self.tokens + (now - self.updated_at) * self.rpm / 60)
+            self.updated_at = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            self.throttled += 1
+            return (1 - self.tokens) * 60 / self.rpm
+
+
+def make_handler(state: FakeGroqState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            # Models list, which the worker warm-up uses to open its connection pool
+            if not self.path.rstrip("/").endswith("/models"):
+                self._send_json(404, {"error": {"message": "Not found", "type": "invalid_request_error"}})
+                return
+            self._send_json(200, {"object": "list", "data": [
+                {"id": "llama-3.1-8b-instant", "object": "model", "created": 0, "owned_by": "fake", "active": True},
+            ]})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            retry_after = state.admit()
+            if retry_after:
+                self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                                "code": "rate_limit_exceeded"}},
+                                {"retry-after": f"{retry_after:.2f}"})
+                return
+
+            prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+            time.sleep(state.latency + state.latency_per_1k * len(prompt) / 4000)
+            content = canned_response(prompt)
+            usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+            base = {"id": "chatcmpl-fake", "created": int(time.time()), "model": request.get("model", "fake")}
+
+            if not request.get("stream"):
+                self._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [{
+                    "index": 0, "finish_reason": "stop", "logprobs": None,
+                    "message": {"role": "assistant", "content": content},
+                }]})
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            pieces = [content[i:i + 16] for i in range(0, len(content), 16)]
+            for i, piece in enumerate(pieces):
+                last = i == len(pieces) - 1
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [{
+                    "index": 0, "finish_reason": "stop" if last else None, "logprobs": None,
+                    "delta": {"role": "assistant", "content": piece},
+                }]}
+                if last:
+                    chunk["x_groq"] = {"id": "fake", "usage": usage}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    return Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # Bursts of concurrent clients are queued, not refused
+
+
+def start_server(port: int = 0, rpm: int = 0, latency: float = 0.0, latency_per_1k: float = 0.0):
+    """Start the fake API in a background thread; returns (server, state)"""
+    state = FakeGroqState(rpm, latency, latency_per_1k)
+    server = _Server(("127.0.0.1", port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=0, help="requests/min before answering 429 (0 = unlimited)")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--latency-per-1k", type=float, default=0.0, help="extra seconds per 1k prompt tokens")
+    args = parser.parse_args()
+
+    server, _ = start_server(args.port, args.rpm, args.latency, args.latency_per_1k)
+    print(f"Fake Groq API on http://127.0.0.1:{server.server_port} (rpm={args.rpm or 'unlimited'})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
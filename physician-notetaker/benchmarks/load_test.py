@@ -0,0 +1,72 @@
+"""
+Concurrency load test for a running server.
+
+Start the server in one mode, run the test, then repeat in the other mode:
+    SERVER_MODE=wsgi python /app/start.py     # gthread: 2 workers x 4 threads
+    SERVER_MODE=asgi python /app/start.py     # uvicorn workers, async views
+    python -m benchmarks.load_test --url http://localhost:7860/physician-notetaker/api/ \\
+        --concurrency 8 32 128 256
+
+Each level sends `concurrency` simultaneous requests and reports successes,
+failures, latency percentiles and throughput. The highest level that
+finishes with no failures is reported as the sustained concurrency limit.
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from main import SAMPLE_CONVERSATION
+
+
+async def one_request(client, url, payload):
+    start = time.perf_counter()
+    try:
+        response = await client.post(url, json=payload)
+        ok = response.status_code == 200 and response.json().get("success", False)
+    except (httpx.HTTPError, ValueError):
+        ok = False
+    return ok, time.perf_counter() - start
+
+
+async def run_level(url, concurrency, payload, timeout):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one_request(client, url, payload) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for ok, latency in results if ok)
+    failures = sum(1 for ok, _ in results if not ok)
+    return {
+        "concurrency": concurrency,
+        "ok": len(latencies),
+        "failed": failures,
+        "p50": latencies[len(latencies) // 2] if latencies else None,
+        "p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:7860/physician-notetaker/api/")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 16, 32, 64, 128])
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request (s)")
+    args = parser.parse_args()
+
+    payload = {"conversation": SAMPLE_CONVERSATION}
+    sustained = 0
+    print(f"{'conc':>6} {'ok':>6} {'failed':>7} {'p50 s':>8} {'p95 s':>8} {'req/s':>8}")
+    for concurrency in args.concurrency:
+        r = asyncio.run(run_level(args.url, concurrency, payload, args.timeout))
+        p50 = f"{r['p50']:.2f}" if r["p50"] is not None else "-"
+        p95 = f"{r['p95']:.2f}" if r["p95"] is not None else "-"
+        print(f"{r['concurrency']:>6} {r['ok']:>6} {r['failed']:>7} {p50:>8} {p95:>8} {r['throughput']:>8.2f}")
+        if r["failed"] == 0:
+            sustained = concurrency
+
+    print(f"\nSustained concurrency without failures: {sustained}")
+
+
+if __name__ == "__main__":
+    main()
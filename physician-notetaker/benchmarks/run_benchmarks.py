@@ -0,0 +1,158 @@
+"""
+End-to-end benchmark suite on the offline fake LLM (no network needed).
+
+Run from the physician-notetaker directory:
+    python -m benchmarks.run_benchmarks                           # print results
+    python -m benchmarks.run_benchmarks --save-baseline           # store benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --check                   # compare with the baseline
+
+Swaps ChatGroq for src.fake_llm.FakeChatModel (LLM_PROVIDER=fake) and
+measures throughput and p50/p95/p99 latency for analyze_medical_conversation,
+POST /api/ and POST /api/quick/ across concurrency levels and transcript
+sizes. Requests go through Django's test client in-process. --check exits
+non-zero when p95 latency or throughput regress by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ["LLM_PROVIDER"] = "fake"
+os.environ.setdefault("GROQ_API_KEY", "fake-key")
+os.environ.setdefault("FAKE_LLM_LATENCY", "0.05")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "2000")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chatbot_project.settings")
+
+import django
+
+django.setup()
+
+from django.test import Client
+from main import SAMPLE_CONVERSATION
+from src.config import Config
+from chat.views import analyze_medical_conversation
+
+Config.CACHE_ENABLED = False
+Config.ANALYSIS_STORE_ENABLED = False  # No database here; the suite measures the analysis path
+Config.SINGLEFLIGHT_ENABLED = False  # Every request repeats one transcript; coalescing would hide the LLM calls
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+CONCURRENCY = (1, 4, 16)
+SIZES = {"1x": 1, "4x": 4, "16x": 16}  # Copies of the sample consultation
+REQUESTS_PER_LEVEL = 16
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def _run_function(conversation):
+    analyze_medical_conversation(conversation)
+    return True
+
+
+def _run_endpoint(path, payload):
+    def call(_):
+        response = Client().post(path, json.dumps(payload), content_type="application/json")
+        return response.status_code == 200 and json.loads(response.content).get("success", False)
+    return call
+
+
+def measure(call, concurrency, requests):
+    """Fire `requests` calls, `concurrency` at a time; latency percentiles and throughput"""
+    def timed(i):
+        start = time.perf_counter()
+        try:
+            ok = call(i)
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for ok, latency in results if ok]
+    return {
+        "ok": len(latencies),
+        "failed": len(results) - len(latencies),
+        "p50": round(_percentile(latencies, 0.50), 4) if latencies else None,
+        "p95": round(_percentile(latencies, 0.95), 4) if latencies else None,
+        "p99": round(_percentile(latencies, 0.99), 4) if latencies else None,
+        "throughput": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def run_suite():
+    results = {}
+    for size_name, copies in SIZES.items():
+        conversation = "\n\n".join([SAMPLE_CONVERSATION.strip()] * copies)
+        targets = {
+            "analyze_medical_conversation": lambda _, c=conversation: _run_function(c),
+            "/api/": _run_endpoint("/physician-notetaker/api/", {"conversation": conversation}),
+            "/api/quick/": _run_endpoint(
+                "/physician-notetaker/api/quick/", {"conversation": conversation, "type": "ner"}
+            ),
+        }
+        for target, call in targets.items():
+            for concurrency in CONCURRENCY:
+                key = f"{target} size={size_name} c={concurrency}"
+                results[key] = measure(call, concurrency, max(REQUESTS_PER_LEVEL, concurrency))
+                row = results[key]
+                print(f"{key:<52} ok {row['ok']:>3} failed {row['failed']:>2}  "
+                      f"p50 {row['p50'] or 0:6.3f}s  p95 {row['p95'] or 0:6.3f}s  p99 {row['p99'] or 0:6.3f}s  "
+                      f"{row['throughput']:7.1f} req/s")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Names of the scenarios that got slower or lost throughput beyond tolerance"""
+    regressions = []
+    for key, row in results.items():
+        base = baseline.get(key)
+        if base is None or row["p95"] is None or base["p95"] is None:
+            continue
+        if row["failed"] > base["failed"]:
+            regressions.append(f"{key}: {row['failed']} failures (baseline {base['failed']})")
+        if row["p95"] > base["p95"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {row['p95']:.3f}s vs baseline {base['p95']:.3f}s")
+        if row["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{key}: {row['throughput']:.1f} req/s vs baseline {base['throughput']:.1f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE_PATH}")
+    parser.add_argument("--check", action="store_true", help="compare against the stored baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    args = parser.parse_args()
+
+    print(f"Fake LLM: {Config.FAKE_LLM_LATENCY}s latency, {Config.FAKE_LLM_TOKENS_PER_SECOND:g} tokens/s, "
+          f"{Config.FAKE_LLM_ERROR_RATE:g} error rate")
+    results = run_suite()
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"✅ Baseline saved to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions:")
+            for regression in regressions:
+                print(f"   → {regression}")
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
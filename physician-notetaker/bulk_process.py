@@ -0,0 +1,268 @@
+"""
+Bulk-process recorded consultations through the NER, sentiment and SOAP chains.
+
+Input is either a directory of transcripts (*.txt, id = file name; or *.json
+with "id" and "conversation") or a JSONL file with one
+{"id": ..., "conversation": ...} object per line. Results are appended to a
+JSONL file as each transcript finishes, so a crash loses at most the
+transcripts still in flight. Rerunning with the same output file skips every
+id that already completed successfully; a transcript where any chain errored
+or returned unparseable output is recorded as failed and retried. Ids must
+be unique: repeats within the input are skipped with a warning.
+
+With --store, results are also bulk-inserted into the app database as
+AnalysisRecord rows (chat/store.py), --store-batch at a time, so they can be
+listed and retrieved through /api/analyses/.
+
+Usage:
+    python bulk_process.py transcripts.jsonl --output results.jsonl --workers 8
+    python bulk_process.py recordings/ --output results.jsonl --max-in-flight 32
+    python bulk_process.py transcripts.jsonl --store --store-batch 200
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from src.chains.registry import get_chain
+from src.llm import get_llm
+from src.utils.usage import TokenUsageCallback
+
+# Output keys match output_results.json from main.py
+CHAIN_OUTPUT_KEYS = {
+    "ner": "ner_extraction",
+    "sentiment": "sentiment_analysis",
+    "soap": "soap_note",
+}
+
+
+def iter_jsonl(path):
+    """Yield (id, conversation) from a JSONL file, one line at a time"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield str(record.get("id", line_number)), record["conversation"]
+
+
+def iter_directory(path):
+    """Yield (id, conversation) from *.txt and *.json files in a directory"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            stem, extension = os.path.splitext(entry.name)
+            if extension == ".txt":
+                with open(entry.path, encoding="utf-8") as f:
+                    yield stem, f.read()
+            elif extension == ".json":
+                with open(entry.path, encoding="utf-8") as f:
+                    record = json.load(f)
+                yield str(record.get("id", stem)), record["conversation"]
+
+
+def load_completed_ids(output_path):
+    """
+    Ids already processed successfully in a previous run.
+
+    A crash can leave a partially written last line; it is cut off here so
+    the file stays valid JSONL before new results are appended.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, "rb+") as f:
+        data_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            data_end += len(line)
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("success"):
+                completed.add(str(record["id"]))
+        f.truncate(data_end)
+
+    return completed
+
+
+class AnalysisStoreWriter:
+    """Buffers finished transcripts and bulk-inserts them into the app database"""
+
+    def __init__(self, batch_size):
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chatbot_project.settings")
+        import django
+
+        django.setup()
+        from chat.store import save_analyses
+
+        self.save_analyses = save_analyses
+        self.batch_size = batch_size
+        self.pending = []
+        self.stored = 0
+
+    def add(self, record, conversation):
+        if not record["success"]:
+            return
+        results = {name: record[key] for name, key in CHAIN_OUTPUT_KEYS.items()}
+        self.pending.append((conversation, results, {"session_id": record["id"]}))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.save_analyses(self.pending, "bulk", batch_size=self.batch_size)
+            self.stored += len(self.pending)
+            self.pending = []
+
+
+def _chain_failure(name, result):
+    if result.get("error"):
+        return f"{name}: {result.get('message', 'failed')}"
+    if result.get("parse_failed"):
+        return f"{name}: unparseable output"
+    return None
+
+
+def process_transcript(transcript_id, conversation):
+    """Run one transcript through all chains; errors are recorded, not raised"""
+    start = time.perf_counter()
+    record = {"id": transcript_id}
+    try:
+        failures = []
+        for name, key in CHAIN_OUTPUT_KEYS.items():
+            record[key] = get_chain(name).process(conversation)
+            failure = _chain_failure(name, record[key])
+            if failure:
+                failures.append(failure)
+        record["success"] = not failures
+        if failures:
+            record["error"] = "; ".join(failures)
+    except Exception as e:
+        record["success"] = False
+        record["error"] = str(e)
+    record["elapsed_seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+class Progress:
+    """Periodic progress and throughput reporting"""
+
+    def __init__(self, usage, interval):
+        self.usage = usage
+        self.interval = interval
+        self.started = time.monotonic()
+        self.last_report = self.started
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def record(self, record):
+        self.done += 1
+        if not record["success"]:
+            self.failed += 1
+        if time.monotonic() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self, final=False):
+        self.last_report = time.monotonic()
+        minutes = max(self.last_report - self.started, 1e-9) / 60
+        print(
+            f"{'✅ Finished' if final else '→'} {self.done} processed "
+            f"({self.failed} failed, {self.skipped} skipped) | "
+            f"{self.done / minutes:.1f} transcripts/min | "
+            f"{self.usage.total_tokens / minutes:.0f} tokens/min | "
+            f"{self.usage.calls} LLM calls",
+            flush=True
+        )
+
+
+def run(input_path, output_path, workers, max_in_flight, progress_interval, store_batch=0):
+    source = iter_directory(input_path) if os.path.isdir(input_path) else iter_jsonl(input_path)
+    completed = load_completed_ids(output_path)
+    if completed:
+        print(f"↻ Resuming: {len(completed)} transcripts already done in {output_path}")
+
+    usage = TokenUsageCallback()
+    llm = get_llm()
+    # Keep the request tracer; replace the counter of an earlier run in this process
+    llm.callbacks = [cb for cb in llm.callbacks or [] if not isinstance(cb, TokenUsageCallback)] + [usage]
+    progress = Progress(usage, progress_interval)
+    write_lock = threading.Lock()
+    store = AnalysisStoreWriter(store_batch) if store_batch else None
+    conversations = {}  # In-flight transcripts, kept only when storing
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        def write(record):
+            with write_lock:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                if store is not None:
+                    store.add(record, conversations.pop(record["id"]))
+            progress.record(record)
+
+        in_flight = set()
+        seen = set()
+        for transcript_id, conversation in source:
+            if transcript_id in completed:
+                progress.skipped += 1
+                continue
+            if transcript_id in seen:
+                print(f"⚠ Duplicate id {transcript_id!r}: skipped")
+                progress.skipped += 1
+                continue
+            seen.add(transcript_id)
+
+            # Bound the number of transcripts held in memory at once
+            if len(in_flight) >= max_in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+
+            if store is not None:
+                conversations[transcript_id] = conversation
+            in_flight.add(pool.submit(process_transcript, transcript_id, conversation))
+
+        for future in wait(in_flight).done:
+            write(future.result())
+
+    if store is not None:
+        store.flush()
+        print(f"✅ Stored {store.stored} analyses in the database")
+
+    progress.report(final=True)
+    return progress.failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-process transcripts through the NER, sentiment and SOAP chains"
+    )
+    parser.add_argument("input", help="directory of transcripts or a JSONL file")
+    parser.add_argument("--output", default="results.jsonl", help="JSONL results file (appended, used to resume)")
+    parser.add_argument("--workers", type=int, default=4, help="transcripts processed concurrently")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="transcripts read ahead and queued (default: 2 x workers)")
+    parser.add_argument("--progress-every", type=float, default=10.0, help="seconds between progress lines")
+    parser.add_argument("--store", action="store_true", help="also bulk-insert results into the app database")
+    parser.add_argument("--store-batch", type=int, default=500, help="analyses per bulk insert with --store")
+    args = parser.parse_args()
+
+    max_in_flight = args.max_in_flight or 2 * args.workers
+    failed = run(
+        args.input, args.output, args.workers, max(max_in_flight, args.workers), args.progress_every,
+        store_batch=args.store_batch if args.store else 0
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,27 @@
 from django.contrib import admin
+from .models import AnalysisJob, AnalysisRecord, ChainResult, ConsultationSession
 
-# Register your models here.
+
+@admin.register(ConsultationSession)
+class ConsultationSessionAdmin(admin.ModelAdmin):
+    list_display = ("id", "turn_count", "finalized", "created_at", "updated_at")
+    list_filter = ("finalized",)
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "priority", "attempts", "created_at", "finished_at", "webhook_status")
+    list_filter = ("status",)
+
+
+class ChainResultInline(admin.TabularInline):
+    model = ChainResult
+    extra = 0
+
+
+@admin.register(AnalysisRecord)
+class AnalysisRecordAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "patient_id", "session_id", "model_name", "total_ms", "created_at")
+    list_filter = ("source",)
+    search_fields = ("patient_id", "session_id", "transcript_hash")
+    inlines = [ChainResultInline]
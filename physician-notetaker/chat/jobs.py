@@ -0,0 +1,290 @@
+"""
+Database-backed job queue for full analyses.
+
+Web requests only insert a row (submit_job) and return its id; a separate
+worker process (manage.py run_job_worker) claims queued jobs by priority,
+runs the analysis and posts the result to the job's webhook, if any. The
+queue is the app's own database, so it works on SQLite and Postgres alike:
+a job is claimed with a conditional UPDATE, which only one worker can win.
+
+A failed webhook delivery is not retried in place: the job gets a due time
+(exponential backoff) and any worker thread with nothing queued picks it up
+then, so a slow or dead endpoint never holds a job slot. Webhook URLs must be
+http(s) and, unless JOB_WEBHOOK_ALLOW_PRIVATE is set, resolve only to public
+addresses; JOB_WEBHOOK_ALLOWED_HOSTS narrows them further. The address is
+checked again before every delivery, and the delivery connects to the
+address that was checked, so a DNS answer that changes in between cannot
+redirect it.
+"""
+import ipaddress
+import os
+import socket
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from src.cache import make_key
+from src.config import Config
+from .models import AnalysisJob
+
+
+class WebhookURLError(ValueError):
+    """Webhook URL that the server will not post to"""
+
+
+def check_webhook_url(url: str) -> str:
+    """
+    Raise WebhookURLError unless url is http(s) to an allowed host with only
+    public addresses. Returns the checked address to connect to, or "" when
+    JOB_WEBHOOK_ALLOW_PRIVATE skips the address check.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookURLError("webhook_url must be an http(s) URL.")
+
+    host = parts.hostname.lower()
+    allowed = Config.JOB_WEBHOOK_ALLOWED_HOSTS
+    if allowed and not any(host == entry or (entry.startswith(".") and host.endswith(entry)) for entry in allowed):
+        raise WebhookURLError(f"webhook_url host {host} is not allowed.")
+    if Config.JOB_WEBHOOK_ALLOW_PRIVATE:
+        return ""
+
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, ValueError):
+        raise WebhookURLError(f"webhook_url host {host} cannot be resolved.")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if getattr(ip, "ipv4_mapped", None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            raise WebhookURLError(f"webhook_url host {host} resolves to a non-public address.")
+    return sorted(addresses)[0]
+
+
+def _dedupe_key(conversation: str) -> str:
+    return make_key(conversation, "analysis", "", Config.GROQ_MODEL)
+
+
+def submit_job(conversation: str, priority: int = 0, webhook_url: str = "") -> tuple:
+    """
+    Queue a full analysis. Returns (job, created); an identical transcript
+    that is already queued or running returns that job instead.
+    """
+    dedupe_key = _dedupe_key(conversation)
+    existing = AnalysisJob.objects.filter(dedupe_key=dedupe_key, status__in=AnalysisJob.ACTIVE_STATUSES).first()
+    if existing is not None:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            job = AnalysisJob.objects.create(
+                conversation=conversation,
+                priority=priority,
+                webhook_url=webhook_url,
+                dedupe_key=dedupe_key
+            )
+        return job, True
+    except IntegrityError:
+        # Lost a race with an identical submission
+        existing = AnalysisJob.objects.filter(dedupe_key=dedupe_key, status__in=AnalysisJob.ACTIVE_STATUSES).first()
+        if existing is None:
+            raise
+        return existing, False
+
+
+def claim_next_job(worker_name: str):
+    """Claim the highest-priority, oldest queued job, or return None"""
+    candidates = (
+        AnalysisJob.objects
+        .filter(status=AnalysisJob.QUEUED)
+        .order_by("-priority", "created_at")
+        .values_list("id", flat=True)[:10]
+    )
+    for job_id in list(candidates):
+        claimed = AnalysisJob.objects.filter(id=job_id, status=AnalysisJob.QUEUED).update(
+            status=AnalysisJob.RUNNING,
+            started_at=timezone.now(),
+            worker=worker_name,
+            attempts=F("attempts") + 1
+        )
+        if claimed:
+            return AnalysisJob.objects.get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs() -> int:
+    """Put back jobs whose worker died mid-run; give up after JOB_MAX_ATTEMPTS"""
+    cutoff = timezone.now() - timedelta(seconds=Config.JOB_STALE_SECONDS)
+    stale = AnalysisJob.objects.filter(status=AnalysisJob.RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=Config.JOB_MAX_ATTEMPTS).update(
+        status=AnalysisJob.FAILED,
+        error="Worker stopped responding",
+        finished_at=timezone.now()
+    )
+    requeued = stale.update(status=AnalysisJob.QUEUED, worker="")
+    if failed or requeued:
+        print(f"⚠ Job queue: requeued {requeued} stale job(s), failed {failed}")
+    return requeued
+
+
+def run_job(job: AnalysisJob):
+    """Run one claimed job and store its result, then deliver the webhook"""
+    from .views import analyze_medical_conversation
+
+    print(f"\n🔍 Job {job.id}: processing conversation ({len(job.conversation)} characters)...")
+    try:
+        job.result = analyze_medical_conversation(job.conversation, source="job")
+        job.status = AnalysisJob.DONE
+    except Exception as e:
+        print(f"❌ Error in job {job.id}: {str(e)}")
+        job.error = str(e)
+        job.status = AnalysisJob.FAILED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["result", "error", "status", "finished_at"])
+
+    if job.webhook_url:
+        job.webhook_status = "pending"
+        job.webhook_next_attempt_at = _webhook_lease()
+        job.save(update_fields=["webhook_status", "webhook_next_attempt_at"])
+        attempt_webhook(job)
+
+
+def job_payload(job: AnalysisJob) -> dict:
+    """Public view of a job, as returned by the API and posted to webhooks"""
+    payload = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "priority": job.priority,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == AnalysisJob.DONE:
+        payload["data"] = job.result
+    elif job.status == AnalysisJob.FAILED:
+        payload["error"] = job.error
+    return payload
+
+
+def _pinned(url: str, address: str) -> tuple:
+    """
+    URL with its host replaced by an already checked address, plus the Host
+    header and TLS server name that keep the request addressed to the host
+    """
+    if not address:
+        return url, {}, {}
+    parts = urlsplit(url)
+    netloc = parts.netloc.rsplit("@", 1)[-1]
+    ip_host = f"[{address}]" if ":" in address else address
+    pinned = urlunsplit(parts._replace(netloc=ip_host + (f":{parts.port}" if parts.port else "")))
+    return pinned, {"Host": netloc}, {"sni_hostname": parts.hostname}
+
+
+def deliver_webhook(job: AnalysisJob) -> bool:
+    """POST the finished job to its webhook once; redirects are not followed"""
+    import httpx
+
+    address = check_webhook_url(job.webhook_url)  # Again at delivery: DNS may have changed since submission
+    url, headers, extensions = _pinned(job.webhook_url, address)
+    try:
+        with httpx.Client(timeout=Config.JOB_WEBHOOK_TIMEOUT) as client:
+            request = client.build_request("POST", url, json=job_payload(job), headers=headers, extensions=extensions)
+            response = client.send(request)
+        if response.status_code < 300:
+            return True
+        print(f"⚠ Webhook for job {job.id} returned {response.status_code}")
+    except httpx.HTTPError as e:
+        print(f"⚠ Webhook for job {job.id} failed: {str(e)}")
+    return False
+
+
+def _webhook_lease():
+    """Due time that keeps other workers off a delivery in progress; a crashed attempt becomes due again"""
+    return timezone.now() + timedelta(seconds=2 * Config.JOB_WEBHOOK_TIMEOUT + 1)
+
+
+def attempt_webhook(job: AnalysisJob):
+    """Make one delivery attempt and record it: delivered, failed, or pending again after a backoff"""
+    try:
+        delivered = deliver_webhook(job)
+        retry = True
+    except WebhookURLError as e:
+        print(f"⚠ Webhook for job {job.id} not sent: {str(e)}")
+        delivered, retry = False, False
+
+    job.webhook_attempts += 1
+    if delivered:
+        job.webhook_status, job.webhook_next_attempt_at = "delivered", None
+    elif retry and job.webhook_attempts <= Config.JOB_WEBHOOK_RETRIES:
+        backoff = 2 ** (job.webhook_attempts - 1)
+        job.webhook_status, job.webhook_next_attempt_at = "pending", timezone.now() + timedelta(seconds=backoff)
+    else:
+        job.webhook_status, job.webhook_next_attempt_at = "failed", None
+    job.save(update_fields=["webhook_status", "webhook_attempts", "webhook_next_attempt_at"])
+
+
+def claim_due_webhook():
+    """Claim the webhook delivery that has been due longest, or return None"""
+    now = timezone.now()
+    candidates = (
+        AnalysisJob.objects
+        .filter(webhook_status="pending", webhook_next_attempt_at__lte=now)
+        .order_by("webhook_next_attempt_at")
+        .values_list("id", "webhook_next_attempt_at")[:10]
+    )
+    for job_id, due in list(candidates):
+        claimed = AnalysisJob.objects.filter(
+            id=job_id, webhook_status="pending", webhook_next_attempt_at=due
+        ).update(webhook_next_attempt_at=_webhook_lease())
+        if claimed:
+            return AnalysisJob.objects.get(id=job_id)
+    return None
+
+
+class JobWorker:
+    """Polls the queue and runs up to `threads` jobs (or due webhook deliveries) at once"""
+
+    def __init__(self, threads: int = None, poll_interval: float = None):
+        self.threads = threads or Config.JOB_WORKER_THREADS
+        self.poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def _loop(self, index: int):
+        worker_name = f"{self.name}:{index}"
+        while not self._stop.is_set():
+            close_old_connections()
+            try:
+                job = claim_next_job(worker_name)
+                if job is not None:
+                    run_job(job)
+                    continue
+                webhook_job = claim_due_webhook()
+                if webhook_job is not None:
+                    attempt_webhook(webhook_job)
+                    continue
+            except Exception as e:
+                # e.g. "database is locked"; a job left running is requeued as stale
+                print(f"❌ Job worker {worker_name}: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def run(self):
+        print(f"✅ Job worker {self.name} started with {self.threads} thread(s)")
+        requeue_stale_jobs()
+        loops = [threading.Thread(target=self._loop, args=(i,), daemon=True) for i in range(self.threads)]
+        for loop in loops:
+            loop.start()
+        try:
+            while not self._stop.wait(Config.JOB_STALE_SECONDS / 2):
+                close_old_connections()
+                requeue_stale_jobs()
+        finally:
+            self.stop()
+            for loop in loops:
+                loop.join()
+
+    def stop(self):
+        self._stop.set()
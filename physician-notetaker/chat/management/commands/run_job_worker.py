@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from chat.jobs import JobWorker
+
+
+class Command(BaseCommand):
+    help = "Run queued analysis jobs (see chat/jobs.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=None, help="jobs run concurrently (JOB_WORKER_THREADS)")
+        parser.add_argument("--poll-interval", type=float, default=None, help="seconds between polls when idle")
+
+    def handle(self, *args, **options):
+        worker = JobWorker(threads=options["threads"], poll_interval=options["poll_interval"])
+        try:
+            worker.run()
+        except KeyboardInterrupt:
+            self.stdout.write("⚠ Job worker stopping")
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.10 on 2026-10-18 19:34
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultationSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('transcript', models.TextField(blank=True, default='')),
+                ('turn_count', models.PositiveIntegerField(default=0)),
+                ('entities', models.JSONField(default=dict)),
+                ('sentiment', models.JSONField(default=dict)),
+                ('soap', models.JSONField(default=dict)),
+                ('soap_updates', models.PositiveIntegerField(default=0)),
+                ('finalized', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
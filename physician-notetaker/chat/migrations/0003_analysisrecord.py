@@ -0,0 +1,64 @@
+# Generated by Django 4.2.10 on 2026-10-18 20:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_analysisjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisRecord',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('transcript_hash', models.CharField(max_length=64)),
+                ('transcript', models.TextField()),
+                ('patient_id', models.CharField(blank=True, default='', max_length=100)),
+                ('session_id', models.CharField(blank=True, default='', max_length=100)),
+                ('source', models.CharField(max_length=16)),
+                ('model_name', models.CharField(blank=True, default='', max_length=100)),
+                ('timing', models.JSONField(blank=True, default=dict)),
+                ('total_ms', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChainResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chain', models.CharField(max_length=16)),
+                ('status', models.CharField(max_length=16)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('message', models.TextField(blank=True, default='')),
+                ('prompt_version', models.CharField(blank=True, default='', max_length=64)),
+                ('wall_ms', models.FloatField(blank=True, null=True)),
+                ('cached', models.BooleanField(default=False)),
+                ('record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chain_results', to='chat.analysisrecord')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='analysisrecord',
+            index=models.Index(fields=['transcript_hash', '-created_at'], name='analysis_transcript_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisrecord',
+            index=models.Index(fields=['patient_id', '-created_at', '-id'], name='analysis_patient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisrecord',
+            index=models.Index(fields=['session_id', '-created_at', '-id'], name='analysis_session_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analysisrecord',
+            index=models.Index(fields=['-created_at', '-id'], name='analysis_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='chainresult',
+            constraint=models.UniqueConstraint(fields=('record', 'chain'), name='unique_chain_per_analysis'),
+        ),
+    ]
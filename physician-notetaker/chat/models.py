@@ -1,3 +1,132 @@
+import uuid
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class ConsultationSession(models.Model):
+    """Running analysis state for a live consultation (see src/session.py)"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    transcript = models.TextField(blank=True, default="")
+    turn_count = models.PositiveIntegerField(default=0)
+    entities = models.JSONField(default=dict)
+    sentiment = models.JSONField(default=dict)
+    soap = models.JSONField(default=dict)
+    soap_updates = models.PositiveIntegerField(default=0)
+    finalized = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    STATE_FIELDS = ("transcript", "turn_count", "entities", "sentiment", "soap", "soap_updates")
+
+    def __str__(self):
+        return f"Session {self.id} ({self.turn_count} turns)"
+
+    def get_state(self) -> dict:
+        return {field: getattr(self, field) for field in self.STATE_FIELDS}
+
+    def save_state(self, state: dict, **extra) -> bool:
+        """
+        Store a new state, unless another update landed first (the turn count
+        moved on since this row was read). Returns False on such a conflict.
+        """
+        values = {field: state[field] for field in self.STATE_FIELDS}
+        values.update(extra, updated_at=timezone.now())
+        updated = ConsultationSession.objects.filter(pk=self.pk, turn_count=self.turn_count).update(**values)
+        if updated:
+            for field, value in values.items():
+                setattr(self, field, value)
+        return bool(updated)
+
+
+class AnalysisJob(models.Model):
+    """A queued full analysis, run by the job worker (see chat/jobs.py)"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+    ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.IntegerField(default=0)  # Higher runs first
+    dedupe_key = models.CharField(max_length=64)
+    conversation = models.TextField()
+    webhook_url = models.URLField(max_length=500, blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    webhook_status = models.CharField(max_length=16, blank=True, default="")  # pending, delivered or failed
+    webhook_attempts = models.PositiveIntegerField(default=0)
+    webhook_next_attempt_at = models.DateTimeField(null=True, blank=True)  # When a pending delivery is due
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "-priority", "created_at"], name="job_queue_idx"),
+            models.Index(fields=["webhook_status", "webhook_next_attempt_at"], name="job_webhook_idx"),
+        ]
+        constraints = [
+            # At most one queued/running job per transcript; identical submissions join it
+            models.UniqueConstraint(
+                fields=["dedupe_key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="unique_active_job_per_transcript"
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status})"
+
+
+class AnalysisRecord(models.Model):
+    """A completed analysis: transcript, per-chain results and timings (see chat/store.py)"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    transcript_hash = models.CharField(max_length=64)  # See chat/store.py transcript_hash()
+    transcript = models.TextField()
+    patient_id = models.CharField(max_length=100, blank=True, default="")
+    session_id = models.CharField(max_length=100, blank=True, default="")  # Visit/session identifier from the caller
+    source = models.CharField(max_length=16)  # api, quick, batch, job, bulk
+    model_name = models.CharField(max_length=100, blank=True, default="")
+    timing = models.JSONField(default=dict, blank=True)
+    total_ms = models.FloatField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Listing is keyset-paginated on (created_at, id), newest first
+        indexes = [
+            models.Index(fields=["transcript_hash", "-created_at"], name="analysis_transcript_idx"),
+            models.Index(fields=["patient_id", "-created_at", "-id"], name="analysis_patient_idx"),
+            models.Index(fields=["session_id", "-created_at", "-id"], name="analysis_session_idx"),
+            models.Index(fields=["-created_at", "-id"], name="analysis_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Analysis {self.id} ({self.source})"
+
+
+class ChainResult(models.Model):
+    """One chain's section of an AnalysisRecord"""
+
+    record = models.ForeignKey(AnalysisRecord, on_delete=models.CASCADE, related_name="chain_results")
+    chain = models.CharField(max_length=16)
+    status = models.CharField(max_length=16)  # success or error, as in the API sections
+    data = models.JSONField(default=dict, blank=True)
+    message = models.TextField(blank=True, default="")
+    prompt_version = models.CharField(max_length=64, blank=True, default="")
+    wall_ms = models.FloatField(null=True, blank=True)
+    cached = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["record", "chain"], name="unique_chain_per_analysis"),
+        ]
+
+    def __str__(self):
+        return f"{self.chain} result for {self.record_id}"
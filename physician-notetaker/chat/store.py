@@ -0,0 +1,125 @@
+"""
+Persistent store of completed analyses.
+
+Every analysis the API, job worker or bulk_process.py runs can be saved as an
+AnalysisRecord with one ChainResult per chain, along with its timings and the
+model and prompt versions that produced it. Showing or auditing a past visit
+is then a database read instead of a fresh set of LLM calls. Lists are
+keyset-paginated on (created_at, id), newest first, so a page costs the same
+however deep it is.
+"""
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from django.db import transaction
+from django.db.models import Q
+from src.cache import make_key
+from src.config import Config
+from src.tracing import current_trace
+from src.utils.transcript import prepare_transcript
+from .models import AnalysisRecord, ChainResult
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not issued by list_records"""
+
+
+def transcript_hash(conversation: str) -> str:
+    """Same value for transcripts that normalize to the same text"""
+    return make_key(prepare_transcript(conversation), "transcript", "", "")
+
+
+def _build(conversation: str, results: dict, source: str, patient_id: str = "", session_id: str = "", timing=None):
+    """
+    Unsaved record and chain rows for one analysis; results are keyed by chain
+    name. Model and prompt versions come from the results (BaseChain._tag),
+    so saving builds no chain or LLM client.
+    """
+    timing = timing if timing is not None else {}
+    chain_timing = timing.get("chains", {})
+    record = AnalysisRecord(
+        transcript_hash=transcript_hash(conversation),
+        transcript=conversation,
+        patient_id=patient_id or "",
+        session_id=session_id or "",
+        source=source,
+        model_name=next((result["model"] for result in results.values() if result.get("model")), Config.GROQ_MODEL),
+        timing=timing,
+        total_ms=timing.get("total_ms")
+    )
+    rows = [
+        ChainResult(
+            record=record,
+            chain=name,
+            status="error" if result.get("error") else "success",
+            data=result.get("data", {}),
+            message=result.get("message", ""),
+            prompt_version=result.get("prompt_version", ""),
+            wall_ms=chain_timing.get(name, {}).get("wall_ms"),
+            cached=chain_timing.get(name, {}).get("cache") == "hit"
+        )
+        for name, result in results.items()
+    ]
+    return record, rows
+
+
+def save_analysis(conversation: str, results: dict, source: str, patient_id: str = "", session_id: str = ""):
+    """Store one analysis; timings come from the current request trace, if any"""
+    trace = current_trace()
+    record, rows = _build(
+        conversation, results, source, patient_id, session_id,
+        timing=trace.breakdown() if trace is not None else None
+    )
+    with transaction.atomic():
+        record.save(force_insert=True)
+        ChainResult.objects.bulk_create(rows)
+    return record
+
+
+def save_analyses(items, source: str, batch_size: int = 500) -> list:
+    """
+    Bulk-store many analyses in one transaction, batch_size rows per INSERT.
+    Each item is (conversation, results) or (conversation, results, fields)
+    with optional patient_id / session_id / timing in fields.
+    """
+    records, rows = [], []
+    for item in items:
+        conversation, results = item[0], item[1]
+        fields = item[2] if len(item) > 2 else {}
+        record, chain_rows = _build(conversation, results, source, **fields)
+        records.append(record)
+        rows.extend(chain_rows)
+    with transaction.atomic():
+        AnalysisRecord.objects.bulk_create(records, batch_size=batch_size)
+        ChainResult.objects.bulk_create(rows, batch_size=batch_size)
+    return records
+
+
+def encode_cursor(record: AnalysisRecord) -> str:
+    value = f"{record.created_at.isoformat()}|{record.id}"
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        created_at, record_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(record_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def list_records(filters: dict, limit: int, cursor: str = None) -> tuple:
+    """
+    One page of records matching filters (patient_id, session_id,
+    transcript_hash), newest first. Returns (records, next_cursor);
+    next_cursor is None on the last page.
+    """
+    records = AnalysisRecord.objects.filter(**filters).prefetch_related("chain_results")
+    if cursor:
+        created_at, record_id = decode_cursor(cursor)
+        records = records.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=record_id))
+    page = list(records.order_by("-created_at", "-id")[:limit + 1])
+    if len(page) > limit:
+        return page[:limit], encode_cursor(page[limit - 1])
+    return page, None
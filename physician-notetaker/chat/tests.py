@@ -1,3 +1,338 @@
-from django.test import TestCase
+import os
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+from benchmarks.bench_medical_filter import LAY_MEDICAL, MAX_P99_US, MIN_RECALL, build_corpus, evaluate
+from main import SAMPLE_CONVERSATION
+from src import metrics
+from src.config import Config
+from src.pipeline import run_chains
+from src.session import _update_soap, apply_turns, new_session_state
+from src.utils.medical_filter import MEDICAL, NON_MEDICAL, classify_conversation
+from src.utils.rate_limiter import RateLimiter, SharedTokenBucket
+from .jobs import (
+    JobWorker, WebhookURLError, _pinned, attempt_webhook, check_webhook_url, claim_next_job, requeue_stale_jobs,
+    submit_job
+)
+from .models import AnalysisJob
 
-# Create your tests here.
+
+def _resolves_to(*addresses):
+    """getaddrinfo stand-in answering with the given addresses"""
+    return mock.patch(
+        "chat.jobs.socket.getaddrinfo",
+        return_value=[(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 443)) for address in addresses]
+    )
+
+
+class JobQueueTests(TestCase):
+    def test_identical_submission_joins_active_job(self):
+        job, created = submit_job("Patient: My neck hurts.")
+        again, created_again = submit_job("Patient: My neck hurts.")
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.id, job.id)
+        self.assertEqual(AnalysisJob.objects.count(), 1)
+
+    def test_finished_job_does_not_absorb_new_submission(self):
+        job, _ = submit_job("Patient: My neck hurts.")
+        AnalysisJob.objects.filter(id=job.id).update(status=AnalysisJob.DONE)
+        again, created = submit_job("Patient: My neck hurts.")
+        self.assertTrue(created)
+        self.assertNotEqual(again.id, job.id)
+
+    def test_claims_by_priority_then_age(self):
+        low, _ = submit_job("Patient: low", priority=0)
+        high, _ = submit_job("Patient: high", priority=5)
+        self.assertEqual(claim_next_job("w").id, high.id)
+        self.assertEqual(claim_next_job("w").id, low.id)
+        self.assertIsNone(claim_next_job("w"))
+
+    def test_stale_jobs_are_requeued_then_failed(self):
+        old = timezone.now() - timedelta(seconds=Config.JOB_STALE_SECONDS + 60)
+        retry, _ = submit_job("Patient: retry")
+        spent, _ = submit_job("Patient: spent")
+        AnalysisJob.objects.filter(id=retry.id).update(status=AnalysisJob.RUNNING, started_at=old, attempts=1)
+        AnalysisJob.objects.filter(id=spent.id).update(
+            status=AnalysisJob.RUNNING, started_at=old, attempts=Config.JOB_MAX_ATTEMPTS
+        )
+        fresh, _ = submit_job("Patient: fresh")
+        AnalysisJob.objects.filter(id=fresh.id).update(status=AnalysisJob.RUNNING, started_at=timezone.now())
+
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(AnalysisJob.objects.get(id=retry.id).status, AnalysisJob.QUEUED)
+        self.assertEqual(AnalysisJob.objects.get(id=spent.id).status, AnalysisJob.FAILED)
+        self.assertEqual(AnalysisJob.objects.get(id=fresh.id).status, AnalysisJob.RUNNING)
+
+
+class JobWorkerTests(TransactionTestCase):
+    def test_loop_survives_a_failing_job(self):
+        first, _ = submit_job("Patient: first")
+        second, _ = submit_job("Patient: second")
+        worker = JobWorker(threads=1, poll_interval=0.01)
+        ran = []
+
+        def run_job(job):
+            ran.append(job.id)
+            if len(ran) == 1:
+                raise RuntimeError("database is locked")
+            worker.stop()
+
+        with mock.patch("chat.jobs.run_job", side_effect=run_job):
+            loop = threading.Thread(target=worker._loop, args=(0,))
+            loop.start()
+            loop.join(timeout=10)
+        self.assertFalse(loop.is_alive())
+        self.assertCountEqual(ran, [first.id, second.id])
+
+
+class JobClaimRaceTests(TransactionTestCase):
+    def test_each_job_is_claimed_by_one_worker(self):
+        jobs = [submit_job(f"Patient: case {i}")[0].id for i in range(5)]
+        claims, start = [], threading.Barrier(8)
+
+        def worker(index):
+            start.wait()
+            try:
+                while True:
+                    job = claim_next_job(f"w{index}")
+                    if job is None:
+                        break
+                    claims.append(job.id)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertCountEqual(claims, jobs)
+        self.assertFalse(AnalysisJob.objects.filter(status=AnalysisJob.QUEUED).exists())
+
+
+class WebhookURLTests(TestCase):
+    def test_rejects_non_http_schemes(self):
+        for url in ("file:///etc/passwd", "gopher://example.com/", "example.com/hook"):
+            with self.assertRaises(WebhookURLError):
+                check_webhook_url(url)
+
+    def test_rejects_private_and_internal_addresses(self):
+        for address in ("127.0.0.1", "10.0.0.5", "169.254.169.254", "192.168.1.1", "::1", "::ffff:127.0.0.1"):
+            with self.subTest(address=address), _resolves_to(address):
+                with self.assertRaises(WebhookURLError):
+                    check_webhook_url("https://hooks.example.com/done")
+
+    def test_rejects_host_with_any_private_address(self):
+        with _resolves_to("93.184.216.34", "10.0.0.5"), self.assertRaises(WebhookURLError):
+            check_webhook_url("https://hooks.example.com/done")
+
+    def test_returns_the_checked_public_address(self):
+        with _resolves_to("93.184.216.34"):
+            self.assertEqual(check_webhook_url("https://hooks.example.com/done"), "93.184.216.34")
+
+    def test_allowed_hosts(self):
+        with mock.patch.object(Config, "JOB_WEBHOOK_ALLOWED_HOSTS", [".example.com"]), _resolves_to("93.184.216.34"):
+            check_webhook_url("https://hooks.example.com/done")
+            with self.assertRaises(WebhookURLError):
+                check_webhook_url("https://hooks.example.org/done")
+
+    def test_delivery_connects_to_the_checked_address(self):
+        url, headers, extensions = _pinned("https://hooks.example.com:8443/done?x=1", "93.184.216.34")
+        self.assertEqual(url, "https://93.184.216.34:8443/done?x=1")
+        self.assertEqual(headers, {"Host": "hooks.example.com:8443"})
+        self.assertEqual(extensions, {"sni_hostname": "hooks.example.com"})
+
+    def test_rebound_host_is_not_posted_to(self):
+        job = AnalysisJob.objects.create(
+            conversation="Patient: hi", dedupe_key="k", status=AnalysisJob.DONE,
+            webhook_url="https://hooks.example.com/done", webhook_status="pending"
+        )
+        with _resolves_to("127.0.0.1"), mock.patch("httpx.Client.send") as send:
+            attempt_webhook(job)
+        send.assert_not_called()
+        self.assertEqual(AnalysisJob.objects.get(id=job.id).webhook_status, "failed")
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Identical concurrent analyses on the fake LLM, fast NER mode: one call per chain"""
+
+    DUPLICATES = 16
+    STAGES = ("ner.single_pass", "sentiment", "soap")
+
+    def setUp(self):
+        for name, value in {
+            "LLM_PROVIDER": "fake", "FAKE_LLM_LATENCY": 0.2, "FAKE_LLM_TOKENS_PER_SECOND": 0,
+            "FAKE_LLM_ERROR_RATE": 0, "NER_MODE": "fast", "CACHE_ENABLED": True, "CACHE_SQLITE_PATH": "",
+        }.items():
+            patcher = mock.patch.object(Config, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # Fresh client and chains built from the settings above
+        for patcher in (mock.patch("src.llm._llm", None), mock.patch.dict("src.chains.registry._instances", clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _fire(self) -> dict:
+        """LLM calls by stage for DUPLICATES identical run_chains() calls started together"""
+        # The difference is a patient turn, so sentiment (patient turns only) misses the cache too
+        conversation = f"{SAMPLE_CONVERSATION.strip()}\nPatient: My reference number is {uuid.uuid4().hex}."
+        before = {stage: metrics.LLM_CALLS.value(stage=stage, status="success") for stage in self.STAGES}
+        barrier, results = threading.Barrier(self.DUPLICATES), []
+
+        def worker():
+            barrier.wait()
+            results.append(run_chains(conversation))
+
+        threads = [threading.Thread(target=worker) for _ in range(self.DUPLICATES)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), self.DUPLICATES)
+        for result in results:
+            self.assertFalse(any(chain.get("error") for chain in result.values()), result)
+        return {stage: metrics.LLM_CALLS.value(stage=stage, status="success") - before[stage] for stage in self.STAGES}
+
+    def test_duplicates_make_one_call_per_chain(self):
+        self.assertEqual(self._fire(), {stage: 1 for stage in self.STAGES})
+
+    def test_without_single_flight_duplicates_each_call(self):
+        with mock.patch.object(Config, "SINGLEFLIGHT_ENABLED", False):
+            calls = self._fire()
+        for stage in self.STAGES:
+            self.assertGreater(calls[stage], 1)
+
+
+class MedicalFilterTests(SimpleTestCase):
+    """The pre-filter on the labelled corpus from benchmarks/bench_medical_filter.py"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.scores = evaluate(build_corpus(300))
+
+    def test_non_medical_label_is_never_wrong(self):
+        self.assertEqual(self.scores[NON_MEDICAL]["precision"], 1.0)
+
+    def test_medical_label_is_never_wrong(self):
+        self.assertEqual(self.scores[MEDICAL]["precision"], 1.0)
+
+    def test_recall_floor(self):
+        for label in (MEDICAL, NON_MEDICAL):
+            self.assertGreaterEqual(self.scores[label]["recall"], MIN_RECALL[label], label)
+
+    def test_plain_language_medical_input_is_never_rejected(self):
+        for text in LAY_MEDICAL:
+            with self.subTest(text=text):
+                self.assertNotEqual(classify_conversation(text).label, NON_MEDICAL)
+
+    def test_sample_consultation_is_medical(self):
+        self.assertEqual(classify_conversation(SAMPLE_CONVERSATION).label, MEDICAL)
+
+    def test_classification_is_fast(self):
+        self.assertLess(self.scores["p99_us"], MAX_P99_US)
+
+
+class RetryAfterTests(SimpleTestCase):
+    """A provider 429 holds every later acquire() for its Retry-After interval"""
+
+    RETRY_AFTER = 0.3
+
+    def _acquire_seconds(self, limiter) -> float:
+        start = time.monotonic()
+        limiter.acquire(10)
+        limiter.release(10)
+        return time.monotonic() - start
+
+    def test_in_process_limiter_waits_out_retry_after(self):
+        limiter = RateLimiter(rpm=0, tpm=0)
+        self.assertLess(self._acquire_seconds(limiter), 0.1)
+        limiter.throttled(self.RETRY_AFTER)
+        self.assertGreaterEqual(self._acquire_seconds(limiter), self.RETRY_AFTER - 0.01)
+        self.assertLess(self._acquire_seconds(limiter), 0.1)
+
+    def test_shared_limiter_holds_other_workers(self):
+        store = os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite3")
+        first, second = RateLimiter(600, 0, store), RateLimiter(600, 0, store)
+        self.assertTrue(first.shared)
+        first.throttled(self.RETRY_AFTER)
+        self.assertGreaterEqual(self._acquire_seconds(second), self.RETRY_AFTER - 0.01)
+
+    def test_shared_bucket_block_until(self):
+        bucket = SharedTokenBucket(os.path.join(tempfile.mkdtemp(), "ratelimit.sqlite3"), "requests", 60, 1)
+        bucket.block_until(time.time() + self.RETRY_AFTER)
+        self.assertAlmostEqual(bucket.try_acquire(1), self.RETRY_AFTER, delta=0.05)
+        self.assertGreater(bucket.snapshot()["blocked_for"], 0)
+        time.sleep(self.RETRY_AFTER)
+        self.assertEqual(bucket.try_acquire(1), 0)
+
+
+class SessionSoapTests(SimpleTestCase):
+    """Incremental SOAP updates keep the full-transcript draft; new findings rebuild it"""
+
+    DRAFT = {"Assessment": {"Diagnosis": "Whiplash injury", "Severity": "Mild"}, "Plan": {"Treatment": "Physiotherapy"}}
+
+    def _state(self):
+        state = new_session_state()
+        state.update({
+            "transcript": "Doctor: How is your neck?\nPatient: Still sore.",
+            "turn_count": 2,
+            "entities": {"Diagnosis": ["whiplash injury"], "Treatment": ["physiotherapy"]},
+            "soap": self.DRAFT,
+        })
+        return state
+
+    def _run(self, window_ner):
+        """apply_turns with run_chains stubbed; returns (state, regenerated, chains run per call)"""
+        calls = []
+
+        def run_chains(conversation, chains=("ner", "sentiment", "soap"), timeout=None):
+            calls.append(chains)
+            results = {
+                "ner": {"error": False, "data": window_ner},
+                "sentiment": {"error": False, "data": {"Sentiment": "Neutral"}},
+                "soap": {"error": False, "data": {"Assessment": {"Diagnosis": "Window only", "Severity": ""}}},
+            }
+            if chains == ("soap",):
+                results["soap"] = {"error": False, "data": {"Assessment": {"Diagnosis": "Full transcript"}}}
+            return {name: results[name] for name in chains}
+
+        with mock.patch("src.session.run_chains", side_effect=run_chains):
+            state, _, regenerated = apply_turns(self._state(), "Patient: It is a bit better today.")
+        return state, regenerated, calls
+
+    def test_update_keeps_draft_text_and_fills_gaps(self):
+        merged = _update_soap(self.DRAFT, {"Assessment": {"Diagnosis": "Neck strain", "Prognosis": "Good"}})
+        self.assertEqual(merged["Assessment"]["Diagnosis"], "Whiplash injury")
+        self.assertEqual(merged["Assessment"]["Prognosis"], "Good")
+        self.assertEqual(merged["Plan"]["Treatment"], "Physiotherapy")
+
+    def test_update_without_new_findings_keeps_assessment(self):
+        with mock.patch.object(Config, "SESSION_SOAP_REGEN_UPDATES", 5):
+            state, regenerated, calls = self._run({"Diagnosis": ["Whiplash injury"], "Treatment": []})
+        self.assertFalse(regenerated)
+        self.assertEqual(calls, [("ner", "sentiment", "soap")])
+        self.assertEqual(state["soap"]["Assessment"]["Diagnosis"], "Whiplash injury")
+        self.assertEqual(state["soap_updates"], 1)
+
+    def test_new_diagnosis_rebuilds_soap_from_full_transcript(self):
+        with mock.patch.object(Config, "SESSION_SOAP_REGEN_UPDATES", 5):
+            state, regenerated, calls = self._run({"Diagnosis": ["concussion"], "Treatment": []})
+        self.assertTrue(regenerated)
+        self.assertEqual(calls[-1], ("soap",))
+        self.assertEqual(state["soap"]["Assessment"]["Diagnosis"], "Full transcript")
+        self.assertEqual(state["soap_updates"], 0)
+
+    def test_rebuilds_after_regen_interval(self):
+        with mock.patch.object(Config, "SESSION_SOAP_REGEN_UPDATES", 1):
+            _, regenerated, calls = self._run({"Diagnosis": [], "Treatment": []})
+        self.assertTrue(regenerated)
+        self.assertEqual(calls, [("ner", "sentiment"), ("soap",)])
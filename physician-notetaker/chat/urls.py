@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
@@ -8,8 +9,32 @@ urlpatterns = [
     path('', views.chat_view, name='chat_view'),
 
     # API endpoint for full analysis (NER + Sentiment + SOAP)
-    path('api/', views.chat_api, name='chat_api'),
+    # Under ASGI the async views await the LLM instead of holding a thread each
+    path('api/', views.chat_api_async if settings.ASYNC_API else views.chat_api, name='chat_api'),
+
+    # Streaming full analysis (Server-Sent Events, sections sent as they finish)
+    # Under ASGI the events come from an async generator, which Django does not buffer
+    path('api/stream/', views.chat_stream_api_async if settings.ASYNC_API else views.chat_stream_api, name='chat_stream_api'),
+
+    # Batch analysis: many conversations per request, per-item results
+    path('api/batch/', views.batch_analyze_api, name='batch_analyze'),
 
     # Quick analysis endpoint for specific analysis types
-    path('api/quick/', views.quick_analyze_api, name='quick_analyze'),
+    path('api/quick/', views.quick_analyze_api_async if settings.ASYNC_API else views.quick_analyze_api, name='quick_analyze'),
+
+    # Live consultation sessions: post only the new turns, analysis is updated incrementally
+    path('api/session/', views.session_create_api, name='session_create'),
+    path('api/session/<uuid:session_id>/', views.session_api, name='session'),
+    path('api/session/<uuid:session_id>/finalize/', views.session_finalize_api, name='session_finalize'),
+
+    # Background jobs: submit, then poll (or receive a webhook) for the result
+    path('api/jobs/', views.job_submit_api, name='job_submit'),
+    path('api/jobs/<uuid:job_id>/', views.job_status_api, name='job_status'),
+
+    # Stored analyses: list (keyset-paginated) and retrieve past results without new LLM calls
+    path('api/analyses/', views.analyses_api, name='analyses'),
+    path('api/analyses/<uuid:analysis_id>/', views.analysis_detail_api, name='analysis_detail'),
+
+    # Result cache hit/miss counters
+    path('api/cache/stats/', views.cache_stats_api, name='cache_stats'),
 ]
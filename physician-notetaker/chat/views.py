@@ -1,48 +1,183 @@
+import asyncio
 import json
+import threading
+from asgiref.sync import sync_to_async
 from django.views.decorators.csrf import csrf_exempt
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import HttpResponse, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
 from django.shortcuts import render
-from src.chains.ner_chain import MedicalNERChain
-from src.chains.sentiment_chain import SentimentAnalysisChain
-from src.chains.soap_chain import SOAPNoteChain
+from src.cache import get_result_cache
+from src.config import Config
+from src.metrics import render_metrics
+from src.pipeline import (
+    arun_chains,
+    arun_chains_batch,
+    arun_combined,
+    run_chains,
+    run_chains_batch,
+    run_combined,
+    stream_chains
+)
+from src.session import apply_turns, new_session_state, regenerate
+from src.startup import readiness
+from src.tracing import trace_request
+from .jobs import WebhookURLError, check_webhook_url, job_payload, submit_job
+from .models import AnalysisJob, AnalysisRecord, ConsultationSession
+from .store import InvalidCursor, list_records, save_analyses, save_analysis
 
+# Response keys for each chain's section
+SECTION_KEYS = {
+    "ner": "ner_extraction",
+    "sentiment": "sentiment_analysis",
+    "soap": "soap_note",
+}
 
-def analyze_medical_conversation(conversation):
+
+def _async_csrf_exempt(view_func):
+    """csrf_exempt for async views: Django 4.2's decorator wraps them in a sync function, which ASGI never awaits"""
+    view_func.csrf_exempt = True
+    return view_func
+
+
+def _section(chain_result, include_message=False):
+    """Shape a single chain result for the API response"""
+    section = {
+        "status": "success" if not chain_result.get("error") else "error",
+        "data": chain_result.get("data", {})
+    }
+    if include_message or chain_result.get("error"):
+        section["message"] = chain_result.get("message", "")
+    if chain_result.get("timeout"):
+        section["timeout"] = True
+    return section
+
+
+def analyze_medical_conversation(conversation, source=None, patient_id="", session_id=""):
     """
     Analyze medical conversation using three AI chains:
     1. NER Extraction (Symptoms, Treatment, Diagnosis, Prognosis)
     2. Sentiment & Intent Analysis
     3. SOAP Note Generation
-    """
 
-    # Initialize AI chains
-    ner_chain = MedicalNERChain()
-    sentiment_chain = SentimentAnalysisChain()
-    soap_chain = SOAPNoteChain()
+    The chains are independent, so they run concurrently. A chain that times
+    out or fails is reported with status "error" while the others still return.
+    With a source ("api", "job" ...) the analysis is also stored and its
+    "analysis_id" returned.
+    """
 
-    # Process through all chains
-    ner_result = ner_chain.process(conversation)
-    sentiment_result = sentiment_chain.process(conversation)
-    soap_result = soap_chain.process(conversation)
+    # Process through all chains concurrently
+    results = run_chains(conversation)
 
     # Build comprehensive result
-    result = {
-        "ner_extraction": {
-            "status": "success" if not ner_result.get("error") else "error",
-            "data": ner_result.get("data", {}),
-            "message": ner_result.get("message", "")
-        },
-        "sentiment_analysis": {
-            "status": "success" if not sentiment_result.get("error") else "error",
-            "data": sentiment_result.get("data", {})
-        },
-        "soap_note": {
-            "status": "success" if not soap_result.get("error") else "error",
-            "data": soap_result.get("data", {})
-        }
+    analysis = _build_analysis(results)
+    if source is not None:
+        _add_analysis_id(analysis, _store(conversation, results, source, patient_id, session_id))
+    return analysis
+
+
+async def analyze_medical_conversation_async(conversation, source=None, patient_id="", session_id=""):
+    """Async analyze_medical_conversation: awaits the chains instead of holding threads"""
+    results = await arun_chains(conversation)
+    analysis = _build_analysis(results)
+    if source is not None:
+        analysis_id = await sync_to_async(_store)(conversation, results, source, patient_id, session_id)
+        _add_analysis_id(analysis, analysis_id)
+    return analysis
+
+
+def analyze_medical_conversations(conversations, max_concurrency=None, source=None):
+    """
+    Analyze many conversations through the three AI chains in one go.
+
+    Each chain runs the whole batch with at most max_concurrency conversations
+    in flight (Config.BATCH_MAX_CONCURRENCY by default). Returns one item per
+    conversation, in input order; failed items carry an error instead of
+    failing the batch. With a source, the analyses are bulk-stored.
+    """
+    valid = [i for i, conversation in enumerate(conversations) if _is_conversation(conversation)]
+    results = run_chains_batch([conversations[i] for i in valid], max_concurrency=max_concurrency)
+    items = _build_batch(conversations, valid, results)
+    if source is not None:
+        _store_batch(conversations, valid, results, items, source)
+    return items
+
+
+async def analyze_medical_conversations_async(conversations, max_concurrency=None, source=None):
+    """Async analyze_medical_conversations using the chains' abatch"""
+    valid = [i for i, conversation in enumerate(conversations) if _is_conversation(conversation)]
+    results = await arun_chains_batch([conversations[i] for i in valid], max_concurrency=max_concurrency)
+    items = _build_batch(conversations, valid, results)
+    if source is not None:
+        await sync_to_async(_store_batch)(conversations, valid, results, items, source)
+    return items
+
+
+def _store(conversation, results, source, patient_id="", session_id=""):
+    """Store an analysis if enabled; returns its id. A storage failure never fails the request"""
+    if not Config.ANALYSIS_STORE_ENABLED:
+        return None
+    try:
+        return str(save_analysis(conversation, results, source, str(patient_id or ""), str(session_id or "")).id)
+    except Exception as e:
+        print(f"⚠ Could not store analysis: {str(e)}")
+        return None
+
+
+def _store_batch(conversations, valid, results, items, source):
+    """Bulk-store a batch's analyses and add their ids to the items"""
+    if not Config.ANALYSIS_STORE_ENABLED or not valid:
+        return
+    try:
+        records = save_analyses([(conversations[i], chain_results) for i, chain_results in zip(valid, results)], source)
+    except Exception as e:
+        print(f"⚠ Could not store batch analyses: {str(e)}")
+        return
+    for i, record in zip(valid, records):
+        _add_analysis_id(items[i]["data"], str(record.id))
+
+
+def _add_analysis_id(analysis, analysis_id):
+    if analysis_id is not None:
+        analysis["analysis_id"] = analysis_id
+
+
+def _is_conversation(conversation):
+    return isinstance(conversation, str) and conversation.strip() != ""
+
+
+def _build_batch(conversations, valid, results):
+    """Per-item batch results in input order"""
+    items = [
+        {"index": i, "success": False, "error": "Conversation text is empty."}
+        for i in range(len(conversations))
+    ]
+    for i, chain_results in zip(valid, results):
+        errors = [r.get("message", "") for r in chain_results.values() if r.get("error")]
+        items[i] = {"index": i, "success": len(errors) < len(chain_results), "data": _build_analysis(chain_results)}
+        if not items[i]["success"]:
+            items[i]["error"] = errors[0]
+    return items
+
+
+def _build_analysis(results):
+    """Combine per-chain results into the full analysis response"""
+    return {
+        SECTION_KEYS[name]: _section(chain_result, include_message=(name == "ner"))
+        for name, chain_result in results.items()
     }
 
-    return result
+
+def _timed_response(payload, trace, include_timing=False):
+    """
+    JSON response with the request's per-chain timings in a Server-Timing
+    header, plus the full stage breakdown under "timing" when asked for
+    """
+    if include_timing:
+        payload["timing"] = trace.breakdown()
+    response = JsonResponse(payload)
+    response["Server-Timing"] = trace.server_timing()
+    return response
 
 
 def chat_view(request):
@@ -69,12 +204,18 @@ def chat_api(request):
 
             # Analyze conversation
             print(f"\n🔍 Processing conversation ({len(conversation)} characters)...")
-            analysis = analyze_medical_conversation(conversation)
+            with trace_request() as trace:
+                analysis = analyze_medical_conversation(
+                    conversation,
+                    source="api",
+                    patient_id=data.get("patient_id", ""),
+                    session_id=data.get("session_id", "")
+                )
 
-            return JsonResponse({
+            return _timed_response({
                 "success": True,
                 "data": analysis
-            })
+            }, trace, data.get("include_timing"))
 
         except json.JSONDecodeError:
             return JsonResponse({
@@ -92,11 +233,173 @@ def chat_api(request):
         return HttpResponseBadRequest("Only POST method allowed.")
 
 
+def _sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_medical_analysis(conversation):
+    """
+    Yield the analysis as Server-Sent Events:
+    one event per section as soon as its chain finishes, SOAP note tokens
+    while the note is being generated, then a final "done" event.
+    """
+    # Open the stream straight away so the client sees the first byte immediately
+    yield ": analysis started\n\n"
+    try:
+        for name, kind, payload in stream_chains(conversation):
+            if kind == "token":
+                yield _sse_event(f"{name}_token", {"token": payload})
+            else:
+                yield _sse_event(SECTION_KEYS[name], _section(payload, include_message=(name == "ner")))
+        yield _sse_event("done", {"success": True})
+    except Exception as e:
+        print(f"❌ Error in chat_stream_api: {str(e)}")
+        yield _sse_event("error", {"success": False, "error": f"Processing error: {str(e)}"})
+
+
+async def stream_medical_analysis_async(conversation):
+    """
+    Async form of stream_medical_analysis for ASGI.
+
+    Django buffers a sync iterator whole under ASGI, so the sync generator
+    runs in its own thread and hands each event over through an asyncio.Queue
+    as soon as it is produced.
+    """
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    stop = threading.Event()  # Set when the client goes away
+    done = object()
+
+    def produce():
+        generator = stream_medical_analysis(conversation)
+        try:
+            for event in generator:
+                loop.call_soon_threadsafe(events.put_nowait, event)
+                if stop.is_set():
+                    break
+        finally:
+            generator.close()
+            loop.call_soon_threadsafe(events.put_nowait, done)
+
+    threading.Thread(target=produce, name="analysis-stream", daemon=True).start()
+    try:
+        while (event := await events.get()) is not done:
+            yield event
+    finally:
+        stop.set()
+
+
+def _stream_response(content):
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Stop reverse proxies from buffering the stream
+    return response
+
+
+@csrf_exempt
+def chat_stream_api(request):
+    """
+    Streaming variant of chat_api
+    Accepts POST requests with conversation text
+    Streams NER, Sentiment, and SOAP analysis as Server-Sent Events
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        conversation = data.get("conversation", "")
+        if conversation.strip() == "":
+            return HttpResponseBadRequest("Conversation text is empty.")
+
+        print(f"\n🔍 Streaming analysis ({len(conversation)} characters)...")
+        return _stream_response(stream_medical_analysis(conversation))
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@_async_csrf_exempt
+async def chat_stream_api_async(request):
+    """
+    Async variant of chat_stream_api for ASGI deployments
+    Events are sent as they are produced instead of after the whole analysis
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        conversation = data.get("conversation", "")
+        if conversation.strip() == "":
+            return HttpResponseBadRequest("Conversation text is empty.")
+
+        print(f"\n🔍 Streaming analysis ({len(conversation)} characters)...")
+        return _stream_response(stream_medical_analysis_async(conversation))
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@csrf_exempt
+def batch_analyze_api(request):
+    """
+    Batch analysis endpoint
+    Accepts POST requests with a list of conversations (up to BATCH_MAX_ITEMS)
+    Returns per-item analysis results and errors in input order
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            conversations = data.get("conversations", [])
+            max_concurrency = data.get("max_concurrency")
+
+            if not isinstance(conversations, list) or not conversations:
+                return HttpResponseBadRequest("Conversations must be a non-empty list.")
+            if len(conversations) > Config.BATCH_MAX_ITEMS:
+                return HttpResponseBadRequest(f"At most {Config.BATCH_MAX_ITEMS} conversations per batch.")
+            if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+                return HttpResponseBadRequest("max_concurrency must be a positive integer.")
+
+            print(f"\n🔍 Processing batch of {len(conversations)} conversations...")
+            with trace_request() as trace:
+                items = analyze_medical_conversations(conversations, max_concurrency=max_concurrency, source="batch")
+
+            return _timed_response({
+                "success": True,
+                "data": items
+            }, trace, data.get("include_timing"))
+
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        except Exception as e:
+            print(f"❌ Error in batch_analyze_api: {str(e)}")
+            return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
 @csrf_exempt
 def quick_analyze_api(request):
     """
     Quick analysis endpoint for specific analysis type
-    Supports: ner, sentiment, soap
+    Supports: ner, sentiment, soap, all
+    With type "all", "combined": true runs one combined LLM call instead
+    of one chain per section (default from COMBINED_ANALYSIS)
     """
     if request.method == "POST":
         try:
@@ -107,24 +410,105 @@ def quick_analyze_api(request):
             if conversation.strip() == "":
                 return HttpResponseBadRequest("Conversation text is empty.")
 
-            result = {}
+            selected = [name for name in ("ner", "sentiment", "soap") if analysis_type in [name, "all"]]
+            with trace_request() as trace:
+                if analysis_type == "all" and data.get("combined", Config.COMBINED_ANALYSIS):
+                    result = run_combined(conversation)
+                else:
+                    result = run_chains(conversation, chains=selected)
+                analysis_id = _store(conversation, result, "quick", data.get("patient_id", ""), data.get("session_id", ""))
+
+            payload = {
+                "success": True,
+                "data": result
+            }
+            _add_analysis_id(payload, analysis_id)
+            return _timed_response(payload, trace, data.get("include_timing"))
+
+        except Exception as e:
+            return JsonResponse({
+                "success": False,
+                "error": str(e)
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@_async_csrf_exempt
+async def chat_api_async(request):
+    """
+    Async variant of chat_api for ASGI deployments
+    Waiting on the LLM does not hold a server thread
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            conversation = data.get("conversation", "")
+
+            if conversation.strip() == "":
+                return HttpResponseBadRequest("Conversation text is empty.")
 
-            if analysis_type in ["ner", "all"]:
-                ner_chain = MedicalNERChain()
-                result["ner"] = ner_chain.process(conversation)
+            print(f"\n🔍 Processing conversation ({len(conversation)} characters)...")
+            with trace_request() as trace:
+                analysis = await analyze_medical_conversation_async(
+                    conversation,
+                    source="api",
+                    patient_id=data.get("patient_id", ""),
+                    session_id=data.get("session_id", "")
+                )
 
-            if analysis_type in ["sentiment", "all"]:
-                sentiment_chain = SentimentAnalysisChain()
-                result["sentiment"] = sentiment_chain.process(conversation)
+            return _timed_response({
+                "success": True,
+                "data": analysis
+            }, trace, data.get("include_timing"))
 
-            if analysis_type in ["soap", "all"]:
-                soap_chain = SOAPNoteChain()
-                result["soap"] = soap_chain.process(conversation)
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
 
+        except Exception as e:
+            print(f"❌ Error in chat_api_async: {str(e)}")
             return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@_async_csrf_exempt
+async def quick_analyze_api_async(request):
+    """
+    Async variant of quick_analyze_api for ASGI deployments
+    Supports: ner, sentiment, soap, all (optionally combined)
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            conversation = data.get("conversation", "")
+            analysis_type = data.get("type", "all")
+
+            if conversation.strip() == "":
+                return HttpResponseBadRequest("Conversation text is empty.")
+
+            selected = [name for name in ("ner", "sentiment", "soap") if analysis_type in [name, "all"]]
+            with trace_request() as trace:
+                if analysis_type == "all" and data.get("combined", Config.COMBINED_ANALYSIS):
+                    result = await arun_combined(conversation)
+                else:
+                    result = await arun_chains(conversation, chains=selected)
+                analysis_id = await sync_to_async(_store)(
+                    conversation, result, "quick", data.get("patient_id", ""), data.get("session_id", "")
+                )
+
+            payload = {
                 "success": True,
                 "data": result
-            })
+            }
+            _add_analysis_id(payload, analysis_id)
+            return _timed_response(payload, trace, data.get("include_timing"))
 
         except Exception as e:
             return JsonResponse({
@@ -133,3 +517,371 @@ def quick_analyze_api(request):
             }, status=500)
     else:
         return HttpResponseBadRequest("Only POST method allowed.")
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint for this worker process
+    Per-stage LLM latency, tokens, retries and cost; chain wall and queue
+    time; cache hits; parse failures
+    """
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def healthz_view(request):
+    """
+    Liveness probe: the process is up and serving requests
+    Checks nothing else, so a saturated or warming worker is not restarted
+    """
+    return JsonResponse({"status": "ok"})
+
+
+def readyz_view(request):
+    """
+    Readiness probe for the load balancer
+    200 once this worker has warmed up (chains built, provider connections
+    open) and while neither the rate limiter nor the provider is saturated;
+    503 otherwise, with the reasons
+    """
+    report = readiness()
+    return JsonResponse(report, status=200 if report["ready"] else 503)
+
+
+def cache_stats_api(request):
+    """
+    Result cache counters for this worker process
+    Reports memory/persistent hits, misses and hit rate
+    """
+    if request.method == "GET":
+        return JsonResponse({
+            "success": True,
+            "data": get_result_cache().stats()
+        })
+    else:
+        return HttpResponseBadRequest("Only GET method allowed.")
+
+
+def _session_data(session, results=None, soap_regenerated=False):
+    """Running analysis for a live session, shaped like the full analysis sections"""
+    data = {
+        "session_id": str(session.id),
+        "turn_count": session.turn_count,
+        "finalized": session.finalized,
+        "ner_extraction": {"status": "success", "data": session.entities},
+        "sentiment_analysis": {"status": "success", "data": session.sentiment},
+        "soap_note": {"status": "success", "data": session.soap},
+    }
+    if results is not None:
+        # What this update's chains reported; a failed chain leaves its section unchanged
+        data["update"] = {SECTION_KEYS[name]: _section(result) for name, result in results.items()}
+        data["soap_regenerated"] = soap_regenerated
+    return data
+
+
+def _get_session(session_id):
+    try:
+        return ConsultationSession.objects.get(pk=session_id)
+    except ConsultationSession.DoesNotExist:
+        return None
+
+
+@csrf_exempt
+def session_create_api(request):
+    """
+    Start a live consultation session
+    Accepts POST requests with optional opening dialogue ("turns")
+    Returns the session id and the running analysis
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body or b"{}")
+            turns = data.get("turns", "")
+            if not isinstance(turns, str):
+                return HttpResponseBadRequest("Turns must be a string.")
+
+            session = ConsultationSession.objects.create()
+            results, soap_regenerated = None, False
+            if turns.strip():
+                state, results, soap_regenerated = apply_turns(new_session_state(), turns)
+                session.save_state(state)
+
+            return JsonResponse({
+                "success": True,
+                "data": _session_data(session, results, soap_regenerated)
+            }, status=201)
+
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        except Exception as e:
+            print(f"❌ Error in session_create_api: {str(e)}")
+            return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@csrf_exempt
+def session_api(request, session_id):
+    """
+    Live consultation session
+    GET returns the running analysis
+    POST appends new dialogue turns ("turns") and analyses only those,
+    with "regenerate_soap": true to rebuild the SOAP draft from the full transcript
+    """
+    session = _get_session(session_id)
+    if session is None:
+        return JsonResponse({
+            "success": False,
+            "error": "Session not found"
+        }, status=404)
+
+    if request.method == "GET":
+        return JsonResponse({
+            "success": True,
+            "data": _session_data(session)
+        })
+
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            turns = data.get("turns", "")
+
+            if not isinstance(turns, str):
+                return HttpResponseBadRequest("Turns must be a string.")
+            if turns.strip() == "":
+                return HttpResponseBadRequest("Turns text is empty.")
+            if session.finalized:
+                return JsonResponse({
+                    "success": False,
+                    "error": "Session is finalized"
+                }, status=409)
+
+            print(f"\n🔍 Session {session.id}: analysing {len(turns)} new characters...")
+            state, results, soap_regenerated = apply_turns(
+                session.get_state(), turns, regenerate_soap=bool(data.get("regenerate_soap"))
+            )
+            if not session.save_state(state):
+                return JsonResponse({
+                    "success": False,
+                    "error": "Session was updated concurrently; resend these turns"
+                }, status=409)
+
+            return JsonResponse({
+                "success": True,
+                "data": _session_data(session, results, soap_regenerated)
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        except Exception as e:
+            print(f"❌ Error in session_api: {str(e)}")
+            return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+
+    return HttpResponseBadRequest("Only GET and POST methods allowed.")
+
+
+@csrf_exempt
+def session_finalize_api(request, session_id):
+    """
+    Finish a live consultation session
+    Re-runs all three chains over the full transcript and closes the session
+    """
+    if request.method == "POST":
+        session = _get_session(session_id)
+        if session is None:
+            return JsonResponse({
+                "success": False,
+                "error": "Session not found"
+            }, status=404)
+
+        try:
+            print(f"\n🔍 Session {session.id}: final analysis of {session.turn_count} turns...")
+            state, results = regenerate(session.get_state())
+            if not session.save_state(state, finalized=True):
+                return JsonResponse({
+                    "success": False,
+                    "error": "Session was updated concurrently; finalize again"
+                }, status=409)
+
+            return JsonResponse({
+                "success": True,
+                "data": _session_data(session, results, soap_regenerated=True)
+            })
+
+        except Exception as e:
+            print(f"❌ Error in session_finalize_api: {str(e)}")
+            return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+@csrf_exempt
+def job_submit_api(request):
+    """
+    Queue a full analysis and return at once
+    Accepts POST requests with conversation text, optional priority (higher
+    runs first) and webhook_url to receive the finished job
+    Returns 202 with the job id; identical in-flight submissions share a job
+    """
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body)
+            conversation = data.get("conversation", "")
+            priority = data.get("priority", 0)
+            webhook_url = data.get("webhook_url", "")
+
+            if conversation.strip() == "":
+                return HttpResponseBadRequest("Conversation text is empty.")
+            if not isinstance(priority, int) or isinstance(priority, bool):
+                return HttpResponseBadRequest("priority must be an integer.")
+            if webhook_url:
+                try:
+                    URLValidator(schemes=["http", "https"])(webhook_url)
+                    check_webhook_url(webhook_url)
+                except ValidationError:
+                    return HttpResponseBadRequest("webhook_url must be an http(s) URL.")
+                except WebhookURLError as e:
+                    return HttpResponseBadRequest(str(e))
+
+            job, created = submit_job(conversation, priority=priority, webhook_url=webhook_url)
+            print(f"\n🔍 Job {job.id} {'queued' if created else 'already in flight'} "
+                  f"({len(conversation)} characters, priority {job.priority})")
+
+            return JsonResponse({
+                "success": True,
+                "data": {**job_payload(job), "deduplicated": not created}
+            }, status=202)
+
+        except json.JSONDecodeError:
+            return JsonResponse({
+                "success": False,
+                "error": "Invalid JSON format"
+            }, status=400)
+
+        except Exception as e:
+            print(f"❌ Error in job_submit_api: {str(e)}")
+            return JsonResponse({
+                "success": False,
+                "error": f"Processing error: {str(e)}"
+            }, status=500)
+    else:
+        return HttpResponseBadRequest("Only POST method allowed.")
+
+
+def job_status_api(request, job_id):
+    """
+    Poll a queued analysis
+    Returns the job status, and the analysis once it is done
+    """
+    if request.method == "GET":
+        try:
+            job = AnalysisJob.objects.get(pk=job_id)
+        except AnalysisJob.DoesNotExist:
+            return JsonResponse({
+                "success": False,
+                "error": "Job not found"
+            }, status=404)
+
+        return JsonResponse({
+            "success": True,
+            "data": job_payload(job)
+        })
+    else:
+        return HttpResponseBadRequest("Only GET method allowed.")
+
+
+def _record_data(record, include_results=True):
+    """Stored analysis; the sections are shaped like the live chat_api response"""
+    chain_results = list(record.chain_results.all())
+    data = {
+        "analysis_id": str(record.id),
+        "transcript_hash": record.transcript_hash,
+        "patient_id": record.patient_id,
+        "session_id": record.session_id,
+        "source": record.source,
+        "model": record.model_name,
+        "created_at": record.created_at.isoformat(),
+        "total_ms": record.total_ms,
+    }
+    if not include_results:
+        data["chains"] = {row.chain: row.status for row in chain_results}
+        return data
+
+    data["transcript"] = record.transcript
+    data["timing"] = record.timing
+    data["prompt_versions"] = {row.chain: row.prompt_version for row in chain_results}
+    data.update(_build_analysis({
+        row.chain: {"error": row.status == "error", "data": row.data, "message": row.message}
+        for row in chain_results
+    }))
+    return data
+
+
+def analyses_api(request):
+    """
+    List stored analyses, newest first
+    Filters: patient_id, session_id, transcript_hash; keyset pagination with
+    limit and the previous page's next_cursor
+    """
+    if request.method == "GET":
+        filters = {
+            field: request.GET[field]
+            for field in ("patient_id", "session_id", "transcript_hash") if request.GET.get(field)
+        }
+        try:
+            limit = int(request.GET.get("limit", Config.ANALYSIS_PAGE_SIZE))
+        except ValueError:
+            return HttpResponseBadRequest("limit must be an integer.")
+        if not 1 <= limit <= Config.ANALYSIS_PAGE_MAX:
+            return HttpResponseBadRequest(f"limit must be between 1 and {Config.ANALYSIS_PAGE_MAX}.")
+
+        try:
+            records, next_cursor = list_records(filters, limit, request.GET.get("cursor"))
+        except InvalidCursor as e:
+            return HttpResponseBadRequest(str(e))
+
+        return JsonResponse({
+            "success": True,
+            "data": [_record_data(record, include_results=False) for record in records],
+            "next_cursor": next_cursor
+        })
+    else:
+        return HttpResponseBadRequest("Only GET method allowed.")
+
+
+def analysis_detail_api(request, analysis_id):
+    """
+    Retrieve a stored analysis
+    Returns the transcript, every section, timings and versions without calling the LLM
+    """
+    if request.method == "GET":
+        try:
+            record = AnalysisRecord.objects.prefetch_related("chain_results").get(pk=analysis_id)
+        except AnalysisRecord.DoesNotExist:
+            return JsonResponse({
+                "success": False,
+                "error": "Analysis not found"
+            }, status=404)
+
+        return JsonResponse({
+            "success": True,
+            "data": _record_data(record)
+        })
+    else:
+        return HttpResponseBadRequest("Only GET method allowed.")
@@ -25,6 +25,7 @@ from django.urls import path, include
 from django.contrib import admin
 from django.urls import path, include
 from django.views.generic import RedirectView
+from chat import views as chat_views
 
 urlpatterns = [
     # Admin panel
@@ -33,6 +34,13 @@ urlpatterns = [
     # Chat app URLs
     path('physician-notetaker/', include('chat.urls')),
 
+    # Prometheus metrics (per worker process)
+    path('metrics', chat_views.metrics_view, name='metrics'),
+
+    # Liveness and readiness probes (per worker process)
+    path('healthz', chat_views.healthz_view, name='healthz'),
+    path('readyz', chat_views.readyz_view, name='readyz'),
+
     # Redirect root URL to chat
     # path('', RedirectView.as_view(url='/chat/', permanent=False)),
 ]
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings, read from the working directory (start.py and start.sh
+run gunicorn from physician-notetaker/). Command-line flags take precedence.
+
+GUNICORN_PRELOAD=true loads the app in the master before forking workers
+(--preload) and imports the chain modules there as well, so workers share
+them copy-on-write instead of each importing LangChain on its first
+request. See src/startup.py.
+
+Every worker warms up (WARMUP_ENABLED, WARMUP_ANALYSIS) before it accepts
+requests; /readyz reports the result.
+"""
+import os
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker is forked
+    if server.cfg.preload_app:
+        from src.startup import preload
+        preload()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from src.startup import after_fork
+        after_fork()
+
+
+def post_worker_init(worker):
+    # Build the chains and open the provider connections before this worker accepts requests
+    from src.startup import warm_up
+    warm_up()
@@ -3,15 +3,8 @@ from src.chains.ner_chain import MedicalNERChain
 from src.chains.sentiment_chain import SentimentAnalysisChain
 from src.chains.soap_chain import SOAPNoteChain
 
-def print_section(title: str):
-    """Print formatted section header"""
-    print("\n" + "="*60)
-    print(f"  {title}")
-    print("="*60)
-
-def main():
-    # Sample conversation
-    conversation = """
+# Sample conversation
+SAMPLE_CONVERSATION = """
     Physician: Good morning, Ms. Jones. How are you feeling today?
 
     Patient: Good morning, doctor. I'm doing better, but I still have some discomfort now and then.
@@ -67,6 +60,16 @@ def main():
     Physician: You're very welcome, Ms. Jones. Take care, and don't hesitate to reach out if you need anything.
     """
 
+
+def print_section(title: str):
+    """Print formatted section header"""
+    print("\n" + "="*60)
+    print(f"  {title}")
+    print("="*60)
+
+def main():
+    conversation = SAMPLE_CONVERSATION
+
     print("\n🩺 PHYSICIAN NOTETAKER - AI Medical Transcription System")
     print("="*60)
 
@@ -0,0 +1,216 @@
+import copy
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from src.config import Config
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_conversation(conversation: str) -> str:
+    """Normalize a transcript for cache keys: trim and collapse whitespace"""
+    return _WHITESPACE_RE.sub(" ", conversation).strip()
+
+
+def prompt_version(*prompts) -> str:
+    """Fingerprint a chain's prompt templates so edits invalidate cached results"""
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(prompt.template.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def make_key(conversation: str, chain_name: str, version: str, model_name: str) -> str:
+    """Content-addressed key for one chain result"""
+    digest = hashlib.sha256()
+    for part in (normalize_conversation(conversation), chain_name, version, model_name):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """Persistent tier in a SQLite file, shared by all workers on the host"""
+
+    def __init__(self, path: str, ttl: float, max_entries: int = 0, prune_every: int = 0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS result_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS result_cache_expires_at ON result_cache (expires_at)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM result_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl)
+            )
+        if self.prune_every > 0:
+            with self._writes_lock:
+                self._writes += 1
+                due = self._writes % self.prune_every == 0
+            if due:
+                self.prune()
+
+    def prune(self) -> int:
+        """Delete expired rows, then the soonest-expiring rows beyond max_entries"""
+        with self._connect() as conn:
+            deleted = conn.execute("DELETE FROM result_cache WHERE expires_at < ?", (time.time(),)).rowcount
+            if self.max_entries > 0:
+                deleted += conn.execute(
+                    "DELETE FROM result_cache WHERE key IN ("
+                    "SELECT key FROM result_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+        return deleted
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM result_cache")
+
+
+class ResultCache:
+    """Two-tier chain result cache with hit/miss counters"""
+
+    def __init__(self, max_entries: int, ttl: float, sqlite_path: str = "",
+                 sqlite_max_entries: int = 0, sqlite_prune_every: int = 0):
+        self.memory = LRUCache(max_entries, ttl)
+        self.persistent = SQLiteCache(
+            sqlite_path, ttl, sqlite_max_entries, sqlite_prune_every
+        ) if sqlite_path else None
+        self._stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def get(self, key):
+        """Return a copy of the cached value, or None on a miss"""
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return copy.deepcopy(value)
+
+        if self.persistent is not None:
+            try:
+                value = self.persistent.get(key)
+            except sqlite3.Error as e:
+                print(f"⚠ Result cache read failed: {str(e)}")
+                self._count("errors")
+                value = None
+            if value is not None:
+                self._count("persistent_hits")
+                self.memory.set(key, value)
+                return copy.deepcopy(value)
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        self.memory.set(key, copy.deepcopy(value))
+        if self.persistent is not None:
+            try:
+                self.persistent.set(key, value)
+            except sqlite3.Error as e:
+                print(f"⚠ Result cache write failed: {str(e)}")
+                self._count("errors")
+
+    def clear(self):
+        self.memory.clear()
+        if self.persistent is not None:
+            self.persistent.clear()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["persistent_enabled"] = self.persistent is not None
+        return stats
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    Config.CACHE_MAX_ENTRIES,
+                    Config.CACHE_TTL,
+                    Config.CACHE_SQLITE_PATH,
+                    Config.CACHE_SQLITE_MAX_ENTRIES,
+                    Config.CACHE_SQLITE_PRUNE_EVERY
+                )
+    return _result_cache
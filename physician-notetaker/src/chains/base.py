@@ -0,0 +1,324 @@
+import asyncio
+import json
+import threading
+from langchain_core.output_parsers import StrOutputParser
+from pydantic import ValidationError
+from src.cache import get_result_cache, make_key, prompt_version
+from src.config import Config
+from src.llm import get_llm
+from src.prompts.repair_prompts import JSON_REPAIR_PROMPT
+from src.singleflight import get_single_flight
+from src.tracing import record_cache_lookup, record_json_repair, record_parse_failure
+from src.utils.chunking import is_long_transcript, merge_values, split_transcript
+from src.utils.json_extract import extract_json, JSONExtractionError
+from src.utils.transcript import prepare_transcript
+
+
+class BaseChain:
+    """Shared plumbing for the analysis chains: one LLM client, one compiled runnable"""
+
+    name = None
+    prompts = ()  # Prompt templates whose text versions the cached results
+    schema = None  # Pydantic model the chain's JSON output is validated against
+    speakers = None  # Speaker roles the chain is sent (src/utils/transcript.py); None sends the whole dialogue
+
+    def __init__(self, llm=None):
+        self.llm = llm if llm is not None else get_llm()
+        self.prompt_version = prompt_version(*self.prompts)
+        self._chain = None
+        self._repair_chain = None
+        self._chain_lock = threading.Lock()
+
+    def build_chain(self):
+        """Build the LCEL runnable for this chain"""
+        raise NotImplementedError
+
+    def get_runnable(self):
+        """Return the compiled runnable, building it on first use"""
+        if self._chain is None:
+            with self._chain_lock:
+                if self._chain is None:
+                    self._chain = self.build_chain()
+        return self._chain
+
+    def json_llm(self, stage: str):
+        """LLM for a stage that answers in JSON, in provider-side JSON mode unless disabled"""
+        llm = self.llm.bind(response_format=Config.RESPONSE_FORMAT) if Config.JSON_MODE else self.llm
+        return llm.with_config(run_name=stage)
+
+    def get_repair_chain(self):
+        """Runnable for the one-shot JSON repair call"""
+        if self._repair_chain is None:
+            with self._chain_lock:
+                if self._repair_chain is None:
+                    self._repair_chain = (
+                        JSON_REPAIR_PROMPT
+                        | self.json_llm(f"{self.name}.repair")
+                        | StrOutputParser()
+                    )
+        return self._repair_chain
+
+    def _validate(self, text) -> dict:
+        data = extract_json(text)
+        if self.schema is None:
+            return data
+        return self.schema.model_validate(data).model_dump()
+
+    def parse_json(self, text):
+        """
+        Extract and validate the chain's JSON output, making one repair call
+        if that fails. Returns the validated dict, or None when the output
+        could not be recovered.
+        """
+        try:
+            return self._validate(text)
+        except (JSONExtractionError, ValidationError) as e:
+            record_parse_failure(self.name)
+            error = e
+
+        if not Config.JSON_REPAIR_ENABLED or not text:
+            return None
+
+        schema = self.schema.model_json_schema() if self.schema is not None else {"type": "object"}
+        try:
+            repaired = self.get_repair_chain().invoke({
+                "schema": json.dumps(schema, separators=(",", ":")),
+                "errors": str(error)[:1000],
+                "output": text
+            })
+            data = self._validate(repaired)
+        except Exception as e:
+            print(f"⚠ {self.name} output repair failed: {str(e)}")
+            record_json_repair(self.name, False)
+            return None
+
+        record_json_repair(self.name, True)
+        return data
+
+    @classmethod
+    def prepare(cls, conversation: str) -> str:
+        """Transcript as it is sent to the LLM and keyed in the cache"""
+        return prepare_transcript(conversation, cls.speakers)
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.llm, "model_name", Config.GROQ_MODEL)
+
+    def cache_key(self, conversation: str) -> str:
+        """Result cache key for this chain, prompt version and model"""
+        return make_key(conversation, self.name, self.prompt_version, self.model_name)
+
+    def _tag(self, result):
+        """Record the prompt version and model on a result, so storing it needs no chain (chat/store.py)"""
+        if isinstance(result, dict):
+            result.setdefault("prompt_version", self.prompt_version)
+            result.setdefault("model", self.model_name)
+        return result
+
+    def _cache_lookup(self, cache, key: str):
+        result = cache.get(key)
+        record_cache_lookup(self.name, result is not None)
+        return result
+
+    @staticmethod
+    def _cacheable(result) -> bool:
+        """Unparseable output is not cached, so a retry gets a fresh answer"""
+        return not result.get("parse_failed")
+
+    def process(self, conversation: str) -> dict:
+        """
+        Process conversation, serving repeated transcripts from the result cache.
+        Identical concurrent requests share one run (see src/singleflight.py).
+        """
+        conversation = self.prepare(conversation)
+        cache = get_result_cache() if Config.CACHE_ENABLED else None
+        key = self.cache_key(conversation)
+        result = self._cache_lookup(cache, key) if cache is not None else None
+        if result is not None:
+            return self._tag(result)
+
+        def compute():
+            computed = self._process(conversation)
+            if cache is not None and self._cacheable(computed):
+                cache.set(key, computed)
+            return computed
+
+        if not Config.SINGLEFLIGHT_ENABLED:
+            return self._tag(compute())
+        lookup = (lambda: cache.get(key)) if cache is not None else None
+        return self._tag(get_single_flight().do(key, compute, lookup))
+
+    async def aprocess(self, conversation: str) -> dict:
+        """Async process(): awaits the LLM calls instead of blocking a thread"""
+        conversation = self.prepare(conversation)
+        cache = get_result_cache() if Config.CACHE_ENABLED else None
+        key = self.cache_key(conversation)
+        result = self._cache_lookup(cache, key) if cache is not None else None
+        if result is not None:
+            return self._tag(result)
+
+        async def compute():
+            computed = await self._aprocess(conversation)
+            if cache is not None and self._cacheable(computed):
+                cache.set(key, computed)
+            return computed
+
+        if not Config.SINGLEFLIGHT_ENABLED:
+            return self._tag(await compute())
+        lookup = (lambda: cache.get(key)) if cache is not None else None
+        return self._tag(await get_single_flight().ado(key, compute, lookup))
+
+    def batch_process(self, conversations, max_concurrency: int = None) -> list:
+        """
+        Process many conversations with the runnable's batch(), at most
+        max_concurrency LLM pipelines in flight. Returns one result dict or
+        exception per conversation, in input order.
+        """
+        conversations = [self.prepare(conversation) for conversation in conversations]
+        results, misses = self._cached_batch(conversations)
+        long_items = [i for i in misses if is_long_transcript(conversations[i])]
+        for i in long_items:
+            results[i] = self.process(conversations[i])
+        misses = [i for i in misses if i not in long_items]
+        if misses:
+            outputs = self.get_runnable().batch(
+                [{"conversation": conversations[i]} for i in misses],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True
+            )
+            self._store_batch(conversations, results, misses, outputs)
+        return [self._tag(result) for result in results]
+
+    async def abatch_process(self, conversations, max_concurrency: int = None) -> list:
+        """Async batch_process() using the runnable's abatch()"""
+        conversations = [self.prepare(conversation) for conversation in conversations]
+        results, misses = self._cached_batch(conversations)
+        long_items = [i for i in misses if is_long_transcript(conversations[i])]
+        long_results = await asyncio.gather(*(self.aprocess(conversations[i]) for i in long_items))
+        for i, result in zip(long_items, long_results):
+            results[i] = result
+        misses = [i for i in misses if i not in long_items]
+        if misses:
+            outputs = await self.get_runnable().abatch(
+                [{"conversation": conversations[i]} for i in misses],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True
+            )
+            await asyncio.to_thread(self._store_batch, conversations, results, misses, outputs)
+        return [self._tag(result) for result in results]
+
+    def _cached_batch(self, conversations):
+        """Cached results for a batch plus the indexes that still need the LLM"""
+        if not Config.CACHE_ENABLED:
+            return [None] * len(conversations), list(range(len(conversations)))
+
+        cache = get_result_cache()
+        results = [self._cache_lookup(cache, self.cache_key(conversation)) for conversation in conversations]
+        misses = [i for i, result in enumerate(results) if result is None]
+        return results, misses
+
+    def _store_batch(self, conversations, results, misses, outputs):
+        """Parse batch outputs into results, caching the successful ones"""
+        cache = get_result_cache() if Config.CACHE_ENABLED else None
+        for i, output in zip(misses, outputs):
+            if isinstance(output, Exception):
+                results[i] = output
+                continue
+            results[i] = self._parse_output(output)
+            if cache is not None and self._cacheable(results[i]):
+                cache.set(self.cache_key(conversations[i]), results[i])
+
+    def stream_process(self, conversation: str):
+        """
+        Yield ("token", text) pieces while the chain runs, then ("result", dict).
+
+        Cached results and chains without token streaming yield only the result.
+        """
+        conversation = self.prepare(conversation)
+        cache = get_result_cache() if Config.CACHE_ENABLED else None
+        key = self.cache_key(conversation)
+        result = self._cache_lookup(cache, key) if cache is not None else None
+        if result is not None:
+            yield "result", self._tag(result)
+            return
+
+        for kind, payload in self._stream_or_chunk(conversation):
+            if kind == "result":
+                if cache is not None and self._cacheable(payload):
+                    cache.set(key, payload)
+                self._tag(payload)
+            yield kind, payload
+
+    def _stream_or_chunk(self, conversation: str):
+        """Long transcripts are chunked, so they report only the merged result"""
+        if is_long_transcript(conversation):
+            yield "result", self._process(conversation)
+        else:
+            yield from self._stream_process(conversation)
+
+    def _stream_process(self, conversation: str):
+        """Default streaming: no tokens, just the finished result"""
+        yield "result", self._process(conversation)
+
+    def _process(self, conversation: str) -> dict:
+        """Run the chain on a conversation and shape its result"""
+        if is_long_transcript(conversation):
+            return self._process_chunks(split_transcript(conversation))
+        result = self.get_runnable().invoke({"conversation": conversation})
+        return self._parse_output(result)
+
+    async def _aprocess(self, conversation: str) -> dict:
+        """Async _process() using the runnable's ainvoke"""
+        if is_long_transcript(conversation):
+            return await self._aprocess_chunks(split_transcript(conversation))
+        result = await self.get_runnable().ainvoke({"conversation": conversation})
+        # Parsing may make a repair call; keep it off the event loop
+        return await asyncio.to_thread(self._parse_output, result)
+
+    def _process_chunks(self, chunks) -> dict:
+        """Map: run every chunk through the chain in parallel. Reduce: merge the results"""
+        outputs = self.get_runnable().batch(
+            [{"conversation": chunk} for chunk in chunks],
+            config={"max_concurrency": Config.CHUNK_MAX_CONCURRENCY},
+            return_exceptions=True
+        )
+        return self.merge_results(self._parse_chunk_outputs(outputs))
+
+    async def _aprocess_chunks(self, chunks) -> dict:
+        """Async _process_chunks() using the runnable's abatch()"""
+        outputs = await self.get_runnable().abatch(
+            [{"conversation": chunk} for chunk in chunks],
+            config={"max_concurrency": Config.CHUNK_MAX_CONCURRENCY},
+            return_exceptions=True
+        )
+        return self.merge_results(await asyncio.to_thread(self._parse_chunk_outputs, outputs))
+
+    def _parse_chunk_outputs(self, outputs) -> list:
+        results = []
+        for output in outputs:
+            if isinstance(output, Exception):
+                print(f"⚠ {self.name} chunk failed: {str(output)}")
+                results.append({"error": True, "message": str(output)})
+            else:
+                results.append(self._parse_output(output))
+        return results
+
+    def merge_results(self, results) -> dict:
+        """
+        Combine results for parts of one conversation (chunks, or live session
+        updates) into one. Failed parts are dropped; if every part failed,
+        the first failure is returned.
+        """
+        succeeded = [result for result in results if not result.get("error") and not result.get("parse_failed")]
+        if not succeeded:
+            return results[0]
+        return {
+            "error": False,
+            "data": merge_values([result["data"] for result in succeeded]),
+            "chunks": len(results),
+            "failed_chunks": len(results) - len(succeeded)
+        }
+
+    def _parse_output(self, result) -> dict:
+        """Shape the runnable's raw output into the chain's result dict"""
+        raise NotImplementedError
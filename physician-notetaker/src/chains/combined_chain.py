@@ -0,0 +1,111 @@
+import json
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnablePassthrough
+from pydantic import ValidationError
+from src.chains.base import BaseChain
+from src.chains.ner_chain import MedicalNERChain
+from src.chains.sentiment_chain import SentimentAnalysisChain
+from src.prompts.combined_prompts import COMBINED_ANALYSIS_PROMPT
+from src.utils.json_extract import extract_json, JSONExtractionError
+from src.utils.validators import CombinedAnalysis, NEREntities, SentimentResult, SOAPNote
+
+# Dedicated chain -> (field in the combined output, schema of that section)
+SECTIONS = {
+    "ner": ("entities", NEREntities),
+    "sentiment": ("sentiment", SentimentResult),
+    "soap": ("soap_note", SOAPNote),
+}
+
+
+class CombinedAnalysisChain(BaseChain):
+    """
+    NER, sentiment and SOAP from one JSON-mode call.
+
+    Each section is validated against its own schema and then post-processed
+    like the dedicated chain's output: entities are normalized against the
+    transcript and sentiment quotes limited to the patient's turns. A
+    section that fails is left out of "sections" and listed in
+    "failed_sections", for the caller to re-request through the dedicated
+    chain (see src.pipeline.run_combined).
+    """
+
+    name = "combined"
+    prompts = (COMBINED_ANALYSIS_PROMPT,)
+    schema = CombinedAnalysis
+
+    def build_chain(self):
+        """Build the combined analysis chain using LCEL"""
+        # The transcript is passed through for the sections' post-processing
+        chain = RunnablePassthrough.assign(output=(
+            COMBINED_ANALYSIS_PROMPT
+            | self.json_llm("combined")
+            | StrOutputParser()
+        ))
+        return chain
+
+    def _validate(self, text) -> dict:
+        """Only the envelope must parse here; sections are checked one by one"""
+        data = extract_json(text)
+        if not isinstance(data, dict):
+            raise JSONExtractionError("Expected a JSON object")
+        return data
+
+    def _parse_output(self, result) -> dict:
+        """Split the combined JSON into per-chain results"""
+        conversation = result["conversation"]
+        combined = self.parse_json(result["output"])
+        if combined is None:
+            return {
+                "error": False,
+                "parse_failed": True,
+                "sections": {},
+                "failed_sections": list(SECTIONS),
+                "raw_output": result["output"]
+            }
+        if combined.get("is_medical") is False:
+            return {"error": False, "is_medical": False, "sections": {}, "failed_sections": []}
+
+        sections, failed = {}, []
+        for name, (field, schema) in SECTIONS.items():
+            try:
+                data = schema.model_validate(combined.get(field)).model_dump()
+            except ValidationError:
+                failed.append(name)
+                continue
+            sections[name] = {"error": False, "data": data}
+        if "ner" in sections:
+            sections["ner"] = {
+                **MedicalNERChain.entity_result(sections["ner"]["data"], conversation, "single_pass"),
+                "raw_extraction": json.dumps(combined.get("entities"))
+            }
+        if "sentiment" in sections:
+            sections["sentiment"]["data"] = SentimentAnalysisChain.patient_quotes_only(
+                sections["sentiment"]["data"], conversation
+            )
+        for section in sections.values():
+            self._tag(section)  # The combined prompt produced every section
+        return {"error": False, "is_medical": True, "sections": sections, "failed_sections": failed}
+
+    def merge_results(self, results) -> dict:
+        """Merge chunk results section by section with the dedicated chains' merge rules"""
+        from src.chains.registry import get_chain
+
+        usable = [
+            result for result in results
+            if not result.get("error") and not result.get("parse_failed") and result.get("is_medical", True)
+        ]
+        if not usable:
+            return {"error": True, "message": "Combined analysis failed for every chunk"}
+
+        sections = {}
+        for name in SECTIONS:
+            section_results = [result["sections"][name] for result in usable if name in result["sections"]]
+            if section_results:
+                sections[name] = self._tag(get_chain(name).merge_results(section_results))
+        return {
+            "error": False,
+            "is_medical": True,
+            "sections": sections,
+            "failed_sections": [name for name in SECTIONS if name not in sections],
+            "chunks": len(results)
+        }
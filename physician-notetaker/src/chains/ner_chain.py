@@ -1,36 +1,142 @@
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 import json
+from src.chains.base import BaseChain
 from src.config import Config
 from src.prompts.ner_prompts import (
     MEDICAL_VALIDATOR_PROMPT,
     NER_EXTRACTION_PROMPT,
-    NER_VALIDATOR_PROMPT
+    NER_VALIDATOR_PROMPT,
+    NER_SINGLE_PASS_PROMPT
 )
+from pydantic import ValidationError
+from src.tracing import record_ner_verification
+from src.utils.entity_normalizer import ENTITY_FIELDS, normalize_entities
+from src.utils.json_extract import extract_json, JSONExtractionError
+from src.utils.medical_filter import classify_conversation, NON_MEDICAL
+from src.utils.validators import NEREntities
 
-class MedicalNERChain:
-    def __init__(self):
-        self.llm = ChatGroq(
-            groq_api_key=Config.GROQ_API_KEY,
-            model_name=Config.GROQ_MODEL,
-            temperature=Config.TEMPERATURE
-        )
+NER_MODES = ("fast", "thorough")
+
+NON_MEDICAL_MESSAGE = "Sorry, I can only process medical conversations. I'm designed to extract medical information like symptoms, treatments, diagnoses, and prognosis from healthcare-related discussions."
+
+class MedicalNERChain(BaseChain):
+    name = "ner"
+    schema = NEREntities
+
+    def __init__(self, llm=None, mode=None):
+        self.mode = mode or Config.NER_MODE
+        if self.mode not in NER_MODES:
+            raise ValueError(f"Unknown NER mode '{self.mode}', expected one of {NER_MODES}")
+
+        if self.mode == "fast":
+            self.prompts = (NER_SINGLE_PASS_PROMPT,)
+        else:
+            self.prompts = (MEDICAL_VALIDATOR_PROMPT, NER_EXTRACTION_PROMPT, NER_VALIDATOR_PROMPT)
+        super().__init__(llm)
+
+    def _local_validation(self, conversation: str):
+        """Medical/non-medical label from the local pre-filter, or None when the LLM must decide"""
+        if not Config.PREFILTER_ENABLED:
+            return None
+        return classify_conversation(conversation).label
+
+    def _verify_locally(self, conversation: str, extracted: str):
+        """
+        Extracted entities as normalized JSON when every one of them matches
+        the transcript exactly, so the LLM verification call can be skipped;
+        None when that call is still needed, including for fuzzy matches.
+        """
+        if not Config.NER_LOCAL_VERIFY:
+            return None
+        try:
+            entities = self._validate(extracted)
+        except (JSONExtractionError, ValidationError):
+            return None
+        if not any(entities.get(field) for field in ENTITY_FIELDS):
+            return None  # Nothing to check; the LLM may still find missing entities
+        normalized, report = normalize_entities(entities, conversation)
+        if report.unverified or report.uncertain:
+            return None
+        return json.dumps(normalized)
 
     def build_chain(self):
+        """Build the NER pipeline for the configured mode"""
+        if self.mode == "fast":
+            return self.build_fast_chain()
+        return self.build_thorough_chain()
+
+    def build_fast_chain(self):
+        """Build single-call NER chain: validation, extraction and self-check in one JSON-mode request"""
+        single_pass_chain = (
+            NER_SINGLE_PASS_PROMPT
+            | self.json_llm("ner.single_pass")
+            | StrOutputParser()
+        )
+
+        def split_single_pass(output):
+            """Map the single JSON response onto the three-stage result shape"""
+            try:
+                parsed = extract_json(output)
+            except JSONExtractionError:
+                parsed = None
+            if not isinstance(parsed, dict):
+                # Leave it to parse_json (and its repair call) in _parse_output
+                return {
+                    "validation_result": "MEDICAL",
+                    "extracted_entities": output,
+                    "final_entities": output
+                }
+
+            if str(parsed.pop("is_medical", True)).lower() == "false":
+                return {
+                    "validation_result": "NON_MEDICAL",
+                    "extracted_entities": None,
+                    "final_entities": None
+                }
+
+            return {
+                "validation_result": "MEDICAL",
+                "extracted_entities": output,
+                "final_entities": json.dumps(parsed)
+            }
+
+        def single_pass(inputs):
+            # Skip the call entirely when the pre-filter is sure the input is not medical
+            if self._local_validation(inputs["conversation"]) == NON_MEDICAL:
+                return {
+                    "validation_result": NON_MEDICAL,
+                    "extracted_entities": None,
+                    "final_entities": None
+                }
+            return {**split_single_pass(single_pass_chain.invoke(inputs)), "conversation": inputs["conversation"]}
+
+        async def asingle_pass(inputs):
+            if self._local_validation(inputs["conversation"]) == NON_MEDICAL:
+                return {
+                    "validation_result": NON_MEDICAL,
+                    "extracted_entities": None,
+                    "final_entities": None
+                }
+            output = await single_pass_chain.ainvoke(inputs)
+            return {**split_single_pass(output), "conversation": inputs["conversation"]}
+
+        return RunnableLambda(single_pass, afunc=asingle_pass)
+
+    def build_thorough_chain(self):
         """Build sequential chain for NER extraction with validation using LCEL"""
 
         # Chain 1: Validate if conversation is medical
         validator_chain = (
             MEDICAL_VALIDATOR_PROMPT
-            | self.llm
+            | self.llm.with_config(run_name="ner.validate")
             | StrOutputParser()
         )
 
         # Chain 2: Extract NER entities
         extraction_chain = (
             NER_EXTRACTION_PROMPT
-            | self.llm
+            | self.json_llm("ner.extract")
             | StrOutputParser()
         )
 
@@ -46,7 +152,7 @@ class MedicalNERChain:
         correction_chain = (
             RunnableLambda(prepare_validator_input)
             | NER_VALIDATOR_PROMPT
-            | self.llm
+            | self.json_llm("ner.verify")
             | StrOutputParser()
         )
 
@@ -54,8 +160,10 @@ class MedicalNERChain:
         def complete_pipeline(inputs):
             conversation = inputs["conversation"]
 
-            # Step 1: Validate medical conversation
-            validation_result = validator_chain.invoke({"conversation": conversation})
+            # Step 1: Validate medical conversation, locally when the answer is obvious
+            validation_result = self._local_validation(conversation)
+            if validation_result is None:
+                validation_result = validator_chain.invoke({"conversation": conversation})
 
             # Step 2: Extract entities if medical
             if "NON_MEDICAL" in validation_result:
@@ -67,50 +175,110 @@ class MedicalNERChain:
 
             extracted_entities = extraction_chain.invoke({"conversation": conversation})
 
-            # Step 3: Validate and correct
-            final_entities = correction_chain.invoke({
+            # Step 3: Validate and correct, with the LLM only when the local check is not enough
+            final_entities = self._verify_locally(conversation, extracted_entities)
+            verified_by = "local"
+            if final_entities is None:
+                final_entities = correction_chain.invoke({
+                    "conversation": conversation,
+                    "extracted_entities": extracted_entities
+                })
+                verified_by = "llm"
+            record_ner_verification(verified_by)
+
+            return {
+                "validation_result": validation_result,
+                "extracted_entities": extracted_entities,
+                "final_entities": final_entities,
                 "conversation": conversation,
-                "extracted_entities": extracted_entities
-            })
+                "verified_by": verified_by
+            }
+
+        # Same pipeline for async callers, awaiting each LLM call
+        async def acomplete_pipeline(inputs):
+            conversation = inputs["conversation"]
+
+            validation_result = self._local_validation(conversation)
+            if validation_result is None:
+                validation_result = await validator_chain.ainvoke({"conversation": conversation})
+
+            if "NON_MEDICAL" in validation_result:
+                return {
+                    "validation_result": validation_result,
+                    "extracted_entities": None,
+                    "final_entities": None
+                }
+
+            extracted_entities = await extraction_chain.ainvoke({"conversation": conversation})
+            final_entities = self._verify_locally(conversation, extracted_entities)
+            verified_by = "local"
+            if final_entities is None:
+                final_entities = await correction_chain.ainvoke({
+                    "conversation": conversation,
+                    "extracted_entities": extracted_entities
+                })
+                verified_by = "llm"
+            record_ner_verification(verified_by)
 
             return {
                 "validation_result": validation_result,
                 "extracted_entities": extracted_entities,
-                "final_entities": final_entities
+                "final_entities": final_entities,
+                "conversation": conversation,
+                "verified_by": verified_by
             }
 
-        return RunnableLambda(complete_pipeline)
+        return RunnableLambda(complete_pipeline, afunc=acomplete_pipeline)
 
-    def process(self, conversation: str) -> dict:
-        """Process conversation through NER pipeline"""
-        chain = self.build_chain()
-        result = chain.invoke({"conversation": conversation})
+    @staticmethod
+    def entity_result(entities: dict, conversation: str, verified_by: str) -> dict:
+        """
+        Result for validated entities, shared with the combined chain. With
+        ENTITY_NORMALIZE on they are checked against the transcript and
+        de-duplicated; Entity_Details flags the ones that were not found.
+        """
+        if Config.ENTITY_NORMALIZE and conversation:
+            entities, _ = normalize_entities(entities, conversation)
+        return {
+            "error": False,
+            "data": entities,
+            "validation_status": "MEDICAL",
+            "verified_by": verified_by
+        }
 
+    def _parse_output(self, result) -> dict:
+        """Shape the NER pipeline output into the API result"""
         # Check if medical conversation
         if result["validation_result"] and "NON_MEDICAL" in result["validation_result"]:
             return {
                 "error": True,
-                "message": "Sorry, I can only process medical conversations. I'm designed to extract medical information like symptoms, treatments, diagnoses, and prognosis from healthcare-related discussions."
+                "message": NON_MEDICAL_MESSAGE
             }
 
-        # Parse final JSON output
-        try:
-            final_json = json.loads(result["final_entities"])
-            return {
-                "error": False,
-                "data": final_json,
-                "raw_extraction": result["extracted_entities"],
-                "validation_status": "MEDICAL"
-            }
-        except (json.JSONDecodeError, TypeError):
-            # Fallback parsing
+        # Parse final JSON output, then check, canonicalize and de-duplicate entities locally
+        final_json = self.parse_json(result["final_entities"])
+        if final_json is not None:
             return {
-                "error": False,
-                "data": self._parse_fallback(result["final_entities"]),
-                "raw_extraction": result["extracted_entities"],
-                "validation_status": "MEDICAL"
+                **self.entity_result(final_json, result.get("conversation"), result.get("verified_by", "single_pass")),
+                "raw_extraction": result["extracted_entities"]
             }
 
+        # Fallback parsing
+        return {
+            "error": False,
+            "parse_failed": True,
+            "data": self._parse_fallback(result["final_entities"]),
+            "raw_extraction": result["extracted_entities"],
+            "validation_status": "MEDICAL"
+        }
+
+    def merge_results(self, results) -> dict:
+        """Entities are the de-duplicated union over chunks; small-talk chunks judged non-medical are ignored"""
+        merged = super().merge_results(results)
+        if not merged.get("error"):
+            merged["validation_status"] = "MEDICAL"
+        return merged
+
     def _parse_fallback(self, text: str) -> dict:
         """Fallback parser if JSON parsing fails"""
         if text is None:
@@ -0,0 +1,49 @@
+import threading
+from importlib import import_module
+
+# Chain classes by name, as "module.Class". A chain's module, and LangChain and
+# the Groq client with it, is imported the first time the chain is used.
+CHAIN_CLASSES = {
+    "ner": "src.chains.ner_chain.MedicalNERChain",
+    "sentiment": "src.chains.sentiment_chain.SentimentAnalysisChain",
+    "soap": "src.chains.soap_chain.SOAPNoteChain",
+    "combined": "src.chains.combined_chain.CombinedAnalysisChain",
+}
+
+_instances = {}
+_registry_lock = threading.Lock()
+
+
+def chain_class(name: str):
+    """The class registered under `name`, importing its module"""
+    module_name, class_name = CHAIN_CLASSES[name].rsplit(".", 1)
+    return getattr(import_module(module_name), class_name)
+
+
+def get_chain(name: str):
+    """Return the process-wide instance of a chain, creating it on first use"""
+    chain = _instances.get(name)
+    if chain is None:
+        with _registry_lock:
+            chain = _instances.get(name)
+            if chain is None:
+                chain = chain_class(name)()
+                chain.get_runnable()
+                _instances[name] = chain
+    return chain
+
+
+def import_all():
+    """Import every chain module without creating chains or LLM clients"""
+    return {name: chain_class(name) for name in CHAIN_CLASSES}
+
+
+def build_all():
+    """Create every chain and compile its runnable up front"""
+    return {name: get_chain(name) for name in CHAIN_CLASSES}
+
+
+def reset():
+    """Forget all chain instances; the next get_chain() rebuilds them"""
+    with _registry_lock:
+        _instances.clear()
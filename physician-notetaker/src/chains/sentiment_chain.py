@@ -1,44 +1,77 @@
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
-import json
-from src.config import Config
+import re
+from collections import Counter
+from src.chains.base import BaseChain
 from src.prompts.sentiment_prompts import SENTIMENT_ANALYSIS_PROMPT
+from src.utils.transcript import OTHER, PATIENT
+from src.utils.validators import SentimentResult
 
-class SentimentAnalysisChain:
-    def __init__(self):
-        self.llm = ChatGroq(
-            groq_api_key=Config.GROQ_API_KEY,
-            model_name=Config.GROQ_MODEL,
-            temperature=Config.TEMPERATURE
-        )
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _words(text: str) -> str:
+    return " " + _NON_WORD_RE.sub(" ", text.lower()).strip() + " "
+
+
+class SentimentAnalysisChain(BaseChain):
+    name = "sentiment"
+    prompts = (SENTIMENT_ANALYSIS_PROMPT,)
+    schema = SentimentResult
+    speakers = (PATIENT, OTHER)  # The patient's turns only; OTHER keeps named speakers such as "Ms. Jones"
 
     def build_chain(self):
         """Build sentiment analysis chain using LCEL"""
         chain = (
             SENTIMENT_ANALYSIS_PROMPT
-            | self.llm
+            | self.json_llm("sentiment")
             | StrOutputParser()
         )
         return chain
 
-    def process(self, conversation: str) -> dict:
-        """Process conversation for sentiment analysis"""
-        chain = self.build_chain()
-        result = chain.invoke({"conversation": conversation})
-
-        try:
-            sentiment_json = json.loads(result)
+    def _parse_output(self, result) -> dict:
+        """Parse and validate the sentiment analysis JSON"""
+        sentiment_json = self.parse_json(result)
+        if sentiment_json is not None:
             return {
                 "error": False,
                 "data": sentiment_json
             }
-        except json.JSONDecodeError:
-            return {
-                "error": False,
-                "data": {
-                    "Sentiment": "Neutral",
-                    "Intent": ["Unable to parse"],
-                    "raw_output": result
-                }
+        return {
+            "error": False,
+            "parse_failed": True,
+            "data": {
+                "Sentiment": "Neutral",
+                "Intent": ["Unable to parse"],
+                "raw_output": result
             }
+        }
+
+    @classmethod
+    def patient_quotes_only(cls, data: dict, conversation: str) -> dict:
+        """
+        Keep only the quotes found in the turns this chain would have been
+        sent; for output from a call that saw the whole dialogue (the
+        combined chain), so its quotes match the dedicated chain's.
+        """
+        quotes = data.get("Patient_Quotes")
+        if not quotes or not conversation:
+            return data
+        patient_text = _words(cls.prepare(conversation))
+        return {**data, "Patient_Quotes": [quote for quote in quotes if _words(quote) in patient_text]}
+
+    def merge_results(self, results) -> dict:
+        """Merge intents and quotes; the overall sentiment is the one most chunks report, latest wins a tie"""
+        merged = super().merge_results(results)
+        if merged.get("error"):
+            return merged
+
+        chunk_data = [
+            result["data"] for result in results if not result.get("error") and not result.get("parse_failed")
+        ]
+        for field in ("Sentiment", "Confidence"):
+            labels = [data[field] for data in chunk_data if isinstance(data.get(field), str)]
+            if labels:
+                counts = Counter(labels)
+                merged["data"][field] = max(reversed(labels), key=counts.__getitem__)
+        return merged
@@ -1,43 +1,61 @@
-from langchain_groq import ChatGroq
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables import RunnableLambda
-import json
-from src.config import Config
+from src.chains.base import BaseChain
 from src.prompts.soap_prompts import SOAP_NOTE_PROMPT
+from src.utils.validators import SOAPNote
 
-class SOAPNoteChain:
-    def __init__(self):
-        self.llm = ChatGroq(
-            groq_api_key=Config.GROQ_API_KEY,
-            model_name=Config.GROQ_MODEL,
-            temperature=Config.TEMPERATURE
-        )
+class SOAPNoteChain(BaseChain):
+    name = "soap"
+    prompts = (SOAP_NOTE_PROMPT,)
+    schema = SOAPNote
+    _stream_chain = None
 
     def build_chain(self):
         """Build SOAP note generation chain using LCEL"""
         chain = (
             SOAP_NOTE_PROMPT
-            | self.llm
+            | self.json_llm("soap")
             | StrOutputParser()
         )
         return chain
 
-    def process(self, conversation: str) -> dict:
-        """Generate SOAP note from conversation"""
-        chain = self.build_chain()
-        result = chain.invoke({"conversation": conversation})
+    def get_stream_runnable(self):
+        """
+        Token-streaming variant of the chain. Groq does not stream in JSON
+        mode, so this one relies on the prompt alone for the JSON shape.
+        """
+        if self._stream_chain is None:
+            with self._chain_lock:
+                if self._stream_chain is None:
+                    self._stream_chain = (
+                        SOAP_NOTE_PROMPT
+                        | self.llm.with_config(run_name="soap")
+                        | StrOutputParser()
+                    )
+        return self._stream_chain
+
+    def _stream_process(self, conversation: str):
+        """Stream SOAP note tokens as the LLM produces them, then the parsed note"""
+        chain = self.get_stream_runnable()
+        pieces = []
+        for token in chain.stream({"conversation": conversation}):
+            pieces.append(token)
+            yield "token", token
+        yield "result", self._parse_output("".join(pieces))
 
-        try:
-            soap_json = json.loads(result)
+    def _parse_output(self, result: str) -> dict:
+        """Parse and validate the SOAP note JSON, keeping the raw text if it cannot be recovered"""
+        soap_json = self.parse_json(result)
+        if soap_json is not None:
             return {
                 "error": False,
                 "data": soap_json
             }
-        except json.JSONDecodeError:
-            return {
-                "error": False,
-                "data": {
-                    "raw_output": result,
-                    "note": "Please review raw output"
-                }
+        return {
+            "error": False,
+            "parse_failed": True,
+            "data": {
+                "raw_output": result,
+                "note": "Please review raw output"
             }
+        }
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,3 +12,110 @@ class Config:
 
     # JSON mode configuration
     RESPONSE_FORMAT = {"type": "json_object"}  # Forces JSON output
+    JSON_MODE = os.getenv("JSON_MODE", "true").lower() == "true"  # Send RESPONSE_FORMAT with every JSON-producing call
+
+    # Concurrent pipeline configuration
+    PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "12"))  # Shared pool for all chain runs
+    CHAIN_TIMEOUT = float(os.getenv("CHAIN_TIMEOUT", "90"))  # Seconds; keep below gunicorn --timeout
+
+    # Shared LLM HTTP client (one pool per worker process)
+    HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # Seconds an idle connection is kept
+    LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))  # Seconds per LLM HTTP call
+
+    # Result cache (keyed on conversation, chain, prompt version and model)
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "512"))  # In-memory LRU size per worker
+    CACHE_TTL = float(os.getenv("CACHE_TTL", "3600"))  # Seconds
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "")  # Optional persistent tier shared by workers
+    CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("CACHE_SQLITE_MAX_ENTRIES", "20000"))  # Rows kept in the persistent tier
+    CACHE_SQLITE_PRUNE_EVERY = int(os.getenv("CACHE_SQLITE_PRUNE_EVERY", "200"))  # Writes per worker between prunes of expired and excess rows
+
+    # Transcript clean-up before prompting (src/utils/transcript.py)
+    TRANSCRIPT_NORMALIZE = os.getenv("TRANSCRIPT_NORMALIZE", "true").lower() == "true"  # Drop markers and pleasantries, one turn per line
+    TRANSCRIPT_SPEAKER_FILTER = os.getenv("TRANSCRIPT_SPEAKER_FILTER", "true").lower() == "true"  # Send chains only the speakers they need (patient turns for sentiment)
+
+    # NER pipeline mode: "fast" = one JSON-mode call, "thorough" = validate, extract, re-check
+    NER_MODE = os.getenv("NER_MODE", "thorough")
+
+    # Combined mode: NER, sentiment and SOAP from one LLM call for /api/quick/ with type "all"
+    COMBINED_ANALYSIS = os.getenv("COMBINED_ANALYSIS", "false").lower() == "true"  # Default when the request does not set "combined"
+
+    # Local entity checks (src/utils/entity_normalizer.py)
+    ENTITY_NORMALIZE = os.getenv("ENTITY_NORMALIZE", "true").lower() == "true"  # Check entities against the transcript, map synonyms, dedupe
+    NER_LOCAL_VERIFY = os.getenv("NER_LOCAL_VERIFY", "true").lower() == "true"  # Thorough mode skips the LLM verify call when all entities check out
+
+    # Local medical/non-medical pre-filter; only unsure inputs reach the LLM validator
+    PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "true").lower() == "true"
+
+    # Batch analysis
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))  # Conversations in flight per chain
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))  # Per /api/batch/ request
+
+    # Identical concurrent analyses share one run (src/singleflight.py)
+    SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+    SINGLEFLIGHT_LOCK_DIR = os.getenv(
+        "SINGLEFLIGHT_LOCK_DIR",
+        os.path.join(tempfile.gettempdir(), "physician-notetaker-locks")
+    )  # Cross-worker lock files; used only with CACHE_SQLITE_PATH
+
+    # Stored analyses (chat/store.py)
+    ANALYSIS_STORE_ENABLED = os.getenv("ANALYSIS_STORE_ENABLED", "true").lower() == "true"  # Save every API/job analysis
+    ANALYSIS_PAGE_SIZE = int(os.getenv("ANALYSIS_PAGE_SIZE", "20"))  # Default records per list page
+    ANALYSIS_PAGE_MAX = int(os.getenv("ANALYSIS_PAGE_MAX", "100"))  # Largest page a client may ask for
+
+    # Long transcripts are split on speaker turns and analysed chunk by chunk
+    LONG_TRANSCRIPT_TOKENS = int(os.getenv("LONG_TRANSCRIPT_TOKENS", "6000"))  # Chunk above this; 0 disables
+    CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "3000"))  # Target size per chunk
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "150"))  # Context repeated between chunks
+    CHUNK_MAX_CONCURRENCY = int(os.getenv("CHUNK_MAX_CONCURRENCY", "4"))  # Chunks in flight per chain
+
+    # Live consultation sessions
+    SESSION_CONTEXT_TURNS = int(os.getenv("SESSION_CONTEXT_TURNS", "4"))  # Earlier turns sent along with new ones
+    SESSION_SOAP_REGEN_UPDATES = int(os.getenv("SESSION_SOAP_REGEN_UPDATES", "5"))  # Full SOAP rebuild at least every N updates; 0 = only on request or new findings
+
+    # Instrumentation
+    LLM_PROMPT_PRICE_PER_MTOK = float(os.getenv("LLM_PROMPT_PRICE_PER_MTOK", "0"))  # USD per million prompt tokens
+    LLM_COMPLETION_PRICE_PER_MTOK = float(os.getenv("LLM_COMPLETION_PRICE_PER_MTOK", "0"))  # USD per million completion tokens
+
+    # LLM backend: "groq", or "fake" for the offline stand-in in src/fake_llm.py
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+    FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0.2"))  # Seconds before the first token
+    FAKE_LLM_TOKENS_PER_SECOND = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0"))  # 0 = instant completion
+    FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))  # Fraction of calls that fail
+    FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+    # Output parsing
+    JSON_REPAIR_ENABLED = os.getenv("JSON_REPAIR_ENABLED", "true").lower() == "true"  # One repair call on invalid output
+
+    # Background job queue (manage.py run_job_worker)
+    JOB_WORKER_THREADS = int(os.getenv("JOB_WORKER_THREADS", "4"))  # Jobs run concurrently per worker process
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))  # Seconds between polls when the queue is empty
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "600"))  # Running longer than this means the worker died
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_WEBHOOK_TIMEOUT = float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))  # Seconds
+    JOB_WEBHOOK_RETRIES = int(os.getenv("JOB_WEBHOOK_RETRIES", "3"))  # Rescheduled through the queue with backoff
+    JOB_WEBHOOK_ALLOWED_HOSTS = [
+        host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+    ]  # Webhook hosts allowed ("example.com" or ".example.com" for subdomains); empty allows any public host
+    JOB_WEBHOOK_ALLOW_PRIVATE = os.getenv("JOB_WEBHOOK_ALLOW_PRIVATE", "false").lower() == "true"  # Allow loopback/private/link-local targets
+
+    # Client-side rate limiting for the LLM provider (0 = no limit)
+    LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "0"))  # Requests per minute, shared by all workers
+    LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "0"))  # Tokens per minute, shared by all workers
+    RATE_LIMIT_STORE = os.getenv(
+        "RATE_LIMIT_STORE",
+        os.path.join(tempfile.gettempdir(), "physician-notetaker-ratelimit.sqlite3")
+    )  # SQLite file the gunicorn workers coordinate through; "" keeps limits per process. Unused without an RPM/TPM limit
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # Adaptive limit ceiling per process
+    LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))  # Retries on 429/5xx/connection errors
+    LLM_RETRY_MAX_WAIT = float(os.getenv("LLM_RETRY_MAX_WAIT", "30"))  # Seconds
+
+    # Worker warm-up and readiness (src/startup.py, /healthz and /readyz)
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"  # Build chains and open provider connections before reporting ready
+    WARMUP_ANALYSIS = os.getenv("WARMUP_ANALYSIS", "off").lower()  # "off", "local" (offline stand-in) or "llm" (one tiny real analysis)
+    WARMUP_RETRY_SECONDS = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))  # Before /readyz retries a failed warm-up
+    READY_SHED_LOAD = os.getenv("READY_SHED_LOAD", "true").lower() == "true"  # /readyz answers 503 while the LLM budget is saturated
+    READY_MIN_TOKENS = int(os.getenv("READY_MIN_TOKENS", "2000"))  # Less left in the TPM budget counts as saturated
@@ -0,0 +1,189 @@
+"""
+Deterministic local stand-in for ChatGroq, for benchmarks and offline work.
+
+Selected with LLM_PROVIDER=fake. Answers every prompt with canned JSON for
+the chain that sent it, after a configurable latency plus completion time at
+a configurable token rate, and fails a configurable fraction of calls.
+Like a provider with prompt caching, it reports the part of each prompt that
+repeats the start of a recent prompt as cached tokens.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+CANNED_NER = {
+    "Symptoms": ["neck pain", "back pain", "head impact"],
+    "Treatment": ["10 physiotherapy sessions", "painkillers"],
+    "Diagnosis": ["whiplash injury"],
+    "Prognosis": ["full recovery expected within six months"],
+}
+CANNED_SENTIMENT = {
+    "Sentiment": "Reassured",
+    "Intent": ["Seeking reassurance", "Reporting symptoms"],
+    "Confidence": "High",
+    "Patient_Quotes": ["That's a relief!"],
+}
+CANNED_SOAP = {
+    "Subjective": {
+        "Chief_Complaint": "Neck and back pain",
+        "History_of_Present_Illness": "Rear-end car accident with whiplash, improving after physiotherapy",
+        "Review_of_Systems": "Occasional back ache, no anxiety or sleep disturbance",
+    },
+    "Objective": {
+        "Physical_Exam": "Full range of motion in cervical and lumbar spine",
+        "Observations": "No tenderness, no signs of lasting damage",
+        "Vitals": "",
+    },
+    "Assessment": {
+        "Diagnosis": "Whiplash injury, resolving",
+        "Severity": "Mild",
+        "Clinical_Impression": "Improving steadily",
+    },
+    "Plan": {
+        "Treatment": "Continue physiotherapy as needed",
+        "Medications": "Analgesics as needed",
+        "Follow_Up": "Return if pain worsens",
+        "Prognosis": "Full recovery expected within six months",
+    },
+}
+
+
+def canned_response(prompt: str) -> str:
+    """Pick a plausible answer for whichever chain sent the prompt"""
+    if '"soap_note"' in prompt:
+        return json.dumps({"is_medical": True, "entities": CANNED_NER, "sentiment": CANNED_SENTIMENT, "soap_note": CANNED_SOAP})
+    if "ONLY one word" in prompt:
+        return "MEDICAL"
+    if "is_medical" in prompt:
+        return json.dumps({"is_medical": True, **CANNED_NER})
+    if "Subjective" in prompt:
+        return json.dumps(CANNED_SOAP)
+    if "Sentiment" in prompt:
+        return json.dumps(CANNED_SENTIMENT)
+    return json.dumps(CANNED_NER)
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    """Binary search on slice equality; far faster than comparing character by character"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class FakeLLMError(RuntimeError):
+    """Injected failure, standing in for a provider error"""
+
+
+class FakeChatModel(BaseChatModel):
+    latency: float = 0.2  # Seconds before the first token
+    tokens_per_second: float = 0.0  # Completion speed; 0 returns the whole answer at once
+    error_rate: float = 0.0  # Fraction of calls that raise FakeLLMError
+    seed: int = 0
+    model_name: str = "fake"
+    responses: Optional[Callable[[str], str]] = None  # prompt -> answer; defaults to canned_response
+    prefix_cache_size: int = 32  # Recent prompts whose prefixes count as cached; 0 disables
+
+    _rng: Any = PrivateAttr()
+    _rng_lock: Any = PrivateAttr()
+    _recent_prompts: Any = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+        self._recent_prompts = deque(maxlen=self.prefix_cache_size or None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _cached_tokens(self, prompt: str) -> int:
+        """Tokens at the start of prompt shared with a recent prompt"""
+        if not self.prefix_cache_size:
+            return 0
+        with self._rng_lock:
+            recent = list(self._recent_prompts)
+            self._recent_prompts.append(prompt)
+        return max((_common_prefix_length(prompt, other) for other in recent), default=0) // 4
+
+    def _answer(self, messages):
+        """(answer, usage, completion seconds) for a call, or raise an injected error"""
+        with self._rng_lock:
+            failed = self._rng.random() < self.error_rate
+        if failed:
+            raise FakeLLMError("Injected fake LLM failure")
+
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = (self.responses or canned_response)(prompt)
+        usage = {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(content) // 4 + 1}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        usage["prompt_tokens_details"] = {"cached_tokens": self._cached_tokens(prompt)}
+        completion_seconds = usage["completion_tokens"] / self.tokens_per_second if self.tokens_per_second else 0.0
+        return content, usage, completion_seconds
+
+    def _result(self, content, usage) -> ChatResult:
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": usage["prompt_tokens"],
+            "output_tokens": usage["completion_tokens"],
+            "total_tokens": usage["total_tokens"],
+            "input_token_details": {"cache_read": usage["prompt_tokens_details"]["cached_tokens"]},
+        })
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": usage, "model_name": self.model_name}
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage, completion_seconds = self._answer(messages)
+        time.sleep(self.latency + completion_seconds)
+        return self._result(content, usage)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage, completion_seconds = self._answer(messages)
+        await asyncio.sleep(self.latency + completion_seconds)
+        return self._result(content, usage)
+
+    def _pieces(self, content, usage, completion_seconds):
+        pieces = [content[i:i + 16] for i in range(0, len(content), 16)] or [""]
+        delay = completion_seconds / len(pieces)
+        for i, piece in enumerate(pieces):
+            chunk = AIMessageChunk(content=piece)
+            if i == len(pieces) - 1:
+                chunk = AIMessageChunk(content=piece, usage_metadata={
+                    "input_tokens": usage["prompt_tokens"],
+                    "output_tokens": usage["completion_tokens"],
+                    "total_tokens": usage["total_tokens"],
+                    "input_token_details": {"cache_read": usage["prompt_tokens_details"]["cached_tokens"]},
+                })
+            yield delay, ChatGenerationChunk(message=chunk)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage, completion_seconds = self._answer(messages)
+        time.sleep(self.latency)
+        for delay, chunk in self._pieces(content, usage, completion_seconds):
+            time.sleep(delay)
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        content, usage, completion_seconds = self._answer(messages)
+        await asyncio.sleep(self.latency)
+        for delay, chunk in self._pieces(content, usage, completion_seconds):
+            await asyncio.sleep(delay)
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
@@ -0,0 +1,257 @@
+import random
+import threading
+import groq
+import httpx
+from langchain_groq import ChatGroq
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
+from src.config import Config
+from src.tracing import tracer
+from src.utils.rate_limiter import estimate_tokens, get_rate_limiter
+
+_llm = None
+_llm_lock = threading.Lock()
+
+# Budgeted completion size per call until the provider reports real usage
+_COMPLETION_TOKEN_ESTIMATE = 500
+# Used when a 429 arrives without a Retry-After header
+_DEFAULT_RETRY_AFTER = 2.0
+
+
+def _retry_after(error) -> float:
+    """Seconds from the provider's Retry-After header, if it sent one"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error) -> bool:
+    return isinstance(error, (groq.RateLimitError, groq.InternalServerError, groq.APIConnectionError))
+
+
+_backoff = wait_exponential_jitter(initial=1, max=Config.LLM_RETRY_MAX_WAIT, jitter=1)
+
+
+def _wait(retry_state) -> float:
+    """Honour Retry-After when present, else jittered exponential backoff"""
+    retry_after = _retry_after(retry_state.outcome.exception())
+    if retry_after is not None:
+        return min(retry_after, Config.LLM_RETRY_MAX_WAIT) + random.uniform(0, 0.5)
+    return _backoff(retry_state)
+
+
+def _log_retry(retry_state):
+    error = retry_state.outcome.exception()
+    print(f"⚠ LLM call failed ({type(error).__name__}), retry {retry_state.attempt_number}/{Config.LLM_MAX_RETRIES}")
+
+
+def _retry_policy(retrying_class, run_manager=None):
+    def before_sleep(retry_state):
+        _log_retry(retry_state)
+        if run_manager is not None:
+            # Lets callbacks (tracing) count retries against the run
+            sync_manager = run_manager.get_sync() if hasattr(run_manager, "get_sync") else run_manager
+            sync_manager.on_retry(retry_state)
+
+    return retrying_class(
+        stop=stop_after_attempt(Config.LLM_MAX_RETRIES + 1),
+        wait=_wait,
+        retry=retry_if_exception(_is_retryable),
+        before_sleep=before_sleep,
+        reraise=True
+    )
+
+
+def _estimate(messages) -> int:
+    return sum(estimate_tokens(str(message.content)) for message in messages) + _COMPLETION_TOKEN_ESTIMATE
+
+
+def _total_tokens(result):
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+class GuardedChatGroq(ChatGroq):
+    """
+    ChatGroq whose calls all pass through the shared rate limiter and retry
+    policy: requests/min and tokens/min budgets, adaptive concurrency, and
+    jittered exponential backoff that honours Retry-After.
+    """
+
+    def _on_error(self, error, estimate):
+        """Release the call slot after a failed attempt, telling the limiter about 429s"""
+        limiter = get_rate_limiter()
+        throttled = isinstance(error, groq.RateLimitError)
+        if throttled:
+            retry_after = _retry_after(error)
+            limiter.throttled(_DEFAULT_RETRY_AFTER if retry_after is None else retry_after)
+        limiter.release(estimate, throttled=throttled)
+
+    async def _aon_error(self, error, estimate):
+        limiter = get_rate_limiter()
+        throttled = isinstance(error, groq.RateLimitError)
+        if throttled:
+            retry_after = _retry_after(error)
+            await limiter.athrottled(_DEFAULT_RETRY_AFTER if retry_after is None else retry_after)
+        await limiter.arelease(estimate, throttled=throttled)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = get_rate_limiter()
+        estimate = _estimate(messages)
+        for attempt in _retry_policy(Retrying, run_manager):
+            with attempt:
+                limiter.acquire(estimate)
+                try:
+                    result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                except Exception as e:
+                    self._on_error(e, estimate)
+                    raise
+                limiter.release(estimate, _total_tokens(result))
+                return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = get_rate_limiter()
+        estimate = _estimate(messages)
+        async for attempt in _retry_policy(AsyncRetrying, run_manager):
+            with attempt:
+                await limiter.aacquire(estimate)
+                try:
+                    result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                except Exception as e:
+                    await self._aon_error(e, estimate)
+                    raise
+                await limiter.arelease(estimate, _total_tokens(result))
+                return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Retries only cover opening the stream; once tokens flow they are passed straight on
+        limiter = get_rate_limiter()
+        estimate = _estimate(messages)
+        for attempt in _retry_policy(Retrying, run_manager):
+            with attempt:
+                limiter.acquire(estimate)
+                try:
+                    stream = super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                    first = next(stream, None)
+                except Exception as e:
+                    self._on_error(e, estimate)
+                    raise
+
+        try:
+            if first is not None:
+                yield first
+                yield from stream
+        finally:
+            limiter.release(estimate)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        limiter = get_rate_limiter()
+        estimate = _estimate(messages)
+        async for attempt in _retry_policy(AsyncRetrying, run_manager):
+            with attempt:
+                await limiter.aacquire(estimate)
+                try:
+                    stream = super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                    first = await anext(stream, None)
+                except Exception as e:
+                    await self._aon_error(e, estimate)
+                    raise
+
+        try:
+            if first is not None:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+        finally:
+            limiter.release(estimate)
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=Config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def _build_http_client() -> httpx.Client:
+    """Pooled keep-alive HTTP client shared by every LLM call in this process"""
+    return httpx.Client(limits=_pool_limits(), timeout=Config.LLM_REQUEST_TIMEOUT)
+
+
+def _build_async_http_client() -> httpx.AsyncClient:
+    """
+    Pooled client for ainvoke calls. Its connections belong to the event loop
+    that opened them, so async calls should come from one long-lived loop
+    (the ASGI server's), not from a fresh loop per request.
+    """
+    return httpx.AsyncClient(limits=_pool_limits(), timeout=Config.LLM_REQUEST_TIMEOUT)
+
+
+def create_llm() -> ChatGroq:
+    """Create a new rate-limited ChatGroq client on its own connection pool"""
+    if Config.LLM_PROVIDER == "fake":
+        return create_fake_llm()
+    return GuardedChatGroq(
+        groq_api_key=Config.GROQ_API_KEY,
+        model_name=Config.GROQ_MODEL,
+        temperature=Config.TEMPERATURE,
+        max_retries=0,  # Retries are handled by GuardedChatGroq so they respect the rate limiter
+        callbacks=[tracer],
+        http_client=_build_http_client(),
+        http_async_client=_build_async_http_client()
+    )
+
+
+def create_fake_llm():
+    """Offline stand-in configured from the FAKE_LLM_* settings"""
+    from src.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        latency=Config.FAKE_LLM_LATENCY,
+        tokens_per_second=Config.FAKE_LLM_TOKENS_PER_SECOND,
+        error_rate=Config.FAKE_LLM_ERROR_RATE,
+        seed=Config.FAKE_LLM_SEED,
+        callbacks=[tracer]
+    )
+
+
+def warm_connections(llm=None) -> bool:
+    """
+    Open a pooled connection to the provider (DNS, TCP and TLS) before the
+    first analysis needs one, by listing the models through the client's own
+    pool; that also checks the API key. False when there is nothing to open,
+    as with the offline stand-in.
+    """
+    llm = llm if llm is not None else get_llm()
+    http_client = getattr(llm, "http_client", None)
+    if http_client is None:
+        return False
+    client = groq.Groq(
+        api_key=Config.GROQ_API_KEY,
+        base_url=getattr(llm, "groq_api_base", None),
+        http_client=http_client,
+        max_retries=0
+    )
+    client.models.list()
+    return True
+
+
+def get_llm() -> ChatGroq:
+    """Return the process-wide ChatGroq client, creating it on first use"""
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = create_llm()
+    return _llm
+
+
+def reset_llm():
+    """Drop the shared client, e.g. in a freshly forked worker"""
+    global _llm
+    with _llm_lock:
+        _llm = None
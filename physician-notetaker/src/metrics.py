@@ -0,0 +1,101 @@
+"""
+In-process counters and histograms rendered in the Prometheus text format.
+
+Values are per worker process, like the result cache stats; scrape each
+worker (or run a single worker) to see them all.
+"""
+import threading
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+_registry = []
+
+
+def _label_text(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels[name] for name in self.labels), 0)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_text(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labels + ("le",)
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state):
+                    lines.append(f"{self.name}_bucket{_label_text(bucket_labels, key + (f'{bound:g}',))} {count}")
+                lines.append(f"{self.name}_bucket{_label_text(bucket_labels, key + ('+Inf',))} {state[-1]}")
+                lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {state[-2]:.6f}")
+                lines.append(f"{self.name}_count{_label_text(self.labels, key)} {state[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format"""
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# LLM calls, one stage per prompt (ner.validate, ner.extract, ner.verify, sentiment, soap ...)
+LLM_STAGE_SECONDS = Histogram("notetaker_llm_stage_seconds", "Wall time of one LLM call", ("stage",))
+LLM_CALLS = Counter("notetaker_llm_calls_total", "LLM calls by outcome", ("stage", "status"))
+LLM_TOKENS = Counter("notetaker_llm_tokens_total", "Provider-reported tokens; kind is prompt, completion or cached", ("stage", "kind"))
+LLM_RETRIES = Counter("notetaker_llm_retries_total", "LLM call retries after 429/5xx/connection errors", ("stage",))
+LLM_COST = Counter("notetaker_llm_cost_usd_total", "Estimated LLM spend from the configured token prices", ("stage",))
+
+# Transcripts as received and as sent after normalization, once per analysed conversation
+TRANSCRIPT_TOKENS = Counter("notetaker_transcript_tokens_total", "Estimated transcript tokens", ("kind",))
+
+# Analysis chains as a whole
+CHAIN_SECONDS = Histogram("notetaker_chain_seconds", "Wall time of one chain run", ("chain",))
+CHAIN_QUEUE_SECONDS = Histogram("notetaker_chain_queue_seconds", "Time a chain waited for a pipeline worker", ("chain",))
+CACHE_LOOKUPS = Counter("notetaker_cache_lookups_total", "Result cache lookups", ("chain", "result"))
+NER_VERIFICATIONS = Counter("notetaker_ner_verifications_total", "Thorough-mode NER verifications, local or by LLM call", ("method",))
+PARSE_FAILURES = Counter("notetaker_parse_failures_total", "LLM outputs that were not valid JSON", ("chain",))
+JSON_REPAIRS = Counter("notetaker_json_repairs_total", "Repair calls for unparseable output, by outcome", ("chain", "result"))
+COMBINED_FALLBACKS = Counter("notetaker_combined_fallbacks_total", "Combined-analysis sections re-requested through their own chain", ("section",))
@@ -0,0 +1,326 @@
+import asyncio
+import contextvars
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from src.config import Config
+from src.chains.registry import get_chain
+from src.tracing import record_chain, record_combined_fallback, record_transcript
+from src.utils.chunking import is_long_transcript
+from src.utils.medical_filter import classify_conversation, NON_MEDICAL
+from src.utils.rate_limiter import estimate_tokens
+from src.utils.transcript import prepare_transcript
+
+# Sections of a full analysis; the chain modules themselves are imported on first use
+SECTIONS = ("ner", "sentiment", "soap")
+
+
+def _new_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=Config.PIPELINE_MAX_WORKERS, thread_name_prefix="analysis-chain")
+
+
+# One bounded pool per worker process; the chains are I/O bound so threads are enough
+_executor = _new_executor()
+
+
+def reset_executor():
+    """Replace the chain pool, e.g. in a forked worker, which inherits the pool but not its threads"""
+    global _executor
+    _executor = _new_executor()
+
+
+def _run_chain(name: str, conversation: str, submitted_at: float) -> dict:
+    """Run a single chain from the process-wide registry, recording queue and wall time"""
+    started_at = time.monotonic()
+    try:
+        return get_chain(name).process(conversation)
+    finally:
+        record_chain(name, time.monotonic() - started_at, queued=started_at - submitted_at)
+
+
+def _record_transcript(conversation: str):
+    """Record the tokens normalization saves; the chains reuse the memoized result"""
+    record_transcript(estimate_tokens(conversation), estimate_tokens(prepare_transcript(conversation)))
+
+
+def _submit(fn, *args):
+    """Submit to the shared pool, carrying over the caller's context (request trace)"""
+    return _executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _rejected_results(chains) -> dict:
+    """Results for input the local pre-filter identified as non-medical"""
+    from src.chains.ner_chain import NON_MEDICAL_MESSAGE
+
+    return {
+        name: {
+            "error": True,
+            "message": NON_MEDICAL_MESSAGE if name == "ner" else "Skipped: not a medical conversation"
+        }
+        for name in chains
+    }
+
+
+def _timeout_result(name: str, timeout: float) -> dict:
+    return {
+        "error": True,
+        "timeout": True,
+        "message": f"{name} analysis timed out after {timeout:g} seconds"
+    }
+
+
+def _failure_result(name: str, error: Exception) -> dict:
+    print(f"❌ Error in {name} chain: {str(error)}")
+    return {
+        "error": True,
+        "message": f"{name} analysis failed: {str(error)}"
+    }
+
+
+def run_chains(conversation: str, chains=SECTIONS, timeout: float = None) -> dict:
+    """
+    Fan the selected chains out on the shared pool and collect their results.
+
+    Every chain gets the same deadline, measured from submission. A chain that
+    times out or raises is reported as an error result so the other chains'
+    results are still returned. Input the local pre-filter is sure is not
+    medical is rejected without starting any chain.
+    """
+    # Obvious non-medical input never reaches the LLM
+    if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+        return _rejected_results(chains)
+
+    _record_transcript(conversation)
+    timeout = Config.CHAIN_TIMEOUT if timeout is None else timeout
+    return _fan_out(conversation, chains, timeout)
+
+
+def _fan_out(conversation: str, chains, timeout: float) -> dict:
+    futures = {name: _submit(_run_chain, name, conversation, time.monotonic()) for name in chains}
+    deadline = time.monotonic() + timeout
+
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            future.cancel()
+            results[name] = _timeout_result(name, timeout)
+        except Exception as e:
+            results[name] = _failure_result(name, e)
+
+    return results
+
+
+async def arun_chains(conversation: str, chains=SECTIONS, timeout: float = None) -> dict:
+    """
+    Async run_chains(): awaits every chain's ainvoke on the running event loop,
+    so waiting on the LLM does not hold a thread. Same deadline and partial
+    result behaviour as run_chains().
+    """
+    if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+        return _rejected_results(chains)
+
+    _record_transcript(conversation)
+    timeout = Config.CHAIN_TIMEOUT if timeout is None else timeout
+    return await _afan_out(conversation, chains, timeout)
+
+
+async def _afan_out(conversation: str, chains, timeout: float) -> dict:
+    async def run(name):
+        started_at = time.monotonic()
+        try:
+            return await asyncio.wait_for(get_chain(name).aprocess(conversation), timeout)
+        except asyncio.TimeoutError:
+            return _timeout_result(name, timeout)
+        except Exception as e:
+            return _failure_result(name, e)
+        finally:
+            record_chain(name, time.monotonic() - started_at)
+
+    results = await asyncio.gather(*(run(name) for name in chains))
+    return dict(zip(chains, results))
+
+
+def _combined_sections(combined: dict) -> tuple:
+    """Per-chain results from a combined result, and the chains to re-request"""
+    if not combined.get("error") and combined.get("is_medical") is False:
+        return _rejected_results(SECTIONS), []
+    sections = {} if combined.get("error") else dict(combined.get("sections", {}))
+    missing = [name for name in SECTIONS if name not in sections]
+    if missing:
+        record_combined_fallback(missing)
+    return sections, missing
+
+
+def run_combined(conversation: str, timeout: float = None) -> dict:
+    """
+    Every analysis from one combined JSON-mode call, same result shape as
+    run_chains(). A section that fails validation, or all of them if the
+    combined call fails, is re-requested through its dedicated chain within
+    the same deadline. Long transcripts take the per-chain path, which
+    analyses them chunk by chunk.
+    """
+    if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+        return _rejected_results(SECTIONS)
+    if is_long_transcript(prepare_transcript(conversation)):
+        return run_chains(conversation, timeout=timeout)
+
+    _record_transcript(conversation)
+    timeout = Config.CHAIN_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    future = _submit(_run_chain, "combined", conversation, time.monotonic())
+    try:
+        combined = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        return {name: _timeout_result(name, timeout) for name in SECTIONS}
+    except Exception as e:
+        combined = _failure_result("combined", e)
+
+    results, missing = _combined_sections(combined)
+    if missing:
+        results.update(_fan_out(conversation, missing, max(0.0, deadline - time.monotonic())))
+    return {name: results[name] for name in SECTIONS}
+
+
+async def arun_combined(conversation: str, timeout: float = None) -> dict:
+    """Async run_combined()"""
+    if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+        return _rejected_results(SECTIONS)
+    if is_long_transcript(prepare_transcript(conversation)):
+        return await arun_chains(conversation, timeout=timeout)
+
+    _record_transcript(conversation)
+    timeout = Config.CHAIN_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    started_at = time.monotonic()
+    try:
+        combined = await asyncio.wait_for(get_chain("combined").aprocess(conversation), timeout)
+    except asyncio.TimeoutError:
+        return {name: _timeout_result(name, timeout) for name in SECTIONS}
+    except Exception as e:
+        combined = _failure_result("combined", e)
+    finally:
+        record_chain("combined", time.monotonic() - started_at)
+
+    results, missing = _combined_sections(combined)
+    if missing:
+        results.update(await _afan_out(conversation, missing, max(0.0, deadline - time.monotonic())))
+    return {name: results[name] for name in SECTIONS}
+
+
+def _split_batch(conversations, chains):
+    """Pre-filter a batch: results for rejected items and indexes of the rest"""
+    results = [{} for _ in conversations]
+    accepted = []
+    for i, conversation in enumerate(conversations):
+        if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+            results[i] = _rejected_results(chains)
+        else:
+            accepted.append(i)
+    return results, accepted
+
+
+def _merge_batch(results, accepted, name, outputs):
+    """Place one chain's batch outputs into the per-conversation results"""
+    for i, output in zip(accepted, outputs):
+        results[i][name] = _failure_result(name, output) if isinstance(output, Exception) else output
+
+
+def run_chains_batch(conversations, chains=SECTIONS, max_concurrency: int = None) -> list:
+    """
+    Run many conversations through the selected chains with the chains' batch().
+
+    Each chain processes the whole batch with at most max_concurrency
+    conversations in flight, and the chains run concurrently with each other.
+    Returns one {chain_name: result} dict per conversation, in input order;
+    a failing item gets error results without failing the batch.
+    """
+    max_concurrency = max_concurrency or Config.BATCH_MAX_CONCURRENCY
+    results, accepted = _split_batch(conversations, chains)
+    if not accepted:
+        return results
+
+    batch = [conversations[i] for i in accepted]
+    for conversation in batch:
+        _record_transcript(conversation)
+    futures = {
+        name: _submit(get_chain(name).batch_process, batch, max_concurrency)
+        for name in chains
+    }
+    for name, future in futures.items():
+        try:
+            outputs = future.result()
+        except Exception as e:
+            outputs = [e] * len(accepted)
+        _merge_batch(results, accepted, name, outputs)
+
+    return results
+
+
+async def arun_chains_batch(conversations, chains=SECTIONS, max_concurrency: int = None) -> list:
+    """Async run_chains_batch() using the chains' abatch()"""
+    max_concurrency = max_concurrency or Config.BATCH_MAX_CONCURRENCY
+    results, accepted = _split_batch(conversations, chains)
+    if not accepted:
+        return results
+
+    batch = [conversations[i] for i in accepted]
+    for conversation in batch:
+        _record_transcript(conversation)
+    outputs_per_chain = await asyncio.gather(
+        *(get_chain(name).abatch_process(batch, max_concurrency) for name in chains),
+        return_exceptions=True
+    )
+    for name, outputs in zip(chains, outputs_per_chain):
+        if isinstance(outputs, Exception):
+            outputs = [outputs] * len(accepted)
+        _merge_batch(results, accepted, name, outputs)
+
+    return results
+
+
+def stream_chains(conversation: str, chains=SECTIONS, timeout: float = None):
+    """
+    Run the selected chains concurrently and yield their output as it arrives.
+
+    Yields (chain_name, "token", text) for streamed tokens and
+    (chain_name, "result", dict) once per chain, in completion order. Chains
+    still running at the deadline are reported as timed out.
+    """
+    if Config.PREFILTER_ENABLED and classify_conversation(conversation).label == NON_MEDICAL:
+        for name, result in _rejected_results(chains).items():
+            yield name, "result", result
+        return
+
+    _record_transcript(conversation)
+    timeout = Config.CHAIN_TIMEOUT if timeout is None else timeout
+    events = queue.Queue()
+
+    def run(name, submitted_at):
+        started_at = time.monotonic()
+        try:
+            for kind, payload in get_chain(name).stream_process(conversation):
+                events.put((name, kind, payload))
+        except Exception as e:
+            events.put((name, "result", _failure_result(name, e)))
+        finally:
+            record_chain(name, time.monotonic() - started_at, queued=started_at - submitted_at)
+
+    for name in chains:
+        _submit(run, name, time.monotonic())
+    deadline = time.monotonic() + timeout
+
+    remaining = set(chains)
+    while remaining:
+        try:
+            name, kind, payload = events.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            for name in sorted(remaining):
+                yield name, "result", _timeout_result(name, timeout)
+            return
+
+        if kind == "result":
+            remaining.discard(name)
+        yield name, kind, payload
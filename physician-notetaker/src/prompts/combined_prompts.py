@@ -0,0 +1,22 @@
+from langchain.prompts import PromptTemplate
+from src.prompts.common import CONVERSATION_PREFIX
+
+# All three analyses in one JSON-mode call; sections mirror the dedicated chains' output
+COMBINED_ANALYSIS_PROMPT = PromptTemplate(
+    input_variables=["conversation"],
+    template=CONVERSATION_PREFIX + """You are a medical documentation assistant. Analyze the conversation above and respond with one JSON object.
+
+**Your Task:**
+1. is_medical: whether the conversation is related to medical/healthcare topics
+2. entities: Symptoms, Treatment, Diagnosis and Prognosis stated in the conversation, using exact medical terms and an empty array [] when none is found
+3. sentiment: from the patient's statements only, the dominant Sentiment (Anxious, Neutral or Reassured), every applicable Intent (Seeking reassurance, Reporting symptoms, Expressing concern, Asking questions, Acknowledging improvement), Confidence and supporting Patient_Quotes
+4. soap_note: a concise SOAP note with only information explicitly stated, in professional medical terminology
+
+**JSON Format:**
+{{"is_medical": true,
+"entities": {{"Symptoms": ["neck pain"], "Treatment": ["physiotherapy"], "Diagnosis": ["whiplash injury"], "Prognosis": ["full recovery expected"]}},
+"sentiment": {{"Sentiment": "Anxious OR Neutral OR Reassured", "Intent": ["detected intents"], "Confidence": "High OR Medium OR Low", "Patient_Quotes": ["key quotes"]}},
+"soap_note": {{"Subjective": {{"Chief_Complaint": "", "History_of_Present_Illness": ""}}, "Objective": {{"Physical_Exam": "", "Observations": ""}}, "Assessment": {{"Diagnosis": "", "Severity": ""}}, "Plan": {{"Treatment": "", "Follow_Up": ""}}}}}}
+
+If the conversation is not medical, return {{"is_medical": false}}."""
+)
@@ -0,0 +1,7 @@
+# Every chain's prompt starts with exactly this text, so the transcript forms
+# a shared prefix that provider-side prompt caching can reuse across the
+# NER, sentiment and SOAP calls for one request. Instructions come after it.
+CONVERSATION_PREFIX = """Physician-patient conversation:
+{conversation}
+
+"""
@@ -1,58 +1,37 @@
 from langchain.prompts import PromptTemplate
+from src.prompts.common import CONVERSATION_PREFIX
 
 # Chain 1: Medical Conversation Validator
 MEDICAL_VALIDATOR_PROMPT = PromptTemplate(
     input_variables=["conversation"],
-    template="""You are a medical conversation validator.
+    template=CONVERSATION_PREFIX + """You are a medical conversation validator.
 
-Determine if the following conversation is related to medical/healthcare topics.
-
-Conversation:
-{conversation}
+Determine if the conversation above is related to medical/healthcare topics.
 
 Respond with ONLY one word: "MEDICAL" or "NON_MEDICAL"
 
 Response:"""
 )
 
-# Chain 2: NER Extraction - STRICT JSON OUTPUT
+# Chain 2: NER Extraction - JSON mode
 NER_EXTRACTION_PROMPT = PromptTemplate(
     input_variables=["conversation"],
-    template="""You are a medical NER extraction system. Extract entities and return ONLY valid JSON.
-
-**Extract these entities from the conversation:**
+    template=CONVERSATION_PREFIX + """You are a medical NER extraction system. Extract these entities from the conversation as a JSON object:
 - Symptoms: Physical complaints, pain, discomfort
 - Treatment: Medications, therapies, procedures
 - Diagnosis: Medical conditions identified
 - Prognosis: Recovery predictions, future outcomes
 
-**Conversation:**
-{conversation}
-
-**CRITICAL INSTRUCTIONS:**
-- Return ONLY the JSON object, NO explanatory text
-- NO markdown code blocks, NO "```
-- Start your response with {{ and end with }}
-- If no entity found, use empty array []
-
-**Example Output Format:**
-{{
-  "Symptoms": ["neck pain", "back pain"],
-  "Treatment": ["physiotherapy"],
-  "Diagnosis": ["whiplash injury"],
-  "Prognosis": ["full recovery expected"]
-}}
+Use an empty array [] when an entity is not found.
 
-Now extract from the conversation above. Return ONLY the JSON:"""
+**JSON Format:**
+{{"Symptoms": ["neck pain", "back pain"], "Treatment": ["physiotherapy"], "Diagnosis": ["whiplash injury"], "Prognosis": ["full recovery expected"]}}"""
 )
 
-# Chain 3: Validator & Corrector - STRICT JSON OUTPUT
+# Chain 3: Validator & Corrector - JSON mode
 NER_VALIDATOR_PROMPT = PromptTemplate(
     input_variables=["conversation", "extracted_data"],
-    template="""You are a medical data validator. Verify extracted NER data and return corrected JSON.
-
-**Original Conversation:**
-{conversation}
+    template=CONVERSATION_PREFIX + """You are a medical data validator. Verify the extracted NER data against the conversation and return the corrected data as a JSON object.
 
 **Extracted Data to Validate:**
 {extracted_data}
@@ -61,21 +40,28 @@ NER_VALIDATOR_PROMPT = PromptTemplate(
 1. Verify all entities exist in the conversation
 2. Remove any hallucinated information
 3. Add any missing entities
-4. Return corrected JSON
+4. Use exact medical terms from the conversation
 
-**CRITICAL INSTRUCTIONS:**
-- Return ONLY the JSON object, NO explanatory text
-- NO markdown, NO "```json" tags, NO commentary
-- Start with {{ and end with }}
-- Use exact medical terms from conversation
+**JSON Format:**
+{{"Symptoms": [], "Treatment": [], "Diagnosis": [], "Prognosis": []}}"""
+)
 
-**Required JSON Format:**
-{{
-  "Symptoms": ["list"],
-  "Treatment": ["list"],
-  "Diagnosis": ["list"],
-  "Prognosis": ["list"]
-}}
+# Fast mode: validation, extraction and self-check in a single JSON-mode call
+NER_SINGLE_PASS_PROMPT = PromptTemplate(
+    input_variables=["conversation"],
+    template=CONVERSATION_PREFIX + """You are a medical NER extraction system. Respond with a JSON object.
 
-Return ONLY the corrected JSON now:"""
+**Your Task:**
+1. Decide if the conversation is related to medical/healthcare topics
+2. If it is, extract these entities:
+   - Symptoms: Physical complaints, pain, discomfort
+   - Treatment: Medications, therapies, procedures
+   - Diagnosis: Medical conditions identified
+   - Prognosis: Recovery predictions, future outcomes
+3. Check every entity against the conversation: keep only entities that are stated in it, use exact medical terms from the conversation, and use an empty array [] when none is found
+
+**JSON Format:**
+{{"is_medical": true, "Symptoms": ["neck pain", "back pain"], "Treatment": ["physiotherapy"], "Diagnosis": ["whiplash injury"], "Prognosis": ["full recovery expected"]}}
+
+If the conversation is not medical, return {{"is_medical": false}}."""
 )
@@ -0,0 +1,18 @@
+from langchain.prompts import PromptTemplate
+
+# One cheap retry when a chain's output fails to parse or validate
+JSON_REPAIR_PROMPT = PromptTemplate(
+    input_variables=["schema", "errors", "output"],
+    template="""Fix this output so it is a single valid JSON object matching the schema. Keep the content; change only structure and field names.
+
+Schema:
+{schema}
+
+Problems:
+{errors}
+
+Output to fix:
+{output}
+
+Corrected JSON:"""
+)
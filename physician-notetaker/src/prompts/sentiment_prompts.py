@@ -1,14 +1,12 @@
 from langchain.prompts import PromptTemplate
+from src.prompts.common import CONVERSATION_PREFIX
 
 SENTIMENT_ANALYSIS_PROMPT = PromptTemplate(
     input_variables=["conversation"],
-    template="""You are a medical sentiment analysis expert. Analyze the patient's emotional state and intent.
-
-**Conversation:**
-{conversation}
+    template=CONVERSATION_PREFIX + """You are a medical sentiment analysis expert. Analyze the patient's emotional state and intent and answer with a JSON object.
 
 **Task:**
-Analyze ONLY the patient's statements (not the physician's) to determine:
+Analyze ONLY the patient's statements (not the physician's; their turns may already be left out) to determine:
 
 1. **Sentiment Classification:**
    - Anxious: Patient expresses worry, fear, concern, or distress
@@ -22,19 +20,8 @@ Analyze ONLY the patient's statements (not the physician's) to determine:
    - "Asking questions": Patient seeking information
    - "Acknowledging improvement": Patient noting positive progress
 
-**Instructions:**
-- Focus on patient dialogue only
-- Choose the MOST DOMINANT sentiment if multiple are present
-- List ALL applicable intents
-- Base analysis on explicit statements, not assumptions
-
-**Output Format (STRICT JSON):**
-{{
-  "Sentiment": "Anxious OR Neutral OR Reassured",
-  "Intent": ["list of detected intents"],
-  "Confidence": "High OR Medium OR Low",
-  "Patient_Quotes": ["key quotes supporting the sentiment"]
-}}
+Choose the MOST DOMINANT sentiment, list ALL applicable intents, and base the analysis on explicit statements.
 
-JSON Output:"""
+**JSON Format:**
+{{"Sentiment": "Anxious OR Neutral OR Reassured", "Intent": ["detected intents"], "Confidence": "High OR Medium OR Low", "Patient_Quotes": ["key quotes supporting the sentiment"]}}"""
 )
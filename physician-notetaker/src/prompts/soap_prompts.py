@@ -1,8 +1,9 @@
 from langchain.prompts import PromptTemplate
+from src.prompts.common import CONVERSATION_PREFIX
 
 SOAP_NOTE_PROMPT = PromptTemplate(
     input_variables=["conversation"],
-    template="""You are an expert medical documentation specialist. Generate a structured SOAP note from this physician-patient conversation.
+    template=CONVERSATION_PREFIX + """You are an expert medical documentation specialist. Generate a structured SOAP note from the conversation above as a JSON object.
 
 **SOAP Format:**
 - **Subjective**: Patient's complaints, symptoms, history (what patient says)
@@ -10,9 +11,6 @@ SOAP_NOTE_PROMPT = PromptTemplate(
 - **Assessment**: Diagnosis, medical interpretation
 - **Plan**: Treatment recommendations, follow-up
 
-**Conversation:**
-{conversation}
-
 **Instructions:**
 - Extract ONLY information explicitly stated in the conversation
 - Use professional medical terminology
@@ -20,30 +18,9 @@ SOAP_NOTE_PROMPT = PromptTemplate(
 - Organize chronologically within each section
 - Include specific details (dates, numbers, durations)
 
-**Output Format (STRICT JSON):**
-{{
-  "Subjective": {{
-    "Chief_Complaint": "primary reason for visit",
-    "History_of_Present_Illness": "detailed patient narrative",
-    "Review_of_Systems": "additional symptoms or concerns"
-  }},
-  "Objective": {{
-    "Physical_Exam": "examination findings",
-    "Observations": "physician observations",
-    "Vitals": "if mentioned"
-  }},
-  "Assessment": {{
-    "Diagnosis": "confirmed diagnosis",
-    "Severity": "condition severity",
-    "Clinical_Impression": "physician's assessment"
-  }},
-  "Plan": {{
-    "Treatment": "treatment given or recommended",
-    "Medications": "if applicable",
-    "Follow_Up": "follow-up instructions",
-    "Prognosis": "expected outcome"
-  }}
-}}
-
-JSON Output:"""
+**JSON Format:**
+{{"Subjective": {{"Chief_Complaint": "", "History_of_Present_Illness": "", "Review_of_Systems": ""}},
+"Objective": {{"Physical_Exam": "", "Observations": "", "Vitals": ""}},
+"Assessment": {{"Diagnosis": "", "Severity": "", "Clinical_Impression": ""}},
+"Plan": {{"Treatment": "", "Medications": "", "Follow_Up": "", "Prognosis": ""}}}}"""
 )
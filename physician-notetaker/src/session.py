@@ -0,0 +1,127 @@
+"""
+Incremental analysis for live consultations.
+
+A session keeps the transcript so far plus the running NER entity set,
+sentiment and SOAP draft. Each update analyses only the newly appended turns
+(with a few preceding turns for context) and merges the result into the
+running state, so the cost of an update does not grow with the session.
+Between rebuilds the SOAP draft keeps its text fields, which came from the
+full transcript, and only fills empty ones and gains new list items from an
+update; a note written from the last few turns never overwrites it. The
+draft is rebuilt from the full transcript on request, when finalizing,
+when an update finds a diagnosis or treatment the session had not seen
+(the Assessment or Plan is out of date), and every
+SESSION_SOAP_REGEN_UPDATES updates.
+
+State is a plain dict so any store can hold it; chat.models persists it.
+"""
+from src.chains.registry import get_chain
+from src.config import Config
+from src.pipeline import run_chains
+from src.utils.chunking import merge_values
+
+
+def new_session_state() -> dict:
+    return {
+        "transcript": "",
+        "turn_count": 0,
+        "entities": {},
+        "sentiment": {},
+        "soap": {},
+        "soap_updates": 0,  # Incremental SOAP merges since the last full regeneration
+    }
+
+
+def split_turns(text: str) -> list:
+    """One turn per non-empty line"""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _merge(name: str, current: dict, result: dict) -> dict:
+    """Fold one chain result into the running data for that chain"""
+    if result.get("error"):
+        return current
+    if not current:
+        return result["data"]
+    merged = get_chain(name).merge_results([{"error": False, "data": current}, result])
+    return merged["data"]
+
+
+def _update_soap(current, update):
+    """The draft's SOAP text stays and only empty fields are filled; lists gain new items; dicts key by key"""
+    if isinstance(current, dict) and isinstance(update, dict):
+        keys = list(dict.fromkeys(list(current) + list(update)))
+        return {key: _update_soap(current.get(key), update.get(key)) for key in keys}
+    if isinstance(current, list) or isinstance(update, list):
+        return merge_values([current, update])
+    return update if current in (None, "", [], {}) else current
+
+
+def _new_findings(entities: dict, result: dict) -> bool:
+    """Whether an update's NER result has a diagnosis or treatment the session has not seen"""
+    if result.get("error"):
+        return False
+    for field in ("Diagnosis", "Treatment"):
+        known = {str(value).strip().lower() for value in entities.get(field) or []}
+        if any(str(value).strip().lower() not in known for value in result["data"].get(field) or []):
+            return True
+    return False
+
+
+def apply_turns(state: dict, new_text: str, regenerate_soap: bool = False) -> tuple:
+    """
+    Analyse newly appended turns and merge them into the session state.
+
+    Returns (state, results, soap_regenerated) where results holds this
+    update's per-chain results. The SOAP draft is regenerated from the whole
+    transcript when asked, when there is no draft yet, when the new turns
+    bring a new diagnosis or treatment, or once SESSION_SOAP_REGEN_UPDATES
+    incremental merges have accumulated.
+    """
+    turns = split_turns(new_text)
+    context = split_turns(state["transcript"])[-Config.SESSION_CONTEXT_TURNS:] if Config.SESSION_CONTEXT_TURNS else []
+    transcript = "\n".join(split_turns(state["transcript"]) + turns)
+
+    regen_every = Config.SESSION_SOAP_REGEN_UPDATES
+    regenerate_soap = (
+        regenerate_soap
+        or not state["soap"]
+        or (regen_every > 0 and state["soap_updates"] + 1 >= regen_every)
+    )
+
+    # Entities and sentiment only ever look at the new turns plus context
+    window = "\n".join(context + turns)
+    results = run_chains(window, chains=("ner", "sentiment") if regenerate_soap else ("ner", "sentiment", "soap"))
+    if not regenerate_soap and _new_findings(state["entities"], results["ner"]):
+        regenerate_soap = True
+    if regenerate_soap:
+        results.update(run_chains(transcript, chains=("soap",)))
+
+    new_state = dict(state)
+    new_state.update({
+        "transcript": transcript,
+        "turn_count": state["turn_count"] + len(turns),
+        "entities": _merge("ner", state["entities"], results["ner"]),
+        "sentiment": _merge("sentiment", state["sentiment"], results["sentiment"]),
+    })
+    if regenerate_soap:
+        if not results["soap"].get("error"):
+            new_state["soap"] = results["soap"]["data"]
+            new_state["soap_updates"] = 0
+    else:
+        if not results["soap"].get("error"):
+            new_state["soap"] = _update_soap(state["soap"], results["soap"]["data"])
+        new_state["soap_updates"] = state["soap_updates"] + 1
+
+    return new_state, results, regenerate_soap
+
+
+def regenerate(state: dict) -> tuple:
+    """Re-run every chain over the full transcript, replacing the running state"""
+    results = run_chains(state["transcript"])
+    new_state = dict(state)
+    for name, key in (("ner", "entities"), ("sentiment", "sentiment"), ("soap", "soap")):
+        if not results[name].get("error"):
+            new_state[key] = results[name]["data"]
+    new_state["soap_updates"] = 0
+    return new_state, results
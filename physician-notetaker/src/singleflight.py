@@ -0,0 +1,176 @@
+"""
+Single-flight coalescing of identical concurrent chain runs.
+
+Callers that ask for the same key (transcript hash + chain + prompt version
++ model, i.e. the result cache key) while a run is in flight wait for that
+run and get a copy of its result instead of starting their own.
+
+Within a process this is a table of in-flight calls. Across gunicorn workers
+the leader also holds a file lock for the key; a worker that finds the lock
+taken waits for it and then reads the result from the shared persistent
+cache, so cross-worker coalescing needs CACHE_SQLITE_PATH. File locks need
+fcntl, so on Windows only the in-process layer applies.
+"""
+import asyncio
+import copy
+import os
+import threading
+import time
+from src.config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Keys hash onto a fixed set of lock files so the directory does not grow
+_LOCK_STRIPES = 1024
+_LOCK_POLL_SECONDS = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.futures = []  # (loop, future) of async waiters
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    def __init__(self, lock_dir: str = ""):
+        self.lock_dir = lock_dir if fcntl is not None else ""
+        self._calls = {}
+        self._lock = threading.Lock()
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def _join(self, key: str, loop=None):
+        """
+        Return (call, future): future is None for the leader. Async waiters
+        get a future on their loop so they do not hold an executor thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                self._calls[key] = _Call()
+                return self._calls[key], None
+            future = loop.create_future() if loop is not None else call.done
+            if loop is not None:
+                call.futures.append((loop, future))
+            return call, future
+
+    def _finish(self, key: str, call: _Call, result=None, error=None):
+        call.result, call.error = result, error
+        with self._lock:
+            self._calls.pop(key, None)
+        call.done.set()
+        for loop, future in call.futures:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:  # The waiter's loop has closed
+                pass
+
+    @staticmethod
+    def _shared(call: _Call):
+        if call.error is not None:
+            raise call.error
+        return copy.deepcopy(call.result)
+
+    def _acquire_file_lock(self, key: str, timeout: float):
+        """
+        Take the cross-worker lock for key. Returns (file, waited): file is
+        None when locking is off or the wait timed out; waited tells whether
+        another worker held the lock first.
+        """
+        if not self.lock_dir:
+            return None, False
+        path = os.path.join(self.lock_dir, f"{int(key[:8], 16) % _LOCK_STRIPES:04d}.lock")
+        lock_file = open(path, "a")
+        deadline = time.monotonic() + timeout
+        waited = False
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return lock_file, waited
+            except BlockingIOError:
+                waited = True
+                if time.monotonic() >= deadline:
+                    lock_file.close()
+                    return None, True
+                time.sleep(_LOCK_POLL_SECONDS)
+
+    @staticmethod
+    def _release_file_lock(lock_file):
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def do(self, key: str, fn, lookup=None):
+        """
+        Run fn() once for every concurrent caller with this key. lookup() is
+        tried after waiting on another worker's lock, to pick up the result
+        it stored; fn runs only if that finds nothing.
+        """
+        call, waiting = self._join(key)
+        if waiting is not None:
+            waiting.wait()
+            return self._shared(call)
+
+        result = error = None
+        try:
+            lock_file, waited = self._acquire_file_lock(key, Config.CHAIN_TIMEOUT)
+            try:
+                result = lookup() if waited and lookup is not None else None
+                if result is None:
+                    result = fn()
+            finally:
+                self._release_file_lock(lock_file)
+        except BaseException as e:  # Cancellation too, or waiters would hang
+            error = e
+        self._finish(key, call, result, error)
+        if error is not None:
+            raise error
+        return result
+
+    async def ado(self, key: str, afn, lookup=None):
+        """Async do(): afn is a coroutine function; waiters await without blocking a thread"""
+        call, waiting = self._join(key, asyncio.get_running_loop())
+        if waiting is not None:
+            await waiting
+            return self._shared(call)
+
+        result = error = None
+        try:
+            lock_file, waited = await asyncio.to_thread(self._acquire_file_lock, key, Config.CHAIN_TIMEOUT)
+            try:
+                result = lookup() if waited and lookup is not None else None
+                if result is None:
+                    result = await afn()
+            finally:
+                self._release_file_lock(lock_file)
+        except BaseException as e:  # Cancellation too, or waiters would hang
+            error = e
+        self._finish(key, call, result, error)
+        if error is not None:
+            raise error
+        return result
+
+
+_single_flight = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide coalescer; cross-worker locking only when results are shared on disk"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                shared = Config.CACHE_ENABLED and Config.CACHE_SQLITE_PATH
+                _single_flight = SingleFlight(Config.SINGLEFLIGHT_LOCK_DIR if shared else "")
+    return _single_flight
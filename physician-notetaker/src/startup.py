@@ -0,0 +1,169 @@
+"""
+Process start-up: gunicorn --preload hooks, worker warm-up and readiness.
+
+The chain modules, LangChain and the Groq client library are imported on
+first use (see src/chains/registry.py), so manage.py commands and worker
+boot do not pay for them. With GUNICORN_PRELOAD=true, gunicorn.conf.py calls
+preload() in the master before it forks, so every worker shares those
+modules copy-on-write, and after_fork() in each worker afterwards.
+
+preload() creates no LLM client, chain instance, connection or thread:
+those are per process. after_fork() still resets them, in case anything in
+the master created one.
+
+warm_up() runs in each worker before it takes requests (gunicorn's
+post_worker_init, or in the background on the first /readyz probe
+elsewhere). It imports the URLconf, builds the chain registry, opens the
+provider connection pool and, with WARMUP_ANALYSIS, runs a tiny canned
+analysis.
+readiness() backs /readyz: a worker is ready once warmed up and while
+neither the rate limiter nor the provider is saturated.
+"""
+import gc
+import threading
+import time
+from src.config import Config
+
+WARMUP_CONVERSATION = """Physician: What brings you in today?
+Patient: I've had neck pain and headaches since a car accident last week.
+Physician: Any numbness or tingling in your arms?
+Patient: No, just stiffness. Painkillers help a little.
+Physician: It sounds like whiplash. A few physiotherapy sessions should help, and I expect a full recovery."""
+
+_warm_up = {"status": "pending", "seconds": None, "error": None, "finished_at": None}
+_warm_up_lock = threading.Lock()  # Held for a whole warm-up
+_warm_up_thread = None
+_warm_up_thread_lock = threading.Lock()
+
+
+def preload():
+    """Import the URLconf, views and every chain module in the master process"""
+    from django.urls import get_resolver
+    from src.chains import registry
+
+    get_resolver().url_patterns  # Imports chatbot_project.urls and chat.views
+    registry.import_all()
+    import langchain_text_splitters  # Long-transcript chunking
+    if Config.LLM_PROVIDER == "fake":
+        import src.fake_llm
+
+    # Objects that survive to the fork are never collected again, so the
+    # collector does not write to (and copy) the pages workers share
+    gc.freeze()
+
+
+def after_fork():
+    """Drop per-process state inherited from the master"""
+    from django.db import connections
+    from src import pipeline
+    from src.chains import registry
+    from src.llm import reset_llm
+
+    connections.close_all()
+    reset_llm()
+    registry.reset()
+    pipeline.reset_executor()
+    _warm_up.update(status="pending", seconds=None, error=None, finished_at=None)
+
+
+def _local_analysis():
+    """Every chain once on the offline stand-in: prompts, parsing and validation, no provider call"""
+    from src.chains import registry
+    from src.fake_llm import FakeChatModel
+
+    llm = FakeChatModel(latency=0)
+    for name in ("ner", "sentiment", "soap"):
+        chain = registry.chain_class(name)(llm=llm)
+        # Straight to the runnable: a stand-in result must not reach the result cache
+        result = chain._process(chain.prepare(WARMUP_CONVERSATION))
+        if result.get("error"):
+            raise RuntimeError(f"{name}: {result.get('message')}")
+
+
+def _llm_analysis():
+    from src.pipeline import run_chains
+
+    failed = [name for name, result in run_chains(WARMUP_CONVERSATION).items() if result.get("error")]
+    if failed:
+        raise RuntimeError(f"warm-up analysis failed for {', '.join(failed)}")
+
+
+def warm_up() -> dict:
+    """Get this worker ready for its first request; does nothing once it has succeeded"""
+    if not Config.WARMUP_ENABLED:
+        return warm_up_status()
+    with _warm_up_lock:
+        if _warm_up["status"] == "ready":
+            return dict(_warm_up)
+        from django.urls import get_resolver
+        from src.chains import registry
+        from src.llm import warm_connections
+
+        _warm_up["status"] = "warming"
+        start = time.perf_counter()
+        try:
+            get_resolver().url_patterns  # Imports the URLconf and views, which Django leaves to the first request
+            registry.build_all()
+            warm_connections()
+            if Config.WARMUP_ANALYSIS == "local":
+                _local_analysis()
+            elif Config.WARMUP_ANALYSIS == "llm":
+                _llm_analysis()
+        except Exception as e:
+            print(f"⚠ Warm-up failed: {str(e)}")
+            _warm_up.update(status="failed", error=str(e))
+        else:
+            _warm_up.update(status="ready", error=None)
+        _warm_up.update(seconds=round(time.perf_counter() - start, 3), finished_at=time.time())
+        return dict(_warm_up)
+
+
+def start_warm_up():
+    """Warm up in the background unless that is running, has succeeded or failed moments ago"""
+    global _warm_up_thread
+    with _warm_up_thread_lock:
+        if _warm_up["status"] in ("ready", "warming") or (_warm_up_thread is not None and _warm_up_thread.is_alive()):
+            return
+        finished_at = _warm_up["finished_at"]
+        if _warm_up["status"] == "failed" and time.time() - finished_at < Config.WARMUP_RETRY_SECONDS:
+            return
+        _warm_up_thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+        _warm_up_thread.start()
+
+
+def warm_up_status() -> dict:
+    if not Config.WARMUP_ENABLED:
+        return {"status": "disabled", "seconds": None, "error": None, "finished_at": None}
+    return dict(_warm_up)
+
+
+def saturation(snapshot: dict) -> list:
+    """Why the LLM budget cannot take more work right now, from a rate limiter snapshot"""
+    reasons = []
+    if snapshot["blocked_for"] > 0:
+        reasons.append("upstream_throttled")  # The provider answered 429 with a Retry-After
+    if snapshot["requests_available"] is not None and snapshot["requests_available"] < 1:
+        reasons.append("rpm_exhausted")
+    if snapshot["tokens_available"] is not None and snapshot["tokens_available"] < Config.READY_MIN_TOKENS:
+        reasons.append("tpm_exhausted")
+    if snapshot["in_flight"] >= snapshot["concurrency_limit"]:
+        reasons.append("concurrency_full")
+    return reasons
+
+
+def readiness() -> dict:
+    """Readiness report for /readyz; starts a warm-up if this worker has not had one"""
+    from src.utils.rate_limiter import get_rate_limiter
+
+    status = warm_up_status()
+    if status["status"] in ("pending", "failed"):
+        start_warm_up()
+    snapshot = get_rate_limiter().snapshot()
+    saturated = saturation(snapshot)
+    warm = status["status"] in ("ready", "disabled")
+    return {
+        "ready": warm and not (saturated and Config.READY_SHED_LOAD),
+        "warm_up": status,
+        "saturated": saturated,
+        "rate_limiter": snapshot,
+    }
@@ -0,0 +1,226 @@
+"""
+Per-stage tracing for the analysis chains.
+
+TracingCallback is attached to the shared LLM client, so it sees every LLM
+call. Each call's stage is its run name, set with with_config(run_name=...)
+where the chains are built. Every call and chain run updates the Prometheus
+metrics in src.metrics. When a request is wrapped in trace_request(), it also
+collects a timing breakdown for that request's response.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+from src.config import Config
+from src import metrics
+
+_current_trace = contextvars.ContextVar("analysis_trace", default=None)
+
+
+class RequestTrace:
+    """Timing breakdown for one API request"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.stages = []
+        self.chains = {}
+        self.transcript = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, stage: dict):
+        with self._lock:
+            self.stages.append(stage)
+
+    def update_chain(self, name: str, **values):
+        with self._lock:
+            self.chains.setdefault(name, {}).update(values)
+
+    def add_transcript(self, raw_tokens: int, sent_tokens: int):
+        with self._lock:
+            self.transcript["raw_tokens"] = self.transcript.get("raw_tokens", 0) + raw_tokens
+            self.transcript["sent_tokens"] = self.transcript.get("sent_tokens", 0) + sent_tokens
+            self.transcript["saved_tokens"] = self.transcript["raw_tokens"] - self.transcript["sent_tokens"]
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            return {
+                "total_ms": round((time.perf_counter() - self.started_at) * 1000, 1),
+                "transcript": dict(self.transcript),
+                "chains": {name: dict(values) for name, values in self.chains.items()},
+                "stages": [dict(stage) for stage in self.stages],
+            }
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one entry per chain plus the total"""
+        breakdown = self.breakdown()
+        entries = [
+            f'{name};dur={values["wall_ms"]}' for name, values in breakdown["chains"].items() if "wall_ms" in values
+        ]
+        entries.append(f'total;dur={breakdown["total_ms"]}')
+        return ", ".join(entries)
+
+
+@contextmanager
+def trace_request():
+    """Collect a RequestTrace for everything analysed inside the block"""
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def record_chain(name: str, seconds: float, queued: float = None):
+    metrics.CHAIN_SECONDS.observe(seconds, chain=name)
+    values = {"wall_ms": round(seconds * 1000, 1)}
+    if queued is not None:
+        metrics.CHAIN_QUEUE_SECONDS.observe(queued, chain=name)
+        values["queue_ms"] = round(queued * 1000, 1)
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain(name, **values)
+
+
+def record_transcript(raw_tokens: int, sent_tokens: int):
+    """Transcript size before and after normalization (estimated tokens)"""
+    metrics.TRANSCRIPT_TOKENS.inc(raw_tokens, kind="raw")
+    metrics.TRANSCRIPT_TOKENS.inc(sent_tokens, kind="sent")
+    trace = current_trace()
+    if trace is not None:
+        trace.add_transcript(raw_tokens, sent_tokens)
+
+
+def record_combined_fallback(sections):
+    """Sections of a combined analysis re-requested through their own chains"""
+    for section in sections:
+        metrics.COMBINED_FALLBACKS.inc(section=section)
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain("combined", fallback=list(sections))
+
+
+def record_ner_verification(method: str):
+    """How thorough-mode NER entities were verified, "local" or "llm"."""
+    metrics.NER_VERIFICATIONS.inc(method=method)
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain("ner", verified_by=method)
+
+
+def record_cache_lookup(name: str, hit: bool):
+    metrics.CACHE_LOOKUPS.inc(chain=name, result="hit" if hit else "miss")
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain(name, cache="hit" if hit else "miss")
+
+
+def record_parse_failure(name: str):
+    metrics.PARSE_FAILURES.inc(chain=name)
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain(name, parse_failed=True)
+
+
+def record_json_repair(name: str, repaired: bool):
+    metrics.JSON_REPAIRS.inc(chain=name, result="success" if repaired else "failure")
+    trace = current_trace()
+    if trace is not None:
+        trace.update_chain(name, json_repaired=repaired)
+
+
+def _token_usage(response):
+    """
+    (prompt, completion, cached) tokens from the LLM result, streamed or not.
+    Cached tokens are the part of the prompt the provider served from its
+    prefix cache.
+    """
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), cached
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            if metadata:
+                cached = (metadata.get("input_token_details") or {}).get("cache_read", 0)
+                return metadata.get("input_tokens", 0), metadata.get("output_tokens", 0), cached
+    return 0, 0, 0
+
+
+class TracingCallback(BaseCallbackHandler):
+    """Records wall time, tokens, retries and cost for every LLM call"""
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, name):
+        with self._lock:
+            self._runs[run_id] = {
+                "stage": name or "llm",
+                "started_at": time.perf_counter(),
+                "retries": 0,
+                "trace": current_trace(),
+            }
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, name=None, **kwargs):
+        self._start(run_id, name)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, name=None, **kwargs):
+        self._start(run_id, name)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                run["retries"] += 1
+                metrics.LLM_RETRIES.inc(stage=run["stage"])
+
+    def _finish(self, run_id, status, response=None):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+
+        stage = run["stage"]
+        seconds = time.perf_counter() - run["started_at"]
+        prompt_tokens, completion_tokens, cached_tokens = _token_usage(response) if response is not None else (0, 0, 0)
+        cost = (
+            prompt_tokens * Config.LLM_PROMPT_PRICE_PER_MTOK
+            + completion_tokens * Config.LLM_COMPLETION_PRICE_PER_MTOK
+        ) / 1_000_000
+
+        metrics.LLM_STAGE_SECONDS.observe(seconds, stage=stage)
+        metrics.LLM_CALLS.inc(stage=stage, status=status)
+        metrics.LLM_TOKENS.inc(prompt_tokens, stage=stage, kind="prompt")
+        metrics.LLM_TOKENS.inc(completion_tokens, stage=stage, kind="completion")
+        metrics.LLM_TOKENS.inc(cached_tokens, stage=stage, kind="cached")
+        if cost:
+            metrics.LLM_COST.inc(cost, stage=stage)
+
+        if run["trace"] is not None:
+            run["trace"].add_stage({
+                "stage": stage,
+                "status": status,
+                "wall_ms": round(seconds * 1000, 1),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cached_tokens": cached_tokens,
+                "retries": run["retries"],
+            })
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, "success", response)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error")
+
+
+# One handler for the whole process; it is attached to the shared LLM client
+tracer = TracingCallback()
@@ -0,0 +1,78 @@
+import json
+from src.config import Config
+from src.utils.rate_limiter import estimate_tokens
+
+# Turn boundaries first, then sentences, so a chunk rarely cuts a turn in half
+TURN_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+CHARS_PER_TOKEN = 4
+
+
+def is_long_transcript(conversation: str) -> bool:
+    """True when a transcript should be analysed chunk by chunk"""
+    threshold = Config.LONG_TRANSCRIPT_TOKENS
+    return threshold > 0 and estimate_tokens(conversation) > threshold
+
+
+def split_transcript(conversation: str, chunk_tokens: int = None, overlap_tokens: int = None) -> list:
+    """
+    Split a transcript into chunks of about chunk_tokens on speaker-turn
+    boundaries, with a little overlap so context carries across chunks.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    chunk_tokens = chunk_tokens or Config.CHUNK_TOKENS
+    overlap_tokens = Config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    splitter = RecursiveCharacterTextSplitter(
+        separators=TURN_SEPARATORS,
+        chunk_size=chunk_tokens * CHARS_PER_TOKEN,
+        chunk_overlap=overlap_tokens * CHARS_PER_TOKEN,
+        keep_separator=False,
+        strip_whitespace=True
+    )
+    return splitter.split_text(conversation)
+
+
+def _dedupe_key(value) -> str:
+    if isinstance(value, str):
+        return " ".join(value.lower().split()).rstrip(".")
+    return json.dumps(value, sort_keys=True)
+
+
+def _is_empty(value) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def merge_values(values):
+    """
+    Merge the same field from several chunk results: dicts key by key, lists
+    as a de-duplicated union, distinct strings joined. Empty values are
+    ignored unless every chunk left the field empty.
+    """
+    present = [value for value in values if not _is_empty(value)]
+    if not present:
+        return next((value for value in values if value is not None), None)
+
+    if all(isinstance(value, dict) for value in present):
+        keys = list(dict.fromkeys(key for value in present for key in value))
+        return {key: merge_values([value.get(key) for value in present]) for key in keys}
+
+    if any(isinstance(value, list) for value in present):
+        items = [item for value in present for item in (value if isinstance(value, list) else [value])]
+        merged, seen = [], set()
+        for item in items:
+            key = _dedupe_key(item)
+            if key not in seen:
+                seen.add(key)
+                merged.append(item)
+        return merged
+
+    if all(isinstance(value, str) for value in present):
+        merged, seen = [], set()
+        for value in present:
+            key = _dedupe_key(value)
+            if key not in seen:
+                seen.add(key)
+                merged.append(value.strip())
+        return "; ".join(merged)
+
+    return present[0]
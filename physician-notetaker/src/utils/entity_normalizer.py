@@ -0,0 +1,241 @@
+"""
+Local verification and normalization of NER output.
+
+Every extracted entity is checked against the transcript through a word
+index: words match exactly or by stem ("backaches" / "backache", "10" /
+"ten"), and a trigram fallback accepts only one-letter typos in long words
+that keep the word's opening letters, so "cancer" never matches "cancel" nor
+"hypertension" "hypotension". Entities are mapped to the canonical terms in
+medical_lexicon.SYNONYMS ("whiplash" -> "whiplash injury") through a trigram
+index built once at import and de-duplicated per category on that term.
+
+The lists keep the wording the entities were extracted with ("stiff neck",
+not "stiffness"); the canonical term, and whether the entity was found, sit
+next to it in Entity_Details, so entities missing from the transcript are
+flagged rather than dropped. When every entity matches exactly, the
+thorough NER pipeline can skip its LLM verification call; fuzzy or partial
+matches are reported as uncertain and leave that call in place.
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+from src.utils.medical_lexicon import SYNONYMS
+
+ENTITY_FIELDS = ("Symptoms", "Treatment", "Diagnosis", "Prognosis")
+DETAILS_FIELD = "Entity_Details"
+
+# Share of an entity's content words that must be found in the transcript
+MIN_WORD_COVERAGE = 0.6
+# Trigram similarity for a fuzzy word match and for mapping onto a canonical term
+WORD_SIMILARITY = 0.8
+CANONICAL_SIMILARITY = 0.75
+# A fuzzy word match is at most one edit away and keeps the leading letters (hyper- / hypo-)
+MAX_EDIT_DISTANCE = 1
+FUZZY_PREFIX = 5
+
+# How an entity was found in the transcript
+EXACT = "exact"
+FUZZY = "fuzzy"
+
+_NUMBERS = {
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+    "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12",
+}
+_STOPWORDS = frozenset((
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "with", "and", "or", "my", "her", "his",
+    "their", "some", "any", "from", "by", "as", "is", "be", "was", "were", "after", "within",
+))
+_WORD_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_SUFFIXES = ("ing", "ed", "s")
+
+NormalizationReport = namedtuple(
+    "NormalizationReport", ["verified", "unverified", "uncertain", "canonicalized", "duplicates"]
+)
+
+
+def _words(text: str) -> list:
+    return [_NUMBERS.get(word, word) for word in _WORD_RE.findall(text.lower())]
+
+
+def _key(text: str) -> str:
+    return " ".join(_words(text))
+
+
+def _stem(word: str) -> str:
+    """Crude stem for matching inflections: backaches, backache -> backach"""
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and not word.endswith(("ss", "us", "is")) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+def _within_edits(a: str, b: str, limit: int) -> bool:
+    """Whether the edit distance between a and b is at most limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other)))
+        if min(current) > limit:
+            return False
+        previous = current
+    return previous[-1] <= limit
+
+
+def _trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _similarity(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class _TrigramIndex:
+    """Inverted trigram index over a vocabulary, for nearest-match lookups"""
+
+    def __init__(self, vocabulary):
+        self.grams = {}
+        self.postings = {}
+        for item in vocabulary:
+            grams = _trigrams(item)
+            self.grams[item] = grams
+            for gram in grams:
+                self.postings.setdefault(gram, set()).add(item)
+
+    def matches(self, text: str, threshold: float):
+        """Vocabulary items at or above threshold, most similar first"""
+        grams = _trigrams(text)
+        candidates = set()
+        for gram in grams:
+            candidates.update(self.postings.get(gram, ()))
+        scored = [(_similarity(grams, self.grams[candidate]), candidate) for candidate in candidates]
+        return [candidate for score, candidate in sorted(scored, reverse=True) if score >= threshold]
+
+    def best(self, text: str, threshold: float):
+        """Most similar vocabulary item at or above threshold, or None"""
+        return next(iter(self.matches(text, threshold)), None)
+
+
+# Built once: every variant and canonical form, keyed like _key()
+_CANONICAL = {}
+for _canonical, _variants in SYNONYMS.items():
+    for _variant in (_canonical,) + _variants:
+        _CANONICAL[_key(_variant)] = _canonical
+_CANONICAL_INDEX = _TrigramIndex(_CANONICAL)
+
+
+def canonical_term(entity: str) -> str:
+    """Canonical lexicon term for an entity, or the entity itself (trimmed)"""
+    key = _key(entity)
+    if key in _CANONICAL:
+        return _CANONICAL[key]
+    match = _CANONICAL_INDEX.best(key, CANONICAL_SIMILARITY) if key else None
+    # Spelling variants only: "10 physiotherapy sessions" keeps its detail
+    if match is not None and len(match.split()) == len(key.split()):
+        return _CANONICAL[match]
+    return entity.strip()
+
+
+class TranscriptIndex:
+    """Word and stem sets plus trigram index of one transcript"""
+
+    def __init__(self, conversation: str):
+        words = _words(conversation)
+        self.text = " ".join(words)
+        self.words = frozenset(words)
+        self.stems = frozenset(_stem(word) for word in self.words)
+        self.fuzzy = _TrigramIndex(self.words)
+
+    def _word_match(self, word: str):
+        """EXACT for the word or its stem, FUZZY for a one-letter typo, else None"""
+        if word in self.words or _stem(word) in self.stems:
+            return EXACT
+        for candidate in self.fuzzy.matches(word, WORD_SIMILARITY):
+            if candidate[:FUZZY_PREFIX] == word[:FUZZY_PREFIX] and _within_edits(word, candidate, MAX_EDIT_DISTANCE):
+                return FUZZY
+        return None
+
+    def match(self, entity: str):
+        """
+        EXACT when the entity, a synonym of it, or every content word occurs in
+        the transcript; FUZZY when enough content words occur only with typos
+        or some are missing; None when the entity is not found.
+        """
+        key = _key(entity)
+        if not key:
+            return None
+        if f" {key} " in f" {self.text} ":
+            return EXACT
+        canonical = _CANONICAL.get(key)
+        if canonical is not None:
+            variants = (canonical,) + SYNONYMS[canonical]
+            if any(f" {_key(variant)} " in f" {self.text} " for variant in variants):
+                return EXACT
+        content = [word for word in key.split() if word not in _STOPWORDS] or key.split()
+        found = [self._word_match(word) for word in content]
+        if all(match == EXACT for match in found):
+            return EXACT
+        if sum(match is not None for match in found) / len(content) >= MIN_WORD_COVERAGE:
+            return FUZZY
+        return None
+
+    def contains(self, entity: str) -> bool:
+        """Whether the entity, a synonym of it, or most of its content words occur in the transcript"""
+        return self.match(entity) is not None
+
+
+@lru_cache(maxsize=32)
+def transcript_index(conversation: str) -> TranscriptIndex:
+    return TranscriptIndex(conversation)
+
+
+def normalize_entities(entities: dict, conversation: str) -> tuple:
+    """
+    Verify, canonicalize and de-duplicate the entity lists.
+
+    Returns (entities, report): each list keeps its entities as extracted,
+    once per canonical term; Entity_Details maps each field to one
+    {"text", "canonical", "verified"} entry per kept entity, with verified
+    False for entities not found in the transcript. Other keys are kept as
+    they are. The report lists the entities found only through fuzzy or
+    partial matches as uncertain.
+    """
+    index = transcript_index(conversation)
+    normalized = dict(entities)
+    details = {}
+    verified, unverified, uncertain, canonicalized, duplicates = 0, [], [], 0, 0
+    for field in ENTITY_FIELDS:
+        values = entities.get(field)
+        if not isinstance(values, list):
+            continue
+        kept, seen = [], set()
+        details[field] = []
+        for value in values:
+            if not isinstance(value, str) or not value.strip():
+                continue
+            text = value.strip()
+            match = index.match(text)
+            if match is None:
+                unverified.append(text)
+            else:
+                verified += 1
+                if match == FUZZY:
+                    uncertain.append(text)
+            term = canonical_term(text)
+            if term != text:
+                canonicalized += 1
+            if term.lower() in seen:
+                duplicates += 1
+                continue
+            seen.add(term.lower())
+            kept.append(text)
+            details[field].append({"text": text, "canonical": term, "verified": match is not None})
+        normalized[field] = kept
+    normalized[DETAILS_FIELD] = details
+    return normalized, NormalizationReport(verified, unverified, uncertain, canonicalized, duplicates)
@@ -0,0 +1,102 @@
+"""
+Tolerant JSON extraction for LLM output.
+
+Handles the usual ways a model wraps or damages its JSON: markdown code
+fences, prose before or after the object (brackets in the prose included),
+trailing commas, and output cut off before the closing brackets. The fast path is a plain orjson parse; the
+repair path is a single character scan, with no regex backtracking.
+"""
+import orjson
+
+
+class JSONExtractionError(ValueError):
+    """No JSON value could be recovered from the text"""
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+# What may follow an opening bracket (after whitespace) in real JSON
+_VALUE_STARTS = {"{": '"}', "[": '"{[]-0123456789tfn'}
+# Plausible opening brackets tried as the start of the value before giving up
+_MAX_CANDIDATES = 32
+
+
+def _scan(text: str, start: int) -> str:
+    """
+    Copy the JSON value that opens at text[start], dropping trailing commas
+    and closing any brackets left open at the end of the text
+    """
+    out = []
+    stack = []
+    in_string = False
+    escaped = False
+    pending_comma = False
+
+    for char in text[start:]:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char in " \t\r\n":
+            continue
+        if char == ",":
+            pending_comma = True
+            continue
+        if pending_comma:
+            # A comma directly before a closing bracket is dropped
+            if char not in "}]":
+                out.append(",")
+            pending_comma = False
+
+        out.append(char)
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            if stack and stack[-1] == char:
+                stack.pop()
+            if not stack:
+                return "".join(out)
+
+    # Truncated output: finish the open string and brackets
+    if in_string:
+        out.append('"')
+    out.extend(reversed(stack))
+    return "".join(out)
+
+
+def _candidates(text: str):
+    """Positions of opening brackets that could start a JSON value, in order"""
+    for i, char in enumerate(text):
+        if char in _CLOSERS:
+            following = text[i + 1:i + 64].lstrip()
+            if not following or following[0] in _VALUE_STARTS[char]:
+                yield i
+
+
+def extract_json(text: str):
+    """Parse the first JSON object or array in an LLM response"""
+    if text is None:
+        raise JSONExtractionError("No output to parse")
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+
+    # Prose before the JSON may hold brackets of its own ("see [1]"), so each
+    # opening bracket is tried in turn and the first that parses wins
+    error = None
+    for _, start in zip(range(_MAX_CANDIDATES), _candidates(text)):
+        try:
+            return orjson.loads(_scan(text, start))
+        except orjson.JSONDecodeError as e:
+            error = error or e
+    if error is None:
+        raise JSONExtractionError("No JSON object in output")
+    raise JSONExtractionError(f"Malformed JSON in output: {error}") from error
@@ -0,0 +1,85 @@
+import re
+from collections import namedtuple
+from src.utils.medical_lexicon import all_terms, CLINICAL_SPEAKERS, LAY_TERMS, OTHER_DOMAIN_TERMS, OTHER_SPEAKERS
+
+MEDICAL = "MEDICAL"
+NON_MEDICAL = "NON_MEDICAL"
+
+# label is MEDICAL, NON_MEDICAL or None when the LLM should decide
+FilterResult = namedtuple("FilterResult", ["label", "terms", "clinical_speakers", "words"])
+
+# Thresholds for a confident local decision
+MIN_TERMS_WITH_SPEAKERS = 3
+MIN_TERMS_WITHOUT_SPEAKERS = 6
+MIN_TERM_DENSITY = 2.0  # distinct terms per 100 words
+MIN_OTHER_DOMAIN_TERMS = 2  # distinct other-domain terms (a non-clinical speaker tag counts as one)
+
+
+def _trie_pattern(node) -> str:
+    """Render a character trie as a regex with shared prefixes factored out"""
+    alternatives = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not alternatives:
+        return ""
+    if "" in node:
+        return "(?:" + "|".join(alternatives) + ")?"
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def _compile_lexicon(terms):
+    """
+    Compile the lexicon into a single prefix-factored regex over lower-cased text.
+
+    Factoring the alternation through a trie keeps matching close to a single
+    pass over the input instead of trying every term at every position.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return re.compile(rf"(?<![\w-]){_trie_pattern(trie)}(?![\w-])")
+
+
+_TERM_RE = _compile_lexicon(all_terms())
+_LAY_RE = _compile_lexicon(LAY_TERMS)
+_OTHER_DOMAIN_RE = _compile_lexicon(OTHER_DOMAIN_TERMS)
+_SPEAKER_RE = re.compile(
+    rf"^\s*(?:{'|'.join(CLINICAL_SPEAKERS)})\.?(?:\s+[\w.'-]+)?\s*:",
+    re.IGNORECASE | re.MULTILINE
+)
+_OTHER_SPEAKER_RE = re.compile(
+    rf"^\s*(?:{'|'.join(OTHER_SPEAKERS)})(?:\s+[\w.'-]+)?\s*:",
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+def classify_conversation(conversation: str) -> FilterResult:
+    """
+    Classify a conversation as medical or not without calling the LLM.
+
+    Only the obvious cases get a label: several distinct medical terms in a
+    clinical dialogue (or a high density of them in free text) is MEDICAL.
+    NON_MEDICAL needs positive evidence of another domain (its vocabulary or
+    speaker tags) and no health vocabulary at all, lay words included, so
+    "I think I broke my wrist" still reaches the LLM. Anything in between
+    returns label None.
+    """
+    lowered = conversation.lower()
+    terms = set(_TERM_RE.findall(lowered))
+    clinical_speakers = _SPEAKER_RE.search(conversation) is not None
+    words = len(conversation.split())
+
+    label = None
+    if clinical_speakers and len(terms) >= MIN_TERMS_WITH_SPEAKERS:
+        label = MEDICAL
+    elif len(terms) >= MIN_TERMS_WITHOUT_SPEAKERS and 100 * len(terms) / max(words, 1) >= MIN_TERM_DENSITY:
+        label = MEDICAL
+    elif not terms and not clinical_speakers and not _LAY_RE.search(lowered):
+        other = len(set(_OTHER_DOMAIN_RE.findall(lowered))) + (_OTHER_SPEAKER_RE.search(conversation) is not None)
+        if other >= MIN_OTHER_DOMAIN_TERMS:
+            label = NON_MEDICAL
+
+    return FilterResult(label, terms, clinical_speakers, words)
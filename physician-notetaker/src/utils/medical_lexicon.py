@@ -0,0 +1,107 @@
+"""
+Bundled medical vocabulary for local (non-LLM) processing.
+
+Terms are lower-case. Everyday words that are often used non-medically
+("back", "head", "cold") are only listed inside unambiguous phrases.
+LAY_TERMS and the other-domain lists below are for the pre-filter only
+(src/utils/medical_filter.py), not for entity extraction.
+"""
+
+SYMPTOMS = (
+    "pain", "ache", "aches", "backache", "backaches", "headache", "headaches", "migraine",
+    "neck pain", "back pain", "chest pain", "abdominal pain", "stomach ache", "joint pain",
+    "discomfort", "stiffness", "tenderness", "swelling", "inflammation", "numbness", "tingling",
+    "dizziness", "dizzy", "nausea", "nauseous", "vomiting", "diarrhea", "diarrhoea", "constipation",
+    "fever", "chills", "cough", "coughing", "shortness of breath", "wheezing", "sore throat",
+    "fatigue", "insomnia", "trouble sleeping", "rash", "itching", "bleeding", "bruising",
+    "palpitations", "blurred vision", "cramps", "cramping", "spasm", "spasms", "weakness",
+    "anxiety", "depression", "loss of appetite", "weight loss", "runny nose", "congestion",
+)
+
+TREATMENTS = (
+    "painkillers", "painkiller", "analgesics", "ibuprofen", "paracetamol", "acetaminophen",
+    "aspirin", "antibiotics", "antibiotic", "amoxicillin", "insulin", "metformin", "statins",
+    "steroids", "inhaler", "prescription", "prescribed", "medication", "medications", "medicine",
+    "dosage", "dose", "tablets", "physiotherapy", "physical therapy", "surgery", "operation",
+    "injection", "vaccine", "vaccination", "x-ray", "x-rays", "mri", "ct scan", "ultrasound",
+    "blood test", "blood tests", "biopsy", "referral", "follow-up", "chemotherapy", "therapy",
+    "stitches", "cast", "brace", "rehabilitation",
+)
+
+DIAGNOSES = (
+    "whiplash", "whiplash injury", "fracture", "sprain", "strain", "concussion", "infection",
+    "diabetes", "hypertension", "high blood pressure", "asthma", "arthritis", "osteoarthritis",
+    "pneumonia", "bronchitis", "influenza", "flu", "covid", "migraine", "tumor", "tumour",
+    "cancer", "anemia", "anaemia", "allergy", "allergies", "dermatitis", "eczema",
+    "tendinitis", "disc herniation", "sciatica", "gastritis", "reflux", "ulcer", "stroke",
+    "heart attack", "heart disease", "degeneration", "injury", "injuries",
+)
+
+CLINICAL_TERMS = (
+    "symptom", "symptoms", "diagnosis", "diagnosed", "prognosis", "treatment", "treatments",
+    "recovery", "physical examination", "examination", "range of motion", "range of movement",
+    "clinic", "hospital", "accident and emergency", "emergency room", "a&e", "gp",
+    "appointment", "check-up", "checkup", "blood pressure", "heart rate", "pulse",
+    "temperature", "vitals", "chronic", "acute", "side effects", "allergic", "mobility",
+    "spine", "vertebrae", "ligament", "tendon", "muscle", "muscles", "joints", "abdomen",
+)
+
+# Plain-language health words. Too ambiguous to call a text medical, but any
+# of them is enough to leave the decision to the LLM
+LAY_TERMS = (
+    "hurt", "hurts", "hurting", "sore", "swollen", "swelling up", "sick", "ill", "unwell", "poorly",
+    "throwing up", "threw up", "throw up", "vomit", "vomited", "puke", "puking", "feverish",
+    "broke", "broken", "twisted", "sprained", "bleed", "bleeding", "bled", "bruise", "bruised",
+    "lump", "bump", "itchy", "faint", "fainted", "passed out", "tired", "exhausted", "can't sleep",
+    "can't breathe", "breathe", "breathing", "pregnant", "period", "pills", "meds", "pharmacy",
+    "chemo", "radiation", "dialysis", "stitch", "scar", "wound", "cut myself", "burned", "burnt",
+    "knee", "knees", "ankle", "wrist", "elbow", "shoulder", "hip", "neck", "spine", "chest",
+    "stomach", "tummy", "belly", "throat", "ear", "ears", "eye", "eyes", "tooth", "teeth", "skin",
+    "heart", "lungs", "kidney", "liver", "bladder", "bone", "bones", "blood", "leg", "legs",
+    "arm", "arms", "foot", "feet", "back", "head", "doctor", "doctors", "nurse", "dentist",
+)
+
+# Vocabulary of the everyday domains the app is most often sent by mistake
+# (orders, travel, IT support, sport). Needed as positive evidence before the
+# pre-filter rejects a text on its own
+OTHER_DOMAIN_TERMS = (
+    "order", "orders", "invoice", "refund", "delivery", "delivery address", "package", "parcel",
+    "tracking number", "shipping", "checkout", "receipt", "subscription", "account", "billing",
+    "booking", "book a", "reservation", "double room", "single room", "check in", "check out",
+    "breakfast included", "wifi", "flight", "hotel", "password", "log in", "login", "laptop",
+    "printer", "app", "software", "screen", "website", "browser", "upload", "download", "router",
+    "match", "drills", "training session", "boots", "second half", "first half", "score", "goal",
+    "meeting", "deadline", "project", "budget", "spreadsheet", "weather", "traffic",
+)
+
+# Speaker tags that mark a non-clinical dialogue ("Customer: ...", "Agent: ...")
+OTHER_SPEAKERS = (
+    "customer", "agent", "guest", "receptionist", "user", "support", "coach", "player", "client",
+    "caller", "operator", "manager", "seller", "buyer", "host", "student", "teacher",
+)
+
+# Canonical entity -> variants the NER output may use for it (see src/utils/entity_normalizer.py)
+SYNONYMS = {
+    "whiplash injury": ("whiplash", "whiplash injuries", "whiplash-associated disorder"),
+    "back pain": ("backache", "backaches", "back ache", "back aches", "pain in the back", "pain in my back"),
+    "neck pain": ("neck ache", "pain in the neck", "pain in my neck", "sore neck"),
+    "headache": ("headaches", "head ache", "head pain"),
+    "painkillers": ("painkiller", "pain killers", "pain killer", "analgesics", "analgesic", "pain medication"),
+    "physiotherapy": ("physio", "physical therapy", "physiotherapy sessions", "physio sessions"),
+    "trouble sleeping": ("difficulty sleeping", "sleep problems", "sleeplessness"),
+    "stiffness": ("stiff neck", "stiff back"),
+    "high blood pressure": ("hypertension",),
+    "shortness of breath": ("breathlessness", "short of breath"),
+    "x-ray": ("x-rays", "xray", "xrays", "x ray"),
+    "full recovery": ("complete recovery", "fully recover", "full recovery expected"),
+}
+
+# Speaker tags that mark a clinical dialogue ("Physician: ...", "Dr. Smith: ...")
+CLINICAL_SPEAKERS = ("physician", "doctor", "dr", "patient", "nurse", "clinician", "gp", "surgeon")
+# Speaker tags for the patient's own turns
+PATIENT_SPEAKERS = ("patient", "pt")
+
+
+def all_terms():
+    """Every medical term in the lexicon, de-duplicated"""
+    return sorted(set(SYMPTOMS + TREATMENTS + DIAGNOSES + CLINICAL_TERMS))
@@ -0,0 +1,303 @@
+import asyncio
+import math
+import random
+import sqlite3
+import threading
+import time
+from src.config import Config
+
+# How long to back off before re-checking a full concurrency limit
+_CONCURRENCY_POLL_SECONDS = 0.05
+# Attempts at a shared-store transaction that hit SQLite's busy timeout
+_STORE_ATTEMPTS = 3
+
+
+class TokenBucket:
+    """
+    In-process token bucket. A per_second rate of 0 means unlimited; the
+    bucket then only enforces block_until() (e.g. a provider Retry-After).
+    """
+
+    def __init__(self, capacity: float, per_second: float):
+        self.capacity = capacity
+        self.per_second = per_second
+        self._tokens = capacity
+        self._updated_at = time.time()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        if self.per_second > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.per_second)
+        self._updated_at = now
+
+    def try_acquire(self, amount: float) -> float:
+        """Take amount tokens and return 0, or return the seconds to wait"""
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if self.per_second <= 0:
+                return 0.0
+            amount = min(amount, self.capacity)
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.per_second
+
+    def adjust(self, delta: float):
+        """Take (positive) or give back (negative) tokens after the fact"""
+        with self._lock:
+            self._refill(time.time())
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+    def block_until(self, timestamp: float):
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, timestamp)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.time()
+            self._refill(now)
+            return {
+                "available": self._tokens if self.per_second > 0 else None,
+                "blocked_for": max(0.0, self._blocked_until - now),
+            }
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket kept in a SQLite file, so every gunicorn worker on the host
+    draws from the same budget and honours the same Retry-After.
+    """
+
+    def __init__(self, path: str, name: str, capacity: float, per_second: float):
+        self.path = path
+        self.name = name
+        self.capacity = capacity
+        self.per_second = per_second
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_buckets ("
+                "name TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, blocked_until REAL NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO rate_limit_buckets VALUES (?, ?, ?, 0)",
+                (name, capacity, time.time())
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _read(self):
+        """Current (tokens, blocked_until, now) without writing to the store"""
+        tokens, updated_at, blocked_until = self._connect().execute(
+            "SELECT tokens, updated_at, blocked_until FROM rate_limit_buckets WHERE name = ?",
+            (self.name,)
+        ).fetchone()
+        now = time.time()
+        if self.per_second > 0:
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.per_second)
+        return tokens, blocked_until, now
+
+    def _update(self, func):
+        """Run func(tokens, blocked_until, now) -> (tokens, blocked_until, result) atomically"""
+        for attempt in range(1, _STORE_ATTEMPTS + 1):
+            try:
+                return self._transaction(func)
+            except sqlite3.OperationalError as e:
+                # Another worker held the write lock past the busy timeout
+                if attempt == _STORE_ATTEMPTS or "locked" not in str(e):
+                    raise
+                time.sleep(random.uniform(0, _CONCURRENCY_POLL_SECONDS * attempt))
+
+    def _transaction(self, func):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, blocked_until, now = self._read()
+            tokens, blocked_until, result = func(tokens, blocked_until, now)
+            conn.execute(
+                "UPDATE rate_limit_buckets SET tokens = ?, updated_at = ?, blocked_until = ? WHERE name = ?",
+                (tokens, now, blocked_until, self.name)
+            )
+            conn.execute("COMMIT")
+            return result
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def try_acquire(self, amount: float) -> float:
+        if self.per_second <= 0:
+            # Unlimited: only a Retry-After block can hold the call, and checking it needs no write
+            _, blocked_until, now = self._read()
+            return max(0.0, blocked_until - now)
+
+        def take(tokens, blocked_until, now):
+            if blocked_until > now:
+                return tokens, blocked_until, blocked_until - now
+            needed = min(amount, self.capacity)
+            if tokens >= needed:
+                return tokens - needed, blocked_until, 0.0
+            return tokens, blocked_until, (needed - tokens) / self.per_second
+        return self._update(take)
+
+    def adjust(self, delta: float):
+        if self.per_second > 0:
+            self._update(lambda tokens, blocked_until, now: (min(self.capacity, tokens - delta), blocked_until, None))
+
+    def block_until(self, timestamp: float):
+        self._update(lambda tokens, blocked_until, now: (tokens, max(blocked_until, timestamp), None))
+
+    def snapshot(self) -> dict:
+        tokens, blocked_until, now = self._read()
+        return {
+            "available": tokens if self.per_second > 0 else None,
+            "blocked_for": max(0.0, blocked_until - now),
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight LLM calls: grows while calls succeed, halves when throttled"""
+
+    def __init__(self, minimum: int, maximum: int):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_enter(self) -> bool:
+        with self._lock:
+            if self.in_flight >= max(self.minimum, math.floor(self.limit)):
+                return False
+            self.in_flight += 1
+            return True
+
+    def exit(self, throttled: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(float(self.minimum), self.limit / 2)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+
+class RateLimiter:
+    """
+    Client-side limits for LLM calls: requests/min and tokens/min buckets
+    (optionally shared across workers) plus an adaptive concurrency limit.
+    With no rpm or tpm limit the buckets stay in process and only carry a
+    provider Retry-After, so calls never touch the shared store.
+    """
+
+    def __init__(self, rpm: int, tpm: int, store_path: str = "", min_concurrency: int = 1, max_concurrency: int = 16):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.shared = bool(store_path) and (rpm > 0 or tpm > 0)
+        if self.shared:
+            self.requests = SharedTokenBucket(store_path, "requests", rpm, rpm / 60)
+            self.tokens = SharedTokenBucket(store_path, "tokens", tpm, tpm / 60)
+        else:
+            self.requests = TokenBucket(rpm, rpm / 60)
+            self.tokens = TokenBucket(tpm, tpm / 60)
+        self.concurrency = AdaptiveConcurrencyLimiter(min_concurrency, max_concurrency)
+
+    def try_acquire(self, estimated_tokens: int) -> float:
+        """Reserve a call slot and return 0, or return the seconds to wait before retrying"""
+        if not self.concurrency.try_enter():
+            return _CONCURRENCY_POLL_SECONDS
+
+        wait = self.requests.try_acquire(1)
+        if wait == 0:
+            wait = self.tokens.try_acquire(estimated_tokens)
+            if wait > 0:
+                self.requests.adjust(-1)  # Give the request slot back
+        if wait > 0:
+            self.concurrency.exit()
+        return wait
+
+    def acquire(self, estimated_tokens: int):
+        """Block until a call may start"""
+        while True:
+            wait = self.try_acquire(estimated_tokens)
+            if wait == 0:
+                return
+            time.sleep(wait + random.uniform(0, _CONCURRENCY_POLL_SECONDS))
+
+    async def _off_loop(self, func, *args):
+        """Run func in a thread when it may block on the shared store"""
+        if self.shared:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def aacquire(self, estimated_tokens: int):
+        """Wait on the event loop until a call may start"""
+        while True:
+            wait = await self._off_loop(self.try_acquire, estimated_tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait + random.uniform(0, _CONCURRENCY_POLL_SECONDS))
+
+    def release(self, estimated_tokens: int, actual_tokens: int = None, throttled: bool = False):
+        """Finish a call: correct the token estimate and feed the concurrency limit"""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+        self.concurrency.exit(throttled=throttled)
+
+    async def arelease(self, estimated_tokens: int, actual_tokens: int = None, throttled: bool = False):
+        await self._off_loop(self.release, estimated_tokens, actual_tokens, throttled)
+
+    def throttled(self, retry_after: float):
+        """Provider said 429: stop every worker from calling until Retry-After has passed"""
+        self.requests.block_until(time.time() + retry_after)
+
+    async def athrottled(self, retry_after: float):
+        await self._off_loop(self.throttled, retry_after)
+
+    def snapshot(self) -> dict:
+        requests = self.requests.snapshot()
+        tokens = self.tokens.snapshot()
+        limit = max(self.concurrency.minimum, math.floor(self.concurrency.limit))
+        return {
+            "rpm_limit": self.rpm,
+            "tpm_limit": self.tpm,
+            "requests_available": requests["available"],
+            "tokens_available": tokens["available"],
+            "blocked_for": round(max(requests["blocked_for"], tokens["blocked_for"]), 3),
+            "concurrency_limit": limit,
+            "in_flight": self.concurrency.in_flight,
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    Config.LLM_RPM_LIMIT,
+                    Config.LLM_TPM_LIMIT,
+                    Config.RATE_LIMIT_STORE,
+                    Config.LLM_MIN_CONCURRENCY,
+                    Config.LLM_MAX_CONCURRENCY
+                )
+    return _rate_limiter
@@ -0,0 +1,170 @@
+"""
+Transcript parsing and clean-up before a conversation is sent to the LLM.
+
+parse_turns() splits a transcript on speaker tags ("Patient: ...",
+"Dr. Smith: ...") and stage directions ("[Physical Examination Conducted]")
+into compact Turn records with one regex split over the whole text.
+Untagged lines continue the current turn; after a direction they have no
+speaker. select_turns() renders only the turns a chain needs, e.g. the
+patient's for sentiment analysis.
+
+normalize_transcript() renders every turn one per line and drops what
+carries no clinical content: stage directions and greeting/closing
+pleasantries. A turn left empty is dropped.
+"""
+import re
+from functools import lru_cache
+from src.config import Config
+from src.utils.medical_lexicon import CLINICAL_SPEAKERS, PATIENT_SPEAKERS
+
+PATIENT = "patient"
+CLINICIAN = "clinician"
+OTHER = "other"  # Tagged speakers that are neither, e.g. "Ms. Jones" or a relative
+DIRECTION = "direction"  # Stage directions; the role of untagged text is None
+
+# A tag or a direction at the start of a line; a tag is at most four words and
+# its colon is followed by whitespace, so "at 12:30" does not start a turn.
+# The leading newline is a literal prefix, which lets the scan skip ahead fast.
+_TURN_RE = re.compile(
+    r"\n[ \t]*(?:([A-Za-z][\w.'-]*(?: [\w.'-]+){0,3}):(?=\s)|\[([^\]\n]*)\][ \t\r]*(?=\n))"
+)
+_INLINE_DIRECTION_RE = re.compile(r"\[[^\]\n]*\]")
+_SENTENCE_RE = re.compile(r"(?<!\bMr\.)(?<!\bMs\.)(?<!\bMrs\.)(?<!\bDr\.)(?<=[.!?])\s+")
+
+# Whole sentences only: a sentence with anything beyond the pleasantry and an
+# optional form of address ("doctor", "Dr. Patel", "Ms. Jones") is kept whole
+_NAME = r"[a-z][\w'-]*"
+_ADDRESS = (
+    rf"(,? (doctor( {_NAME})?|doc|nurse( {_NAME})?|(dr|mr|mrs|ms|miss|mx|prof)\.? {_NAME}( {_NAME})?"
+    r"|sir|ma'am|madam|there|everyone))?"
+)
+_PLEASANTRY_RE = re.compile(
+    r"^(?:"
+    rf"(good (morning|afternoon|evening)|hello|hi|hey){_ADDRESS}"
+    rf"|(thank you|thanks)( (so|very) much)?{_ADDRESS}"
+    r"|i (really )?appreciate it"
+    rf"|you're (very |most )?welcome{_ADDRESS}"
+    rf"|(take care( of yourself)?|goodbye|bye( now)?){_ADDRESS}"
+    r")[.!]*$",
+    re.IGNORECASE
+)
+
+_roles = {}  # Speaker tag -> role; transcripts reuse a handful of tags
+
+
+class Turn:
+    """One speaker turn, or a stage direction; shared between callers, so read-only"""
+
+    __slots__ = ("speaker", "role", "text")
+
+    def __init__(self, speaker, role, text):
+        self.speaker = speaker
+        self.role = role
+        self.text = text
+
+    def render(self) -> str:
+        if self.role == DIRECTION:
+            return f"[{self.text}]"
+        return f"{self.speaker}: {self.text}" if self.speaker else self.text
+
+    def __repr__(self):
+        return f"Turn({self.speaker!r}, {self.role!r}, {self.text!r})"
+
+
+def speaker_role(speaker: str) -> str:
+    """PATIENT, CLINICIAN or OTHER for a speaker tag, by its first word"""
+    role = _roles.get(speaker)
+    if role is None:
+        first = speaker.split(" ", 1)[0].rstrip(".").lower()
+        if first in PATIENT_SPEAKERS:
+            role = PATIENT
+        elif first in CLINICAL_SPEAKERS:
+            role = CLINICIAN
+        else:
+            role = OTHER
+        if len(_roles) < 1024:
+            _roles[speaker] = role
+    return role
+
+
+def _clean(text: str) -> str:
+    """Turn text without inline directions, whitespace collapsed"""
+    if "[" in text:
+        text = _INLINE_DIRECTION_RE.sub(" ", text)
+    text = text.strip()
+    if "\n" in text or "  " in text or "\t" in text or "\r" in text:
+        text = " ".join(text.split())
+    return text
+
+
+@lru_cache(maxsize=64)
+def parse_turns(conversation: str) -> tuple:
+    """Turns in transcript order; text before the first tag has no speaker"""
+    # Splitting on the two groups gives [text, tag, direction, text, tag, direction, ..., text]
+    parts = _TURN_RE.split(f"\n{conversation}\n")
+    turns = []
+    speaker = role = None
+    for i in range(0, len(parts) - 1, 3):
+        body = _clean(parts[i])
+        if body:
+            turns.append(Turn(speaker, role, body))
+        speaker = parts[i + 1]
+        if speaker is not None:
+            role = _roles.get(speaker) or speaker_role(speaker)
+        else:
+            # Untagged text after a direction is narration, not the last speaker's
+            role = None
+            direction = " ".join(parts[i + 2].split())
+            if direction:
+                turns.append(Turn(None, DIRECTION, direction))
+    body = _clean(parts[-1])
+    if body:
+        turns.append(Turn(speaker, role, body))
+    return tuple(turns)
+
+
+def _strip_pleasantries(text: str) -> str:
+    sentences = _SENTENCE_RE.split(text)
+    return " ".join(sentence for sentence in sentences if not _PLEASANTRY_RE.match(sentence))
+
+
+def render_turns(turns, strip_pleasantries: bool = False) -> str:
+    """One turn per line, without stage directions"""
+    lines = []
+    for turn in turns:
+        if turn.role == DIRECTION:
+            continue
+        if strip_pleasantries:
+            text = _strip_pleasantries(turn.text)
+            if text:
+                lines.append(f"{turn.speaker}: {text}" if turn.speaker else text)
+        else:
+            lines.append(turn.render())
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=64)
+def select_turns(conversation: str, roles: tuple, strip_pleasantries: bool = False) -> str:
+    """
+    Only the turns whose role is in `roles`, one per line. The whole
+    transcript when no tagged turn matches, so untagged or unusually
+    tagged input is not emptied.
+    """
+    turns = parse_turns(conversation)
+    selected = [turn for turn in turns if turn.role in roles]
+    if not any(turn.speaker for turn in selected):
+        selected = turns
+    return render_turns(selected, strip_pleasantries)
+
+
+@lru_cache(maxsize=64)
+def normalize_transcript(conversation: str) -> str:
+    """Compact transcript with one turn per line; idempotent"""
+    return render_turns(parse_turns(conversation), strip_pleasantries=True)
+
+
+def prepare_transcript(conversation: str, speakers: tuple = None) -> str:
+    """Transcript as a chain sends it to the LLM: only `speakers`' turns if given, normalized if enabled"""
+    if speakers is not None and Config.TRANSCRIPT_SPEAKER_FILTER:
+        return select_turns(conversation, speakers, Config.TRANSCRIPT_NORMALIZE)
+    return normalize_transcript(conversation) if Config.TRANSCRIPT_NORMALIZE else conversation
@@ -0,0 +1,107 @@
+"""Pydantic schemas for the chains' JSON output"""
+from typing import List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+def _as_list(value):
+    """Models sometimes answer a single string where a list is expected"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    return value
+
+
+def _as_text(value):
+    """Flatten list or nested answers for free-text SOAP fields"""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {item}" for key, item in value.items())
+    return str(value)
+
+
+class NEREntities(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    Symptoms: List[str] = []
+    Treatment: List[str] = []
+    Diagnosis: List[str] = []
+    Prognosis: List[str] = []
+
+    @field_validator("Symptoms", "Treatment", "Diagnosis", "Prognosis", mode="before")
+    @classmethod
+    def _lists(cls, value):
+        return _as_list(value)
+
+
+class SentimentResult(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    Sentiment: Literal["Anxious", "Neutral", "Reassured"]
+    Intent: List[str] = []
+    Confidence: Optional[Literal["High", "Medium", "Low"]] = None
+    Patient_Quotes: List[str] = []
+
+    @field_validator("Intent", "Patient_Quotes", mode="before")
+    @classmethod
+    def _lists(cls, value):
+        return _as_list(value)
+
+    @field_validator("Sentiment", "Confidence", mode="before")
+    @classmethod
+    def _title_case(cls, value):
+        return value.strip().capitalize() if isinstance(value, str) else value
+
+
+class SOAPSection(BaseModel):
+    """Free-text fields per SOAP section; field names vary between notes"""
+    model_config = ConfigDict(extra="allow")
+
+
+class Subjective(SOAPSection):
+    Chief_Complaint: str = ""
+    History_of_Present_Illness: str = ""
+
+
+class Objective(SOAPSection):
+    Physical_Exam: str = ""
+    Observations: str = ""
+
+
+class Assessment(SOAPSection):
+    Diagnosis: str = ""
+    Severity: str = ""
+
+
+class Plan(SOAPSection):
+    Treatment: str = ""
+    Follow_Up: str = ""
+
+
+class SOAPNote(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    Subjective: Subjective
+    Objective: Objective
+    Assessment: Assessment
+    Plan: Plan
+
+    @field_validator("Subjective", "Objective", "Assessment", "Plan", mode="before")
+    @classmethod
+    def _flatten_section(cls, value):
+        if isinstance(value, dict):
+            return {key: _as_text(item) for key, item in value.items()}
+        return value
+
+
+class CombinedAnalysis(BaseModel):
+    """Output of the single-call combined analysis; each section is validated on its own"""
+    model_config = ConfigDict(extra="allow")
+
+    is_medical: bool = True
+    entities: Optional[NEREntities] = None
+    sentiment: Optional[SentimentResult] = None
+    soap_note: Optional[SOAPNote] = None
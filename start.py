@@ -40,18 +40,34 @@ def main():
         print(f"⚠ Static files warning: {result.stderr}\n")
 
     # Start Gunicorn
-    print("→ Starting Gunicorn server...")
+    # SERVER_MODE=asgi serves the ASGI app on uvicorn workers (async views, no thread per
+    # in-flight analysis); the default is the WSGI app on gthread workers
+    server_mode = os.getenv('SERVER_MODE', 'wsgi')
+    if server_mode == 'asgi':
+        app = 'chatbot_project.asgi:application'
+        worker_args = ['--worker-class', 'uvicorn_worker.UvicornWorker']
+    else:
+        app = 'chatbot_project.wsgi:application'
+        worker_args = ['--threads', '4', '--worker-class', 'gthread']
+
+    # Background job worker for /api/jobs/ (JOB_WORKER_ENABLED=false to run it elsewhere)
+    if os.getenv('JOB_WORKER_ENABLED', 'true') == 'true':
+        print("→ Starting job worker...")
+        subprocess.Popen([sys.executable, 'manage.py', 'run_job_worker'])
+
+    print(f"→ Starting Gunicorn server ({server_mode})...")
     print("=" * 60)
 
     # Use Python module approach (more reliable)
+    # gunicorn.conf.py: GUNICORN_PRELOAD=true shares the imported modules across workers
     subprocess.run([
         sys.executable, '-m', 'gunicorn',
-        'chatbot_project.wsgi:application',
+        app,
+        '--config', 'gunicorn.conf.py',
         '--bind', '0.0.0.0:7860',
         '--workers', '2',
-        '--threads', '4',
+        *worker_args,
         '--timeout', '120',
-        '--worker-class', 'gthread',
         '--log-level', 'info',
         '--access-logfile', '-',
         '--error-logfile', '-',
@@ -16,13 +16,31 @@ python manage.py migrate --noinput
 echo "Collecting static files..."
 python manage.py collectstatic --noinput --clear
 
-echo "Starting Gunicorn server on port 7860..."
-exec gunicorn chatbot_project.wsgi:application \
+# SERVER_MODE=asgi serves the ASGI app on uvicorn workers (async views);
+# the default is the WSGI app on gthread workers
+SERVER_MODE="${SERVER_MODE:-wsgi}"
+if [ "$SERVER_MODE" = "asgi" ]; then
+  APP="chatbot_project.asgi:application"
+  WORKER_ARGS="--worker-class uvicorn_worker.UvicornWorker"
+else
+  APP="chatbot_project.wsgi:application"
+  WORKER_ARGS="--threads 4 --worker-class gthread"
+fi
+
+# Background job worker for /api/jobs/ (JOB_WORKER_ENABLED=false to run it elsewhere)
+if [ "${JOB_WORKER_ENABLED:-true}" = "true" ]; then
+  echo "Starting job worker..."
+  python manage.py run_job_worker &
+fi
+
+echo "Starting Gunicorn server on port 7860 ($SERVER_MODE)..."
+# gunicorn.conf.py: GUNICORN_PRELOAD=true shares the imported modules across workers
+exec gunicorn "$APP" \
+  --config gunicorn.conf.py \
   --bind 0.0.0.0:7860 \
   --workers 2 \
-  --threads 4 \
+  $WORKER_ARGS \
   --timeout 120 \
-  --worker-class gthread \
   --worker-tmp-dir /dev/shm \
   --log-level info \
   --access-logfile - \